@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+#
+# benchmark-generation.py
+#
+# Copyright 2025 sepehr-rs
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+"""
+Time puzzle generation in-process for each variant, solver backend and
+difficulty, using the same seeds for every combination.
+
+    python3 scripts/benchmark-generation.py [--runs N] [--budget SECONDS]
+        [--symmetry {rotational,mirror,diagonal}] [--latency-budget MS]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from src.base.constants import DIFFICULTIES  # noqa: E402
+from src.base.generation_policy import GenerationPolicy, percentile  # noqa: E402
+from src.base.generator_base import minimize_stats  # noqa: E402
+from src.base.grid_transforms import SYMMETRIES  # noqa: E402
+from src.variants.classic_sudoku.generator import ClassicSudokuGenerator  # noqa
+from src.variants.diagonal_sudoku.generator import DiagonalSudokuGenerator  # noqa
+
+GENERATORS = (ClassicSudokuGenerator, DiagonalSudokuGenerator)
+BACKENDS = ("engine", "native")
+
+
+def run(generator, difficulty: float, runs: int, budget: float) -> list[float]:
+    """Seconds per run; stops early once `budget` seconds have been spent."""
+    timings = []
+    for seed in range(1, runs + 1):
+        started = time.perf_counter()
+        generator._generate_impl(difficulty, seed)
+        timings.append(time.perf_counter() - started)
+        if sum(timings) > budget:
+            break
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument(
+        "--budget",
+        type=float,
+        default=60.0,
+        help="seconds to spend per variant/backend/difficulty at most",
+    )
+    parser.add_argument("--symmetry", choices=sorted(SYMMETRIES))
+    parser.add_argument(
+        "--latency-budget",
+        type=float,
+        default=GenerationPolicy.MIN_BUDGET * 1000,
+        help="count runs slower than this many milliseconds",
+    )
+    args = parser.parse_args()
+
+    print(
+        f"{'variant':<10}{'backend':<9}{'difficulty':>10}{'runs':>6}"
+        f"{'p50 ms':>10}{'p95 ms':>10}{'max ms':>10}{'over':>6}"
+    )
+    for generator_cls in GENERATORS:
+        for backend in BACKENDS:
+            generator = generator_cls()
+            generator.solver_backend = backend
+            generator.symmetry = args.symmetry
+            for difficulty in DIFFICULTIES:
+                timings = run(generator, difficulty, args.runs, args.budget)
+                ms = [t * 1000 for t in timings]
+                print(
+                    f"{generator.variant:<10}{backend:<9}{difficulty:>10}"
+                    f"{len(ms):>6}{percentile(ms, 50):>10.1f}"
+                    f"{percentile(ms, 95):>10.1f}{max(ms):>10.1f}"
+                    f"{sum(t > args.latency_budget for t in ms):>6}"
+                )
+    print(f"Clue minimization: {minimize_stats.summary()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -27,6 +27,16 @@ from gi.repository import Gio, Adw, Gtk, GLib
 from .window import SudokuWindow
 from .screens.help_dialog import HowToPlayDialog
 from .log_utils import setup_logging
+from .base.board_base import BoardBase
+from .base.generator_base import (
+    GeneratorBase,
+    derivation_cache,
+    minimize_stats,
+    race_stats,
+)
+from .base.generation_telemetry import generation_telemetry
+from .base.generator_pool import get_pool
+from .base.resource_governor import resource_governor
 from pathlib import Path
 import xml.etree.ElementTree as ET
 
@@ -41,6 +51,38 @@ class SudokuApplication(Adw.Application):
         self._setup_actions()
         self._setup_accelerators()
         self.log_handler = setup_logging()
+        self._load_generator_settings()
+        generation_telemetry.open()
+
+    def _load_generator_settings(self):
+        """Apply the generator resource settings before any worker starts."""
+        schema_id = "io.github.sepehr_rs.Sudoku"
+        source = Gio.SettingsSchemaSource.get_default()
+        if source is None or source.lookup(schema_id, True) is None:
+            return
+        settings = Gio.Settings.new(schema_id)
+        resource_governor.max_workers = settings.get_int("generator-max-workers")
+        resource_governor.reserve_ui_core = settings.get_boolean(
+            "generator-reserve-ui-core"
+        )
+        resource_governor.background_idle_scheduling = settings.get_boolean(
+            "generator-background-idle-scheduling"
+        )
+        resource_governor.background_niceness = settings.get_int(
+            "generator-background-niceness"
+        )
+        resource_governor.memory_limit_mb = settings.get_int(
+            "generator-memory-limit-mb"
+        )
+        GeneratorBase.rated_difficulty = settings.get_boolean(
+            "generator-rated-difficulty"
+        )
+        symmetry = settings.get_string("generator-clue-symmetry")
+        GeneratorBase.symmetry = None if symmetry == "none" else symmetry
+        BoardBase.seed_only_saves = settings.get_boolean("seed-only-saves")
+        BoardBase.latency_budget = (
+            settings.get_int("generator-latency-budget-ms") / 1000
+        )
 
     def _setup_actions(self):
         """Set up application actions."""
@@ -83,6 +125,14 @@ class SudokuApplication(Adw.Application):
             f"GTK {Gtk.MAJOR_VERSION}.{Gtk.MINOR_VERSION}.{Gtk.MICRO_VERSION}\n"
             f"Adwaita {Adw.MAJOR_VERSION}.{Adw.MINOR_VERSION}.{Adw.MICRO_VERSION}\n"
             f"PyGObject {'.'.join(map(str, gi.version_info))}\n"
+            "\n--- Puzzle Generation ---\n"
+            f"{resource_governor.describe()}\n"
+            f"Pool: {get_pool().stats()}\n"
+            f"Seed races: {race_stats.summary()}\n"
+            f"Derived puzzles served: {derivation_cache.derived}\n"
+            f"Minimization: {minimize_stats.summary()}\n"
+            "\n--- Generation Telemetry ---\n"
+            f"{generation_telemetry.summary()}\n"
             "\n--- Logs ---\n"
             f"{self.log_handler.get_logs()}"
         )
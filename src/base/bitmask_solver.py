@@ -0,0 +1,420 @@
+# bitmask_solver.py
+#
+# Copyright 2025 sepehr-rs
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+# Imported by generator workers: keep this module free of gi.
+
+import random
+import threading
+import time
+
+SIZE = 9
+CELLS = SIZE * SIZE
+ALL_DIGITS = (1 << SIZE) - 1
+
+# Lookup tables indexed by candidate mask (bit d-1 set = digit d possible).
+POPCOUNT = [bin(mask).count("1") for mask in range(ALL_DIGITS + 1)]
+MASK_BITS = [
+    [1 << d for d in range(SIZE) if mask & (1 << d)] for mask in range(ALL_DIGITS + 1)
+]
+BIT_DIGIT = {1 << d: d + 1 for d in range(SIZE)}
+# Searches check for cancellation whenever their node count is a multiple
+# of this plus one.
+CHECK_MASK = (1 << 10) - 1
+
+
+def _units(diagonal: bool) -> list[tuple[int, ...]]:
+    rows = [tuple(r * SIZE + c for c in range(SIZE)) for r in range(SIZE)]
+    cols = [tuple(r * SIZE + c for r in range(SIZE)) for c in range(SIZE)]
+    boxes = [
+        tuple((br + r) * SIZE + bc + c for r in range(3) for c in range(3))
+        for br in range(0, SIZE, 3)
+        for bc in range(0, SIZE, 3)
+    ]
+    units = rows + cols + boxes
+    if diagonal:
+        units.append(tuple(i * SIZE + i for i in range(SIZE)))
+        units.append(tuple(i * SIZE + SIZE - 1 - i for i in range(SIZE)))
+    return units
+
+
+def to_cells(grid) -> list[int]:
+    """Flatten a 9x9 grid (None for blanks) into 81 ints (0 for blanks)."""
+    return [value or 0 for row in grid for value in row]
+
+
+def to_grid(cells, blank=None) -> list[list]:
+    return [
+        [cells[r * SIZE + c] or blank for c in range(SIZE)] for r in range(SIZE)
+    ]
+
+
+class BitmaskSolver:
+    """
+    Sudoku solver over 9-bit candidate masks.
+
+    Each search node propagates naked and hidden singles, then branches on
+    the empty cell with the fewest candidates (MRV). With `diagonal=True`
+    both main diagonals are constrained as extra units.
+    """
+
+    def __init__(self, diagonal: bool = False):
+        self.diagonal = diagonal
+        self.units = _units(diagonal)
+        peers = [set() for _ in range(CELLS)]
+        for unit in self.units:
+            for i in unit:
+                peers[i].update(unit)
+        self.peers = [tuple(sorted(p - {i})) for i, p in enumerate(peers)]
+        # Search nodes visited since construction, for effort statistics.
+        self.nodes = 0
+
+    def solve(self, grid, rng: random.Random | None = None):
+        """
+        Return one solution as a 9x9 int grid, or None. With `rng`, digits
+        are tried in random order, which turns an empty grid into a random
+        complete grid.
+        """
+        found = self._run(to_cells(grid), 1, rng)
+        return to_grid(found[0]) if found else None
+
+    def count_solutions(self, grid, limit: int = 2) -> int:
+        """Count solutions of `grid`, stopping once `limit` are found."""
+        return len(self._run(to_cells(grid), limit, None))
+
+    def has_unique_solution(self, grid) -> bool:
+        return self.count_solutions(grid, limit=2) == 1
+
+    def _run(self, cells, limit, rng) -> list[list[int]]:
+        state = self.initial_state(cells)
+        if state is None:
+            return []
+        found = []
+        self.search(*state, limit, rng, found)
+        return found
+
+    def initial_state(self, cells):
+        """Return (cells, candidates) for the givens, or None if they clash."""
+        cands = [ALL_DIGITS] * CELLS
+        work = [0] * CELLS
+        for i, value in enumerate(cells):
+            if value:
+                bit = 1 << (value - 1)
+                if not cands[i] & bit or not self.assign(work, cands, i, bit):
+                    return None
+        return work, cands
+
+    def assign(self, cells, cands, i: int, bit: int) -> bool:
+        """Place `bit` at `i` and strike it from its peers."""
+        cells[i] = BIT_DIGIT[bit]
+        cands[i] = 0
+        keep = ~bit
+        for p in self.peers[i]:
+            c = cands[p]
+            if c & bit:
+                c &= keep
+                if not c:
+                    return False
+                cands[p] = c
+        return True
+
+    def propagate(self, cells, cands) -> bool:
+        """Apply naked and hidden singles until stuck; False on contradiction."""
+        changed = True
+        while changed:
+            changed = False
+            for i in range(CELLS):
+                c = cands[i]
+                if c and not c & (c - 1):
+                    if not self.assign(cells, cands, i, c):
+                        return False
+                    changed = True
+            for unit in self.units:
+                result = self._hidden_singles(cells, cands, unit)
+                if result is None:
+                    return False
+                changed = changed or result
+        return True
+
+    def _hidden_singles(self, cells, cands, unit) -> bool | None:
+        once = twice = placed = 0
+        for i in unit:
+            c = cands[i]
+            twice |= once & c
+            once |= c
+            if cells[i]:
+                placed |= 1 << (cells[i] - 1)
+        if (once | placed) != ALL_DIGITS:
+            return None
+        only = once & ~twice
+        if not only:
+            return False
+        for i in unit:
+            c = cands[i] & only
+            if c:
+                if c & (c - 1) or not self.assign(cells, cands, i, c):
+                    return None
+        return True
+
+    def search(self, cells, cands, limit, rng, found):
+        self.nodes += 1
+        if not self.nodes & CHECK_MASK:
+            cancellation_points.check()
+        if not self.propagate(cells, cands):
+            return
+        best = _most_constrained(cands)
+        if best < 0:
+            found.append(cells)
+            return
+
+        bits = MASK_BITS[cands[best]]
+        if rng is not None:
+            bits = rng.sample(bits, len(bits))
+        for bit in bits:
+            branch_cells, branch_cands = cells[:], cands[:]
+            if self.assign(branch_cells, branch_cands, best, bit):
+                self.search(branch_cells, branch_cands, limit, rng, found)
+                if len(found) >= limit:
+                    return
+
+
+def _most_constrained(cands) -> int:
+    """The open cell with the fewest candidates, or -1 if none is open."""
+    best, best_count = -1, SIZE + 1
+    for i in range(CELLS):
+        c = cands[i]
+        if c and POPCOUNT[c] < best_count:
+            best, best_count = i, POPCOUNT[c]
+            if best_count == 2:
+                break
+    return best
+
+
+class SearchCancelled(Exception):
+    """Raised inside a search whose thread was asked to stop."""
+
+
+class CancellationPoints:
+    """
+    Lets generation running on a thread be stopped from another one.
+    Searches call check() every few thousand nodes, which raises
+    SearchCancelled once the event this thread watches is set. Worker
+    processes are killed instead, so they never watch one.
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+
+    def watch(self, event: threading.Event | None):
+        self._local.event = event
+
+    def check(self):
+        event = getattr(self._local, "event", None)
+        if event is not None and event.is_set():
+            raise SearchCancelled("Search cancelled")
+
+
+cancellation_points = CancellationPoints()
+
+
+class SolverEffort:
+    """
+    Search nodes visited by the solvers tracked on this thread, summed
+    and forgotten by take(). Workers report it per generation run.
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+
+    def track(self, solver: BitmaskSolver) -> BitmaskSolver:
+        self._solvers().append(solver)
+        return solver
+
+    def take(self) -> int:
+        solvers, self._local.solvers = self._solvers(), []
+        return sum(solver.nodes for solver in solvers)
+
+    def _solvers(self) -> list:
+        if not hasattr(self._local, "solvers"):
+            self._local.solvers = []
+        return self._local.solvers
+
+
+solver_effort = SolverEffort()
+
+
+class UniquenessTracker:
+    """
+    Incremental uniqueness checks for digging holes into a known solution.
+
+    The current puzzle always has exactly one solution, the one we started
+    from. Blanking cell `i` (value `v`) keeps it unique unless some
+    solution puts another digit at `i`, so each removal needs a single
+    early-terminating search with `i` restricted to its other candidates,
+    and none at all when `v` is its only candidate. Digits used per unit
+    are tracked across removals, so candidates are never recomputed from
+    the whole grid.
+    """
+
+    def __init__(self, solver: BitmaskSolver, solution, puzzle=None):
+        self.solver = solver
+        self.cells = to_cells(solution)
+        units = solver.units
+        self.cell_units = [
+            tuple(u for u, unit in enumerate(units) if i in unit) for i in range(CELLS)
+        ]
+        self.used = [ALL_DIGITS] * len(units)
+        # Start from `puzzle`, which must be a unique puzzle for `solution`.
+        if puzzle is not None:
+            for i, value in enumerate(to_cells(puzzle)):
+                if not value:
+                    self._toggle(i, 1 << (self.cells[i] - 1))
+                    self.cells[i] = 0
+        # Removals accepted without a search, and searches run, for
+        # effort statistics.
+        self.free_removals = 0
+        self.checks = 0
+
+    def candidates(self, i: int) -> int:
+        blocked = 0
+        for u in self.cell_units[i]:
+            blocked |= self.used[u]
+        return ALL_DIGITS & ~blocked
+
+    def remove(self, i: int) -> bool:
+        """Blank cell `i` if the puzzle stays unique; return whether it did."""
+        value = self.cells[i]
+        bit = 1 << (value - 1)
+        self._toggle(i, bit)
+        self.cells[i] = 0
+        others = self.candidates(i) & ~bit
+        if not others:
+            self.free_removals += 1
+            return True
+        if not self._solvable_with(i, others):
+            return True
+        self.cells[i] = value
+        self._toggle(i, bit)
+        return False
+
+    def remove_group(self, group) -> bool:
+        """
+        Blank all cells of `group` at once, keeping them blank only if the
+        puzzle stays unique. Other solutions are split by the first cell of
+        the group where they differ from ours, so each search pins the
+        earlier cells and excludes our digit at that one.
+        """
+        if len(group) == 1:
+            return self.remove(group[0])
+        values = [self.cells[i] for i in group]
+        for i, value in zip(group, values):
+            self._toggle(i, 1 << (value - 1))
+            self.cells[i] = 0
+        for n, (i, value) in enumerate(zip(group, values)):
+            others = self.candidates(i) & ~(1 << (value - 1))
+            if others and self._solvable_with(i, others, pinned=zip(group[:n], values)):
+                for j, pinned_value in zip(group, values):
+                    self.cells[j] = pinned_value
+                    self._toggle(j, 1 << (pinned_value - 1))
+                return False
+        return True
+
+    def puzzle(self, blank=None) -> list[list]:
+        return to_grid(self.cells, blank)
+
+    def _toggle(self, i: int, bit: int):
+        for u in self.cell_units[i]:
+            self.used[u] ^= bit
+
+    def _solvable_with(self, i: int, allowed: int, pinned=()) -> bool:
+        self.checks += 1
+        cells = self.cells[:]
+        cands = [0 if value else self.candidates(j) for j, value in enumerate(cells)]
+        for j, value in pinned:
+            cands[j] = 1 << (value - 1)
+        cands[i] = allowed
+        found = []
+        self.solver.search(cells, cands, 1, None, found)
+        return bool(found)
+
+
+class MinimizeReport:
+    """What a minimize() pass removed and what it cost."""
+
+    def __init__(self, removed: int, tested: int, seconds: float, complete: bool):
+        self.removed = removed
+        self.tested = tested
+        self.seconds = seconds
+        # False when the time budget ran out before every clue was tested.
+        self.complete = complete
+
+    def __repr__(self):
+        return (
+            f"MinimizeReport(removed={self.removed}, tested={self.tested}, "
+            f"seconds={self.seconds:.3f}, complete={self.complete})"
+        )
+
+
+class MinimizeReports:
+    """
+    Reports of the minimize() passes run on this thread since the last
+    take(), so a worker can send them back with its result.
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+
+    def add(self, report: MinimizeReport):
+        self._reports().append(report)
+
+    def take(self) -> list:
+        reports, self._local.reports = self._reports(), []
+        return reports
+
+    def _reports(self) -> list:
+        if not hasattr(self._local, "reports"):
+            self._local.reports = []
+        return self._local.reports
+
+
+minimize_reports = MinimizeReports()
+
+
+def minimize(solver: BitmaskSolver, puzzle, solution, budget: float):
+    """
+    Remove clues from a unique `puzzle` until none can go without losing
+    uniqueness, or `budget` seconds have passed. Clues with the fewest
+    alternative digits are tried first: they are the likeliest to go and
+    the cheapest to check. Returns (puzzle, MinimizeReport).
+    """
+    started = time.monotonic()
+    tracker = UniquenessTracker(solver, solution, puzzle)
+    clues = [i for i in range(CELLS) if tracker.cells[i]]
+    clues.sort(key=lambda i: POPCOUNT[tracker.candidates(i)])
+
+    removed = tested = 0
+    for i in clues:
+        if time.monotonic() - started > budget:
+            break
+        tested += 1
+        if tracker.remove(i):
+            removed += 1
+    report = MinimizeReport(
+        removed, tested, time.monotonic() - started, tested == len(clues)
+    )
+    return tracker.puzzle(), report
@@ -18,14 +18,23 @@
 # SPDX-License-Identifier: GPL-3.0-or-later
 
 import json
+import logging
 import os
+import time
 from abc import ABC, abstractmethod
+from gettext import gettext
 from typing import Any, Self
+from .constants import DIFFICULTY_LABELS
 from .preferences_manager import PreferencesManager
+from .puzzle_sources import puzzle_sources
 
 
 class BoardBase(ABC):
     DEFAULT_SAVE_PATH = "saves/board.json"
+    # Save only the puzzle code, not the grids, when the puzzle has one.
+    seed_only_saves = False
+    # Seconds the puzzle sources get before generation degrades difficulty.
+    latency_budget = 5.0
 
     def __init__(
         self,
@@ -36,6 +45,11 @@ class BoardBase(ABC):
         variant: str,
         variant_preferences: dict[str, Any] | None = None,
         general_preferences: dict[str, Any] | None = None,
+        pregenerated: (
+            tuple[list[list[int]], list[list[int]], str | None] | None
+        ) = None,
+        on_progress=None,
+        cancellation=None,
     ):
         self.rules = rules
         self.generator = generator
@@ -49,7 +63,10 @@ class BoardBase(ABC):
         self.variant_preferences = variant_preferences or prefs.variant_defaults
         self.general_preferences = general_preferences or prefs.general_defaults
 
-        self.puzzle, self.solution = self.generator.generate(difficulty)
+        if pregenerated is not None:
+            self.puzzle, self.solution, self.puzzle_code = pregenerated
+        else:
+            self._generate(difficulty, on_progress, cancellation)
         self.user_inputs = [
             [None for _ in range(self.rules.size)] for _ in range(self.rules.size)
         ]
@@ -57,6 +74,36 @@ class BoardBase(ABC):
             [set() for _ in range(self.rules.size)] for _ in range(self.rules.size)
         ]
 
+    def _generate(self, difficulty: float, on_progress=None, cancellation=None):
+        self.puzzle_code = None
+        if self.generator.rated_difficulty:
+            try:
+                self.puzzle, self.solution, _ = self.generator.generate_rated(
+                    difficulty, cancellation=cancellation
+                )
+                return
+            except (TimeoutError, RuntimeError) as e:
+                logging.warning(f"Rated generation failed ({e}); using removal ratio")
+        deadline = time.monotonic() + self.latency_budget
+        found = puzzle_sources.find(
+            self.generator, difficulty, self.latency_budget, on_progress, cancellation
+        )
+        if found is not None:
+            self.puzzle, self.solution, self.puzzle_code = found
+            return
+        # Degrade within what is left of the budget, not on top of it.
+        self.puzzle, self.solution, actual, seed = self.generator.generate_adaptive(
+            difficulty,
+            on_progress,
+            cancellation,
+            within=max(0.0, deadline - time.monotonic()),
+        )
+        self.puzzle_code = self.generator.puzzle_code(actual, seed)
+        if actual != difficulty:
+            logging.warning(f"Generated at difficulty {actual} instead of {difficulty}")
+            self.difficulty = actual
+            self.difficulty_label = gettext(DIFFICULTY_LABELS[actual])
+
     @classmethod
     def _load_from_file_common(
         cls,
@@ -90,8 +137,18 @@ class BoardBase(ABC):
             prefs.general_defaults,
         )
         self.variant = state.get("variant", "Unknown")
-        self.puzzle = state["puzzle"]
-        self.solution = state["solution"]
+        self.puzzle_code = state.get("puzzle_code")
+        if "puzzle" in state:
+            self.puzzle = state["puzzle"]
+            self.solution = state["solution"]
+        else:
+            # Seed-only save: rebuild the grids now, before any UI uses them.
+            logging.info(f"Regenerating puzzle {self.puzzle_code}")
+            try:
+                self.puzzle, self.solution = generator.regenerate(self.puzzle_code)
+            except ValueError as e:
+                logging.warning(f"Cannot restore saved game: {e}")
+                return None
         self.user_inputs = state["user_inputs"]
         self.notes = [[set(n) for n in row] for row in state["notes"]]
 
@@ -115,11 +172,13 @@ class BoardBase(ABC):
             "variant_preferences": prefs.variant_defaults,
             "general_preferences": prefs.general_defaults,
             "variant": self.variant,
-            "puzzle": self.puzzle,
-            "solution": self.solution,
+            "puzzle_code": self.puzzle_code,
             "user_inputs": self.user_inputs,
             "notes": [[list(n) for n in row] for row in self.notes],
         }
+        if not (self.seed_only_saves and self.puzzle_code):
+            state["puzzle"] = self.puzzle
+            state["solution"] = self.solution
         with open(path, "w", encoding="utf-8") as f:
             json.dump(state, f)
 
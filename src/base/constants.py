@@ -16,3 +16,46 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 #
 # SPDX-License-Identifier: GPL-3.0-or-later
+
+EASY_DIFFICULTY = 0.2
+MEDIUM_DIFFICULTY = 0.5
+HARD_DIFFICULTY = 0.7
+EXTREME_DIFFICULTY = 0.9
+
+DIFFICULTIES = (
+    EASY_DIFFICULTY,
+    MEDIUM_DIFFICULTY,
+    HARD_DIFFICULTY,
+    EXTREME_DIFFICULTY,
+)
+
+# Untranslated; pass through gettext before display.
+DIFFICULTY_LABELS = {
+    EASY_DIFFICULTY: "Easy",
+    MEDIUM_DIFFICULTY: "Medium",
+    HARD_DIFFICULTY: "Hard",
+    EXTREME_DIFFICULTY: "Extreme",
+}
+
+# Half-open ranges of puzzle_rater scores for each difficulty, used when
+# puzzles are picked by rating rather than by the fraction of cells removed.
+# Easy needs singles only, Medium locked candidates or pairs, Hard triples,
+# x-wings or a guess or two, and Extreme more guessing than that.
+RATING_BANDS = {
+    EASY_DIFFICULTY: (0, 20),
+    MEDIUM_DIFFICULTY: (20, 50),
+    HARD_DIFFICULTY: (50, 90),
+    EXTREME_DIFFICULTY: (90, float("inf")),
+}
+
+# Removal ratio that rated candidates for each band are dug at. Digs at the
+# Medium ratio rate Easy nearly every time, so Medium candidates are dug like
+# Hard ones and the rater sorts them into bands.
+RATED_DIG_DIFFICULTIES = {
+    EASY_DIFFICULTY: EASY_DIFFICULTY,
+    MEDIUM_DIFFICULTY: HARD_DIFFICULTY,
+    HARD_DIFFICULTY: HARD_DIFFICULTY,
+    EXTREME_DIFFICULTY: EXTREME_DIFFICULTY,
+}
+
+VARIANTS = ("classic", "diagonal")
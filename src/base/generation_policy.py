@@ -0,0 +1,100 @@
+# generation_policy.py
+#
+# Copyright 2025 sepehr-rs
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+import threading
+from collections import deque
+from .constants import DIFFICULTIES
+
+
+def percentile(values, q: float) -> float:
+    """Nearest-rank percentile of `values` for 0 <= q <= 100."""
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    rank = max(0, min(len(ordered) - 1, round(q / 100 * len(ordered)) - 1))
+    return ordered[rank]
+
+
+def easier_difficulty(difficulty: float) -> float | None:
+    """Return the next difficulty notch below `difficulty`, if any."""
+    easier = [d for d in DIFFICULTIES if d < difficulty]
+    return max(easier) if easier else None
+
+
+class GenerationPolicy:
+    """
+    Learns generation latency per (variant, difficulty) and turns it
+    into a timeout budget for the next attempt.
+    """
+
+    DEFAULT_BUDGET = 5.0
+    MIN_BUDGET = 1.0
+    MAX_BUDGET = 10.0
+    # Upper bound on all attempts for one game, including degradation.
+    TOTAL_BUDGET = 15.0
+    HEADROOM = 1.5
+    MIN_SAMPLES = 5
+    HISTORY_SIZE = 50
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._history: dict[tuple[str, float], deque] = {}
+
+    def record(self, variant: str, difficulty: float, seconds: float):
+        with self._lock:
+            history = self._history.setdefault(
+                (variant, difficulty), deque(maxlen=self.HISTORY_SIZE)
+            )
+            history.append(seconds)
+
+    def record_timeout(self, variant: str, difficulty: float, seconds: float):
+        """
+        Record an attempt given up after `seconds`. Its latency is only
+        known to exceed that, so it is kept as a censored sample at
+        `seconds`, which raises the budget when timeouts are common. One
+        shorter than the p95 so far says nothing new and is dropped.
+        """
+        with self._lock:
+            history = self._history.setdefault(
+                (variant, difficulty), deque(maxlen=self.HISTORY_SIZE)
+            )
+            if seconds >= percentile(history, 95):
+                history.append(seconds)
+
+    def percentile(self, variant: str, difficulty: float, q: float) -> float:
+        with self._lock:
+            return percentile(self._history.get((variant, difficulty), ()), q)
+
+    def has_history(self, variant: str, difficulty: float) -> bool:
+        """Whether there are enough samples to learn a budget from."""
+        with self._lock:
+            history = self._history.get((variant, difficulty), ())
+            return len(history) >= self.MIN_SAMPLES
+
+    def budget(self, variant: str, difficulty: float) -> float:
+        """Timeout for one attempt: p95 latency plus headroom, clamped."""
+        with self._lock:
+            samples = list(self._history.get((variant, difficulty), ()))
+        if len(samples) < self.MIN_SAMPLES:
+            return self.DEFAULT_BUDGET
+        budget = percentile(samples, 95) * self.HEADROOM
+        return max(self.MIN_BUDGET, min(self.MAX_BUDGET, budget))
+
+
+generation_policy = GenerationPolicy()
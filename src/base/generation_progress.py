@@ -0,0 +1,69 @@
+# generation_progress.py
+#
+# Copyright 2025 sepehr-rs
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+# Imported by generator workers: keep this module free of gi.
+
+import threading
+import time
+
+# Phases of one generation run, in order.
+GRID = "grid"
+DIG = "dig"
+MINIMIZE = "minimize"
+
+
+class ProgressReporter:
+    """
+    Forwards progress of the running generation to whoever listens: the
+    generator worker sends it up its pipe. Reports closer together than
+    INTERVAL are dropped, except the first one of each phase, so a fast
+    dig does not flood the pipe with messages nobody can render.
+
+    State is per thread, for generation threads that share the process.
+    """
+
+    INTERVAL = 1 / 60
+
+    def __init__(self):
+        self._local = threading.local()
+
+    def connect(self, send):
+        """Call `send(report)` for this thread's reports; None disconnects."""
+        self._local.send = send
+        self.start()
+
+    def start(self):
+        """Forget the previous run's throttling state."""
+        self._local.last = 0.0
+        self._local.phase = None
+
+    def report(self, phase: str, removed: int = 0, checks: int = 0):
+        """`removed` cells blanked so far after `checks` uniqueness searches."""
+        local = self._local
+        send = getattr(local, "send", None)
+        if send is None:
+            return
+        now = time.monotonic()
+        if phase == local.phase and now - local.last < self.INTERVAL:
+            return
+        local.last, local.phase = now, phase
+        send({"phase": phase, "removed": removed, "checks": checks})
+
+
+progress_reporter = ProgressReporter()
@@ -0,0 +1,200 @@
+# generation_telemetry.py
+#
+# Copyright 2025 sepehr-rs
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+import atexit
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+from .generation_policy import percentile
+
+
+class GenerationTelemetry:
+    """
+    The last few hundred generation runs per (variant, difficulty): wall
+    time, solver effort and clue count, or for runs that timed out, the
+    seeds and generator settings needed to reproduce them offline.
+
+    Nothing is recorded until open() names the on-disk store. Runs are
+    written out in batches, SAVE_DELAY seconds after the first unsaved one,
+    from a timer thread, and whatever is left at exit.
+    """
+
+    DEFAULT_PATH = "saves/telemetry.json"
+    RUNS_PER_KEY = 200
+    TIMEOUTS_SHOWN = 5
+    SAVE_DELAY = 10.0
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # Serializes writes, which happen outside `_lock`.
+        self._write_lock = threading.Lock()
+        self.path = None
+        self._runs: dict[tuple[str, float], deque] = {}
+        self._dirty = False
+        self._save_timer = None
+        self._flush_at_exit = False
+
+    def open(self, path: str | None = None):
+        """Start recording, keeping what an earlier session stored."""
+        self.flush()
+        with self._lock:
+            self.path = path or self.DEFAULT_PATH
+            self._runs = {}
+            self._load()
+            if not self._flush_at_exit:
+                atexit.register(self.flush)
+                self._flush_at_exit = True
+
+    def flush(self):
+        """Write unsaved runs to disk now."""
+        with self._lock:
+            if self._save_timer is not None:
+                self._save_timer.cancel()
+                self._save_timer = None
+            if not self._dirty:
+                return
+            self._dirty = False
+            path, state = self.path, self._state()
+        with self._write_lock:
+            _write(path, state)
+
+    def record_run(
+        self, variant: str, difficulty: float, seconds: float, puzzle, effort=None
+    ):
+        """A finished run; `effort` is the worker's {"seconds", "nodes"}."""
+        if self.path is None:
+            return
+        self._record(
+            variant,
+            difficulty,
+            {
+                "seconds": seconds,
+                "compute": effort["seconds"] if effort else None,
+                "nodes": effort["nodes"] if effort else None,
+                "clues": sum(value is not None for row in puzzle for value in row),
+            },
+        )
+
+    def record_timeout(
+        self, variant: str, difficulty: float, seconds: float, params: dict
+    ):
+        """A run that timed out; `params` should be enough to rerun it."""
+        logging.warning(
+            f"Generating {variant} at {difficulty} timed out after "
+            f"{seconds:.1f} s: {params}"
+        )
+        self._record(
+            variant, difficulty, {"seconds": seconds, "timed_out": True, **params}
+        )
+
+    def summary(self) -> str:
+        with self._lock:
+            if self.path is None:
+                return "disabled"
+            runs = {key: list(entries) for key, entries in self._runs.items()}
+        if not runs:
+            return "no runs recorded"
+        lines = [_describe(key, entries) for key, entries in sorted(runs.items())]
+        timeouts = sorted(
+            (
+                (entry["at"], key, entry)
+                for key, entries in runs.items()
+                for entry in entries
+                if entry.get("timed_out")
+            ),
+            key=lambda item: item[0],
+        )
+        shown = self.TIMEOUTS_SHOWN
+        for _, (variant, difficulty), entry in timeouts[-shown:]:
+            params = {k: v for k, v in entry.items() if k not in ("timed_out", "at")}
+            lines.append(f"Timed out: {variant} {difficulty} {params}")
+        return "\n".join(lines)
+
+    def _record(self, variant: str, difficulty: float, entry: dict):
+        with self._lock:
+            if self.path is None:
+                return
+            entries = self._runs.setdefault(
+                (variant, difficulty), deque(maxlen=self.RUNS_PER_KEY)
+            )
+            entry["at"] = round(time.time())
+            entries.append(entry)
+            self._dirty = True
+            if self._save_timer is None:
+                self._save_timer = threading.Timer(self.SAVE_DELAY, self.flush)
+                self._save_timer.daemon = True
+                self._save_timer.start()
+
+    def _load(self):
+        """Read the store. Caller holds the lock."""
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                state = json.load(f)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            logging.warning(f"Ignoring unreadable generation telemetry: {e}")
+            return
+        for slot in state.get("slots", []):
+            key = (slot.get("variant"), slot.get("difficulty"))
+            self._runs[key] = deque(slot.get("runs", []), maxlen=self.RUNS_PER_KEY)
+
+    def _state(self) -> dict:
+        """A snapshot of the store to write. Caller holds the lock."""
+        return {
+            "slots": [
+                {"variant": variant, "difficulty": difficulty, "runs": list(runs)}
+                for (variant, difficulty), runs in self._runs.items()
+            ]
+        }
+
+
+def _write(path: str, state: dict):
+    directory = os.path.dirname(path)
+    tmp_path = f"{path}.tmp"
+    try:
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(state, f)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        logging.warning(f"Could not write generation telemetry: {e}")
+
+
+def _describe(key, entries) -> str:
+    variant, difficulty = key
+    finished = [e for e in entries if not e.get("timed_out")]
+    ms = [e["seconds"] * 1000 for e in finished]
+    nodes = [e["nodes"] for e in finished if e.get("nodes") is not None]
+    clues = [e["clues"] for e in finished]
+    timeouts = len(entries) - len(finished)
+    return (
+        f"{variant} {difficulty}: {len(finished)} runs, "
+        f"p50 {percentile(ms, 50):.0f} ms, p95 {percentile(ms, 95):.0f} ms, "
+        f"p99 {percentile(ms, 99):.0f} ms; median {percentile(nodes, 50):.0f} "
+        f"nodes, {percentile(clues, 50):.0f} clues; "
+        f"{timeouts} timeouts ({timeouts / len(entries):.0%})"
+    )
+
+
+generation_telemetry = GenerationTelemetry()
@@ -17,42 +17,736 @@
 #
 # SPDX-License-Identifier: GPL-3.0-or-later
 
+import copy
+import logging
+import queue
+import random
+import threading
+import time
 from abc import ABC, abstractmethod
-import multiprocessing as mp
+from .bitmask_solver import (
+    BitmaskSolver,
+    UniquenessTracker,
+    minimize,
+    minimize_reports,
+    solver_effort,
+)
+from .constants import (
+    DIFFICULTIES,
+    EASY_DIFFICULTY,
+    EXTREME_DIFFICULTY,
+    HARD_DIFFICULTY,
+    RATED_DIG_DIFFICULTIES,
+)
+from .generation_policy import easier_difficulty, generation_policy
+from .generation_progress import DIG, MINIMIZE, progress_reporter
+from .generation_telemetry import generation_telemetry
+from .generator_pool import (
+    Cancellation,
+    JobPriority,
+    first_successful,
+    get_pool,
+)
+from .grid_transforms import GridTransform, cell_orbits
+from .puzzle_codes import (
+    GENERATOR_VERSION,
+    parse_puzzle_code,
+    puzzle_code,
+    regeneration_cache,
+)
+from .puzzle_rater import band_distance, difficulty_for_score, rate
+
+
+class RaceStats:
+    """Counts how often a seed race was won by a seed other than the first."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.races = 0
+        self.helped = 0
+
+    def record(self, winner_index: int):
+        with self._lock:
+            self.races += 1
+            if winner_index > 0:
+                self.helped += 1
+
+    def summary(self) -> str:
+        with self._lock:
+            rate = self.helped / self.races if self.races else 0.0
+            return f"{self.helped}/{self.races} races won by a backup seed ({rate:.0%})"
+
+
+race_stats = RaceStats()
+
+
+class MinimizeStats:
+    """Totals over clue-minimization passes, recorded as results come in."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.passes = 0
+        self.removed = 0
+        self.seconds = 0.0
+        self.incomplete = 0
+
+    def record(self, report):
+        with self._lock:
+            self.passes += 1
+            self.removed += report.removed
+            self.seconds += report.seconds
+            self.incomplete += not report.complete
+
+    def summary(self) -> str:
+        with self._lock:
+            if not self.passes:
+                return "no minimization passes"
+            return (
+                f"{self.passes} passes removed {self.removed} clues in "
+                f"{self.seconds * 1000 / self.passes:.1f} ms on average; "
+                f"{self.incomplete} hit the time budget"
+            )
+
+
+minimize_stats = MinimizeStats()
+
+
+class DerivationCache:
+    """
+    Streams of puzzles derived from the last freshly generated puzzle,
+    per (variant, difficulty). Shared by all generator instances.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # (variant, difficulty) -> (next derived puzzle, rest of the stream)
+        self._streams = {}
+        self.derived = 0
+
+    def store(self, variant: str, difficulty: float, stream):
+        # Derive one ahead, so has() knows whether the stream is spent.
+        with self._lock:
+            self._streams.pop((variant, difficulty), None)
+            self._advance((variant, difficulty), stream)
+
+    def take(self, variant: str, difficulty: float):
+        """Next derived (puzzle, solution), or None once the stream is spent."""
+        with self._lock:
+            entry = self._streams.pop((variant, difficulty), None)
+            if entry is None:
+                return None
+            derived, stream = entry
+            self._advance((variant, difficulty), stream)
+            self.derived += 1
+            return derived
+
+    def has(self, variant: str, difficulty: float) -> bool:
+        """Whether take() would return a puzzle."""
+        with self._lock:
+            return (variant, difficulty) in self._streams
+
+    def clear(self):
+        with self._lock:
+            self._streams.clear()
+
+    def _advance(self, key, stream):
+        following = next(stream, None)
+        if following is not None:
+            self._streams[key] = (following, stream)
+
+
+derivation_cache = DerivationCache()
+
+
+class RatedSideCache:
+    """
+    Rated candidates that missed the band they were generated for, kept
+    per (variant, difficulty of the band they did land in).
+    """
+
+    PER_BAND = 5
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._candidates = {}
+
+    def put(self, variant: str, candidate):
+        """Keep `candidate` = (puzzle, solution, score), dropping the oldest."""
+        key = (variant, difficulty_for_score(candidate[2]))
+        with self._lock:
+            kept = self._candidates.setdefault(key, [])
+            kept.append(candidate)
+            del kept[: -self.PER_BAND]
+
+    def take(self, variant: str, difficulty: float):
+        with self._lock:
+            kept = self._candidates.get((variant, difficulty))
+            return kept.pop() if kept else None
+
+    def count(self, variant: str, difficulty: float) -> int:
+        with self._lock:
+            return len(self._candidates.get((variant, difficulty), ()))
+
+    def clear(self):
+        with self._lock:
+            self._candidates.clear()
+
+
+rated_side_cache = RatedSideCache()
+
+
+class _NestedPuzzles:
+    """
+    Pool task wrapping a generator: one dig yields a puzzle per difficulty,
+    returned as {difficulty: (puzzle, solution)}.
+    """
+
+    def __init__(self, generator):
+        self.generator = generator
+
+    def _generate_impl(self, difficulty: float, seed: int | None = None):
+        return self.generator._generate_nested_impl(seed)
+
+
+class _RatedCandidate:
+    """
+    Pool task wrapping a generator: digs at the given removal ratio and
+    rates the result inside the worker, returning (puzzle, solution, score).
+    """
+
+    def __init__(self, generator):
+        self.generator = generator
+
+    def _generate_impl(self, difficulty: float, seed: int | None = None):
+        puzzle, solution = self.generator._generate_impl(difficulty, seed)
+        rating = rate(puzzle, self.generator.diagonal, solution)
+        return puzzle, solution, rating.score
+
+
+def _phase(job) -> str | None:
+    return job.progress["phase"] if job.progress else None
+
+
+def _degradation_ladder(difficulty: float):
+    """Requested difficulty, a retry with a new seed, then easier notches."""
+    yield difficulty
+    yield difficulty
+    while (difficulty := easier_difficulty(difficulty)) is not None:
+        yield difficulty
 
 
 class GeneratorBase(ABC):
-    """Abstract puzzle generator with optional multiprocessing."""
+    """Abstract puzzle generator backed by a warm pool of worker processes."""
+
+    variant: str = "unknown"
+    # Whether both main diagonals are constrained like rows and columns.
+    diagonal: bool = False
+    # "native" digs with BitmaskSolver; "engine" defers to sudoku-engine.
+    solver_backend: str = "native"
+    # The backends this variant's `_generate_impl` implements.
+    solver_backends: tuple[str, ...] = ("native",)
+
+    # Number of seeds raced against each other for slow difficulties.
+    # A value of 1 disables racing.
+    race_seeds: int = 3
+    race_min_difficulty: float = HARD_DIFFICULTY
+
+    # Puzzles handed out as symmetry transforms of each fresh puzzle at
+    # slow difficulties before generating a new one. 0 disables deriving.
+    derivations_per_puzzle: int = 20
+    derive_min_difficulty: float = HARD_DIFFICULTY
 
-    def generate(self, difficulty: float, timeout: int = 5):
+    # Puzzles at or above this difficulty get a clue-minimization pass in
+    # the worker, limited to minimize_budget seconds. 0 disables it.
+    minimize_min_difficulty: float = EXTREME_DIFFICULTY
+    minimize_budget: float = 1.0
+
+    # Clue layout symmetry: None, or a key of grid_transforms.SYMMETRIES.
+    symmetry: str | None = None
+
+    # Class settings changed at runtime (see application.py) that must
+    # travel with pickled generators to the worker processes.
+    _worker_settings = ("symmetry", "minimize_budget")
+
+    # Pick puzzles by rater score band instead of by fraction of cells
+    # removed; see generate_rated().
+    rated_difficulty: bool = False
+    rated_budget: float = 5.0
+    rated_parallel: int = 3
+
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        for name in self._worker_settings:
+            state.setdefault(name, getattr(self, name))
+        return state
+
+    def generate(
+        self,
+        difficulty: float,
+        timeout: int = 5,
+        race: int | None = None,
+        priority: JobPriority = JobPriority.INTERACTIVE,
+    ):
         """
-        Run the variant's `_generate_impl` in a subprocess with timeout.
+        Run the variant's `_generate_impl` on a pooled worker with timeout.
+        Background jobs yield their worker to interactive ones. At slow
+        difficulties, later calls are served by transforms of the result.
         Returns (puzzle, solution).
         """
-        queue = mp.Queue()
-        process = mp.Process(target=self._generate_worker, args=(queue, difficulty))
-        process.start()
-        process.join(timeout)
+        puzzle, solution, _ = self.generate_seeded(difficulty, timeout, race, priority)
+        return puzzle, solution
+
+    def generate_seeded(
+        self,
+        difficulty: float,
+        timeout: int = 5,
+        race: int | None = None,
+        priority: JobPriority = JobPriority.INTERACTIVE,
+        on_progress=None,
+        cancellation: Cancellation | None = None,
+    ):
+        """
+        Like generate(), but returns (puzzle, solution, seed), where seed
+        reproduces the puzzle through `_generate_impl`. It is None for
+        puzzles derived from another one. `on_progress(report)` receives
+        the first seed's progress reports, from the pool's thread.
+        Cancelling `cancellation` kills the jobs.
+        """
+        derived = self._take_derived(difficulty)
+        if derived:
+            return (*derived, None)
+        return self.generate_fresh(
+            difficulty, timeout, race, priority, on_progress, cancellation
+        )
+
+    def generate_fresh(
+        self,
+        difficulty: float,
+        timeout: float = 5,
+        race: int | None = None,
+        priority: JobPriority = JobPriority.INTERACTIVE,
+        on_progress=None,
+        cancellation: Cancellation | None = None,
+    ):
+        """generate_seeded(), always generating rather than deriving."""
+        jobs = self._submit_seeded(
+            difficulty, race, priority, on_progress, cancellation
+        )
+        started = time.monotonic()
+        try:
+            job = self._race(jobs, difficulty, timeout)
+        except TimeoutError:
+            self._record_timeout(jobs, difficulty, started, timeout)
+            raise
+        return self._accept(jobs, job, difficulty, started)
+
+    def generate_adaptive(
+        self,
+        difficulty: float,
+        on_progress=None,
+        cancellation: Cancellation | None = None,
+        within: float | None = None,
+    ):
+        """
+        Generate within a bounded time, degrading instead of failing.
+        Each attempt gets a timeout learned from past latencies. After a
+        timeout we retry with a new seed, then step down one difficulty
+        notch at a time, all within `within` seconds if given (see
+        _attempts()). Returns (puzzle, solution, actual_difficulty, seed);
+        the rest are as in generate_seeded(), except that a cancelled
+        generation raises GenerationCancelled.
+        """
+        last_error = None
+        attempts = self._attempts(difficulty, within)
+        for attempt, (target, timeout) in enumerate(attempts):
+            if attempt:
+                self._log_degrading(difficulty, target, attempt, last_error)
+
+            # Derived puzzles are free; keep them out of the latency history.
+            derived = self._take_derived(target)
+            if derived:
+                return *derived, target, None
+
+            started = time.monotonic()
+            try:
+                puzzle, solution, seed = self.generate_seeded(
+                    target,
+                    timeout=timeout,
+                    on_progress=on_progress,
+                    cancellation=cancellation,
+                )
+            except (TimeoutError, RuntimeError) as e:
+                if cancellation is not None:
+                    cancellation.check()
+                if isinstance(e, TimeoutError):
+                    generation_policy.record_timeout(
+                        self.variant, target, time.monotonic() - started
+                    )
+                last_error = e
+                continue
+            generation_policy.record(self.variant, target, time.monotonic() - started)
+            return puzzle, solution, target, seed
+        raise RuntimeError(f"Failed to generate puzzle: {last_error}")
+
+    # The steps of generate_seeded() and generate_adaptive(), shared with
+    # main_loop_generation, which waits on the jobs without a thread.
+
+    def _submit_seeded(
+        self,
+        difficulty: float,
+        race: int | None = None,
+        priority: JobPriority = JobPriority.INTERACTIVE,
+        on_progress=None,
+        cancellation: Cancellation | None = None,
+    ) -> list:
+        """Submit the jobs of one generate_seeded() call."""
+        if race is None:
+            race = self.race_seeds if difficulty >= self.race_min_difficulty else 1
+        pool = get_pool()
+        jobs = [
+            pool.submit(
+                self, difficulty, seed=random.randint(1, 1_000_000), priority=priority
+            )
+            for _ in range(max(1, min(race, pool.max_workers)))
+        ]
+        if on_progress is not None:
+            jobs[0].add_progress_callback(on_progress)
+        if cancellation is not None:
+            for job in jobs:
+                cancellation.add(job.cancel)
+        return jobs
+
+    def _accept(self, jobs, job, difficulty: float, started: float):
+        """
+        Take the result of `job`, the winner among `jobs`, which have all
+        been cancelled. Returns (puzzle, solution, seed).
+        """
+        if len(jobs) > 1:
+            race_stats.record(jobs.index(job))
+            logging.debug(
+                f"Seed race at {difficulty} won by seed #{jobs.index(job)}; "
+                f"{race_stats.summary()}"
+            )
+        result, seed = job.result(0), job.seed
+        seconds = time.monotonic() - started
+        logging.debug(
+            f"Generated {self.variant} at {difficulty} from seed {seed} in "
+            f"{seconds * 1000:.0f} ms ({job.effort})"
+        )
+        generation_telemetry.record_run(
+            self.variant, difficulty, seconds, result[0], job.effort
+        )
+        # Minimization ran in the worker; its reports come back with the effort.
+        for report in (job.effort or {}).get("minimize", ()):
+            minimize_stats.record(report)
+        if self._derives(difficulty):
+            derivation_cache.store(
+                self.variant,
+                difficulty,
+                self.derive(*result, count=self.derivations_per_puzzle),
+            )
+        return (*result, seed)
+
+    def _record_timeout(self, jobs, difficulty: float, started: float, timeout):
+        generation_telemetry.record_timeout(
+            self.variant,
+            difficulty,
+            time.monotonic() - started,
+            {
+                **self._reproduction_params([j.seed for j in jobs], timeout),
+                "progress": [j.progress for j in jobs],
+            },
+        )
+
+    def _minimizing(self, jobs) -> bool:
+        """
+        Whether one of `jobs` has reached minimization. Its puzzle is
+        already dug and it ends within `minimize_budget`, so on timeout
+        it is given that much longer rather than thrown away.
+        """
+        return any(_phase(job) == MINIMIZE for job in jobs)
+
+    def _attempts(self, difficulty: float, within: float | None = None):
+        """
+        Yield (target, timeout) for each attempt of generate_adaptive(),
+        keeping the attempts together within `within` seconds, or the
+        policy's total budget. Steps that no longer fit are skipped, but
+        Easy always gets a try, so there is a puzzle in bounded time.
+        """
+        if within is None:
+            within = generation_policy.TOTAL_BUDGET
+        deadline = time.monotonic() + within
+        for target in _degradation_ladder(difficulty):
+            timeout = min(
+                generation_policy.budget(self.variant, target),
+                deadline - time.monotonic(),
+            )
+            if timeout <= 0:
+                if target != EASY_DIFFICULTY:
+                    continue
+                timeout = generation_policy.MIN_BUDGET
+            yield target, timeout
+
+    def _log_degrading(self, difficulty, target, attempt: int, error):
+        logging.warning(
+            f"Degrading {self.variant} generation ({error}): "
+            f"attempt {attempt + 1} at {target}, requested {difficulty}"
+        )
+
+    def generate_nested(
+        self,
+        timeout: float = 5,
+        priority: JobPriority = JobPriority.INTERACTIVE,
+    ) -> dict:
+        """
+        Generate one solution grid and dig it once, returning a puzzle for
+        each difficulty in DIFFICULTIES as {difficulty: (puzzle, solution,
+        seed)}. Each is what `_generate_impl(difficulty, seed)` would give.
+        A difficulty whose target the dig could not reach may be missing.
+        """
+        seed = random.randint(1, 1_000_000)
+        job = get_pool().submit(
+            _NestedPuzzles(self), max(DIFFICULTIES), seed=seed, priority=priority
+        )
+        puzzles = job.result(timeout)
+        return {difficulty: (*pair, seed) for difficulty, pair in puzzles.items()}
+
+    def generate_rated(
+        self,
+        difficulty: float,
+        budget: float | None = None,
+        priority: JobPriority = JobPriority.INTERACTIVE,
+        cancellation: Cancellation | None = None,
+    ):
+        """
+        Generate candidates in parallel until one's rater score falls in the
+        RATING_BANDS entry for `difficulty`. Candidates for other bands go
+        to the side cache, which later calls for those bands draw on first.
+        When `budget` seconds run out, the closest candidate so far is
+        returned. Returns (puzzle, solution, score). Cancelling
+        `cancellation` stops the search with GenerationCancelled.
+        """
+        cached = rated_side_cache.take(self.variant, difficulty)
+        if cached:
+            return cached
+        deadline = time.monotonic() + (budget or self.rated_budget)
+        best = self._rated_search(
+            difficulty, deadline, priority, cancellation or Cancellation()
+        )
+        if best is None:
+            raise TimeoutError("No rated puzzle within the latency budget")
+        if band_distance(best[2], difficulty):
+            logging.warning(
+                f"No {self.variant} puzzle rated for {difficulty} in time; "
+                f"using the closest, scored {best[2]}"
+            )
+        return best
+
+    def _rated_search(self, difficulty, deadline, priority, cancellation):
+        pool = get_pool()
+        task = _RatedCandidate(self)
+        dig = RATED_DIG_DIFFICULTIES[difficulty]
+        finished = queue.Queue()
+
+        def submit():
+            job = pool.submit(
+                task, dig, seed=random.randint(1, 1_000_000), priority=priority
+            )
+            job.add_done_callback(finished.put)
+            cancellation.add(job.cancel)
+            return job
+
+        running = {submit() for _ in range(min(self.rated_parallel, pool.max_workers))}
+        best = None
+        try:
+            while True:
+                try:
+                    job = finished.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                cancellation.check()
+                running.discard(job)
+                if job.succeeded():
+                    best = self._keep_closest(best, job.result(0), difficulty)
+                    if not band_distance(best[2], difficulty):
+                        break
+                running.add(submit())
+        finally:
+            for job in running:
+                job.cancel()
+        return best
+
+    def _keep_closest(self, best, candidate, difficulty):
+        """Return the closer of the two; the other goes to the side cache."""
+        if best is None:
+            return candidate
+        if band_distance(candidate[2], difficulty) < band_distance(best[2], difficulty):
+            best, candidate = candidate, best
+        rated_side_cache.put(self.variant, candidate)
+        return best
+
+    def _race(self, jobs, difficulty, timeout):
+        """
+        Return the first of `jobs` to finish with a valid result, and
+        cancel the others. Jobs that are minimizing get extra time.
+        """
+        try:
+            try:
+                return first_successful(jobs, timeout)
+            except TimeoutError:
+                if not self._minimizing(jobs):
+                    raise
+                logging.debug(f"Extending generation at {difficulty} to minimize")
+                return first_successful(jobs, self.minimize_budget)
+        finally:
+            for job in jobs:
+                job.cancel()
+
+    def derive(self, puzzle, solution, count: int, seed: int | None = None):
+        """
+        Yield up to `count` (puzzle, solution) pairs obtained by applying
+        random validity-preserving transforms to `puzzle` and `solution`.
+        Givens and solving steps map one-to-one, so difficulty is unchanged.
+        """
+        rng = random.Random(seed)
+        for _ in range(count):
+            if self.diagonal:
+                transform = GridTransform.random_diagonal(rng)
+            else:
+                transform = GridTransform.random_classic(rng)
+            yield transform.apply(puzzle), transform.apply(solution)
+
+    def _derives(self, difficulty: float) -> bool:
+        # Band and line permutations would break symmetric clue layouts.
+        return (
+            self.derivations_per_puzzle > 0
+            and difficulty >= self.derive_min_difficulty
+            and self.symmetry is None
+        )
+
+    def puzzle_code(self, difficulty: float, seed: int | None) -> str | None:
+        """
+        Shareable code regenerating the puzzle from `seed`, or None if it
+        cannot: no seed, or sudoku-engine's own (unversioned) generator.
+        """
+        if seed is None or self.solver_backend != "native":
+            return None
+        return puzzle_code(self.variant, difficulty, seed, self.symmetry)
+
+    def check_puzzle_code(self, code: str | None):
+        """
+        Parse a puzzle code this generator can regenerate, as
+        parse_puzzle_code() does. Raises ValueError otherwise.
+        """
+        if not code:
+            raise ValueError("No puzzle code")
+        parsed = parse_puzzle_code(code)
+        if parsed[0] != self.variant:
+            raise ValueError(f"Puzzle code {code!r} is not for {self.variant}")
+        return parsed
+
+    def regenerate(self, code: str):
+        """
+        Rebuild (puzzle, solution) from a puzzle code, in this process.
+        Recently regenerated codes are served from the on-disk cache.
+        Raises ValueError for codes of another variant or generator version.
+        """
+        cached = regeneration_cache.get(code)
+        if cached:
+            return cached
+        _, difficulty, seed, symmetry = self.check_puzzle_code(code)
+        generator = copy.copy(self)
+        generator.symmetry = symmetry
+        puzzle, solution = generator._generate_impl(difficulty, seed)
+        logging.debug(f"Regenerated {code} in {solver_effort.take()} solver nodes")
+        for report in minimize_reports.take():
+            minimize_stats.record(report)
+        regeneration_cache.put(code, puzzle, solution)
+        return puzzle, solution
+
+    def _reproduction_params(self, seeds, timeout: float) -> dict:
+        """What it takes to rerun a timed-out generation offline."""
+        return {
+            "seeds": seeds,
+            "timeout": timeout,
+            "backend": self.solver_backend,
+            "symmetry": self.symmetry,
+            "minimize_budget": self.minimize_budget,
+            "generator_version": GENERATOR_VERSION,
+        }
+
+    def _take_derived(self, difficulty: float):
+        if not self._derives(difficulty):
+            return None
+        return derivation_cache.take(self.variant, difficulty)
+
+    def _make_solver(self) -> BitmaskSolver:
+        return solver_effort.track(BitmaskSolver(diagonal=self.diagonal))
+
+    def _dig_holes(self, solution, difficulty: float, rng: random.Random):
+        """
+        Blank cells of `solution` in random order, keeping each removal
+        only if the puzzle still has a unique solution.
+        """
+        return self._dig_nested(solution, (difficulty,), rng)[difficulty]
+
+    def _dig_nested(self, solution, difficulties, rng: random.Random) -> dict:
+        """
+        Dig `solution` once, keeping a snapshot as the removed-cell count
+        reaches each difficulty's target, so every easier puzzle is a clue
+        superset of the harder ones. Targets out of reach are skipped,
+        except the hardest, which gets the final puzzle. With `symmetry`
+        set, cells are removed in symmetric pairs.
+        """
+        size = len(solution)
+        tracker = UniquenessTracker(self._make_solver(), solution)
+        targets = sorted((int(d * size * size), d) for d in difficulties)
+        order = cell_orbits(self.symmetry)
+        rng.shuffle(order)
+        orbits = iter(order)
 
-        if process.is_alive():
-            process.terminate()
-            process.join()
-            raise TimeoutError("Puzzle generation timed out")
+        puzzles = {}
+        removed = 0
+        for target, difficulty in targets:
+            while removed < target and (orbit := next(orbits, None)) is not None:
+                if tracker.remove_group(orbit):
+                    removed += len(orbit)
+                progress_reporter.report(DIG, removed, tracker.checks)
+            if removed >= target:
+                puzzles[difficulty] = tracker.puzzle()
+        puzzles.setdefault(targets[-1][1], tracker.puzzle())
+        return puzzles
 
-        if not queue.empty():
-            return queue.get()
-        raise RuntimeError("Failed to generate puzzle")
+    def _minimize(self, puzzle, solution, difficulty: float):
+        """Drop clues until the puzzle is minimal, for slow difficulties."""
+        if self.minimize_budget <= 0 or difficulty < self.minimize_min_difficulty:
+            return puzzle
+        if self.symmetry is not None:
+            # Single-clue removals would break the layout; a symmetric dig
+            # that ran out of pairs is already minimal among symmetric ones.
+            return puzzle
+        progress_reporter.report(MINIMIZE)
+        puzzle, report = minimize(
+            self._make_solver(), puzzle, solution, self.minimize_budget
+        )
+        minimize_reports.add(report)
+        logging.debug(
+            f"Minimized {self.variant} puzzle: {report.removed} of "
+            f"{report.tested} clues removed in {report.seconds * 1000:.1f} ms"
+        )
+        return puzzle
 
-    def _generate_worker(self, queue, difficulty: float):
-        puzzle, solution = self._generate_impl(difficulty)
-        queue.put((puzzle, solution))
+    def _generate_nested_impl(self, seed: int | None = None) -> dict:
+        """Variants that can dig nested puzzles override this."""
+        raise NotImplementedError(f"{type(self).__name__} cannot dig nested")
 
     @abstractmethod
     def _generate_impl(
-        self, difficulty: float
+        self, difficulty: float, seed: int | None = None
     ) -> tuple[list[list[int]], list[list[int]]]:
         """
         Must be implemented by variants.
-        Return (puzzle, solution) as 2D lists.
+        Return (puzzle, solution) as 2D lists. A random seed is drawn
+        when `seed` is None.
         """
         pass
@@ -0,0 +1,596 @@
+# generator_pool.py
+#
+# Copyright 2025 sepehr-rs
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+import asyncio
+import atexit
+import heapq
+import itertools
+import logging
+import multiprocessing as mp
+import queue
+import threading
+import time
+from collections import Counter
+from enum import IntEnum
+from multiprocessing.connection import wait
+from . import generator_worker
+from .resource_governor import resource_governor
+
+
+class GenerationCancelled(Exception):
+    """Raised by `GenerationJob.result` when the job was cancelled."""
+
+
+class JobPriority(IntEnum):
+    """Scheduling class of a generation job; lower values run first."""
+
+    INTERACTIVE = 0
+    BACKGROUND = 1
+
+
+class Cancellation:
+    """
+    Cancels all the work registered with it at once, e.g. every job of a
+    game start the user backed out of. Safe to use from any thread.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._cancels = []
+        self.cancelled = False
+
+    def add(self, cancel):
+        """Call `cancel()` on cancel(), or now if that already happened."""
+        with self._lock:
+            if not self.cancelled:
+                self._cancels.append(cancel)
+                return
+        cancel()
+
+    def cancel(self):
+        with self._lock:
+            if self.cancelled:
+                return
+            self.cancelled = True
+            cancels, self._cancels = self._cancels, []
+        for cancel in cancels:
+            cancel()
+
+    def check(self):
+        """Raise GenerationCancelled if cancel() was called."""
+        if self.cancelled:
+            raise GenerationCancelled("Puzzle generation cancelled")
+
+
+class _WorkerStats:
+    """Start latency and memory of the workers this pool has booted."""
+
+    def __init__(self):
+        self.started = 0
+        self.total_boot = 0.0
+        self.max_boot = 0.0
+        self.max_rss_kb = 0
+        self.gi_loaded = False
+
+    def record_ready(self, boot_seconds: float, report: dict):
+        self.started += 1
+        self.total_boot += boot_seconds
+        self.max_boot = max(self.max_boot, boot_seconds)
+        self.max_rss_kb = max(self.max_rss_kb, report.get("rss_kb", 0))
+        self.gi_loaded = self.gi_loaded or report.get("gi_loaded", False)
+
+    def as_dict(self) -> dict:
+        return {
+            "started": self.started,
+            "mean_boot": self.total_boot / self.started if self.started else 0.0,
+            "max_boot": self.max_boot,
+            "max_rss_kb": self.max_rss_kb,
+            "gi_loaded": self.gi_loaded,
+        }
+
+
+class _PriorityStats:
+    """Wait-time and preemption counters for one priority class."""
+
+    def __init__(self):
+        self.started = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.preempted = 0
+
+    def record_wait(self, seconds: float):
+        self.started += 1
+        self.total_wait += seconds
+        self.max_wait = max(self.max_wait, seconds)
+
+    def as_dict(self, queued: int, running: int) -> dict:
+        return {
+            "queued": queued,
+            "running": running,
+            "started": self.started,
+            "mean_wait": self.total_wait / self.started if self.started else 0.0,
+            "max_wait": self.max_wait,
+            "preempted": self.preempted,
+        }
+
+
+def _context():
+    """
+    Prefer forkserver, then spawn: forking the GTK process would clone its
+    GL context, widgets and fds, and is unsafe once threads are running.
+    """
+    methods = mp.get_all_start_methods()
+    ctx = mp.get_context("forkserver" if "forkserver" in methods else "spawn")
+    if ctx.get_start_method() == "forkserver":
+        ctx.set_forkserver_preload([generator_worker.__name__, "sudoku"])
+    return ctx
+
+
+class _Worker:
+    """A warm generator subprocess and the parent end of its pipe."""
+
+    _ctx = None
+
+    def __init__(self):
+        if _Worker._ctx is None:
+            _Worker._ctx = _context()
+        self.conn, child_conn = mp.Pipe()
+        self.started_at = time.monotonic()
+        # Set once the worker has lowered its own scheduling priority.
+        self.demoted = False
+        self.process = _Worker._ctx.Process(
+            target=generator_worker.main,
+            args=(child_conn, resource_governor),
+            daemon=True,
+        )
+        self.process.start()
+        child_conn.close()
+
+    def stop(self):
+        if self.process.is_alive():
+            self.process.terminate()
+        self.process.join()
+        self.conn.close()
+
+
+class GenerationJob:
+    """Handle for one submitted generation request."""
+
+    def __init__(
+        self,
+        pool,
+        generator,
+        difficulty: float,
+        seed: int | None = None,
+        priority: JobPriority = JobPriority.INTERACTIVE,
+    ):
+        self._pool = pool
+        self.generator = generator
+        self.difficulty = difficulty
+        self.seed = seed
+        self.priority = priority
+        self.submitted_at = time.monotonic()
+        self._done = threading.Event()
+        self._result = None
+        self._error = None
+        # What the worker reported for a successful run: {"seconds", "nodes",
+        # "minimize"}, the last being the MinimizeReports of the run.
+        self.effort = None
+        # Latest {"phase", "removed", "checks"} report of the running job.
+        self.progress = None
+        self._callbacks = []
+        self._progress_callbacks = []
+        self._callbacks_lock = threading.Lock()
+
+    def done(self) -> bool:
+        return self._done.is_set()
+
+    def succeeded(self) -> bool:
+        return self.done() and self._error is None
+
+    def add_done_callback(self, callback):
+        """Call `callback(job)` once the job finishes, from any thread."""
+        with self._callbacks_lock:
+            if not self._done.is_set():
+                self._callbacks.append(callback)
+                return
+        callback(self)
+
+    def add_progress_callback(self, callback):
+        """
+        Call `callback(report)` with each progress report of the job, from
+        the pool's collector thread. Reports are throttled by the worker.
+        """
+        with self._callbacks_lock:
+            self._progress_callbacks.append(callback)
+
+    def cancel(self):
+        """Stop the job, killing its worker if it is already running."""
+        self._pool._cancel(self)
+
+    def promote(self):
+        """
+        Run as an interactive job from now on, e.g. once the user waits.
+        If it is running at background priority, it starts over at normal
+        priority.
+        """
+        self._pool._set_priority(self, JobPriority.INTERACTIVE)
+
+    def result(self, timeout: float | None = None):
+        """
+        Wait for (puzzle, solution). On timeout the job is cancelled
+        and TimeoutError is raised.
+        """
+        if not self._done.wait(timeout):
+            self.cancel()
+            raise TimeoutError("Puzzle generation timed out")
+        if self._error is not None:
+            raise self._error
+        return self._result
+
+    def __await__(self):
+        """
+        Wait for (puzzle, solution) from a coroutine on any asyncio loop.
+        Cancelling the awaiting task cancels the job.
+        """
+        return self._wait_async().__await__()
+
+    async def _wait_async(self):
+        loop = asyncio.get_running_loop()
+        finished = loop.create_future()
+
+        def wake(_job):
+            try:
+                loop.call_soon_threadsafe(_settle, finished)
+            except RuntimeError:
+                pass  # The loop was closed while the job ran.
+
+        self.add_done_callback(wake)
+        try:
+            await finished
+        except asyncio.CancelledError:
+            self.cancel()
+            raise
+        return self.result(0)
+
+    def _report_progress(self, report: dict):
+        with self._callbacks_lock:
+            if self._done.is_set():
+                return
+            self.progress = report
+            callbacks = list(self._progress_callbacks)
+        for callback in callbacks:
+            callback(report)
+
+    def _resolve(self, result=None, error=None, effort=None):
+        with self._callbacks_lock:
+            if self._done.is_set():
+                return
+            self._result = result
+            self._error = error
+            self.effort = effort
+            self._done.set()
+            callbacks, self._callbacks = self._callbacks, []
+            self._progress_callbacks = []
+        for callback in callbacks:
+            callback(self)
+
+
+class GeneratorPool:
+    """
+    Long-lived pool of generator subprocesses.
+
+    Workers are started lazily on first use and stay warm between games.
+    A single collector thread waits on all busy workers' pipes and hands
+    results back to the matching `GenerationJob`.
+
+    Queued jobs run in priority order. An interactive job that finds
+    every worker busy preempts a running background job, which is put
+    back in the queue and restarted later.
+    """
+
+    def __init__(self, max_workers: int | None = None):
+        self.max_workers = max_workers or resource_governor.worker_count()
+        self._lock = threading.Lock()
+        self._idle: list[_Worker] = []
+        self._busy: dict = {}  # worker conn -> (worker, job)
+        self._pending: list = []  # heap of (priority, sequence, job)
+        self._sequence = itertools.count()
+        self._dead: list[_Worker] = []
+        self._wakeup_r, self._wakeup_w = mp.Pipe(duplex=False)
+        self._collector = None
+        self._closed = False
+        self._stats = {p: _PriorityStats() for p in JobPriority}
+        self._worker_stats = _WorkerStats()
+
+    def submit(
+        self,
+        generator,
+        difficulty: float,
+        seed: int | None = None,
+        priority: JobPriority = JobPriority.INTERACTIVE,
+    ) -> GenerationJob:
+        job = GenerationJob(self, generator, difficulty, seed, priority)
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("Generator pool is shut down")
+            self._ensure_collector()
+            self._enqueue(job)
+            if priority == JobPriority.INTERACTIVE and not self._has_capacity():
+                self._preempt_background()
+            self._dispatch_pending()
+        return job
+
+    def stats(self) -> dict:
+        """
+        Queue depth, running jobs and wait times per priority class,
+        plus worker boot latency and memory under "workers".
+        """
+        with self._lock:
+            queued = Counter(job.priority for _, _, job in self._pending)
+            running = Counter(job.priority for _, job in self._busy.values())
+            stats = {
+                priority.name.lower(): self._stats[priority].as_dict(
+                    queued[priority], running[priority]
+                )
+                for priority in JobPriority
+            }
+            stats["workers"] = self._worker_stats.as_dict()
+            return stats
+
+    def shutdown(self):
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            workers = self._idle + [w for w, _ in self._busy.values()] + self._dead
+            jobs = [j for _, _, j in self._pending]
+            jobs += [j for _, j in self._busy.values()]
+            self._idle, self._busy, self._dead, self._pending = [], {}, [], []
+            self._wake()
+        for job in jobs:
+            job._resolve(error=GenerationCancelled("Generator pool shut down"))
+        for worker in workers:
+            worker.stop()
+
+    def _worker_count(self) -> int:
+        return len(self._idle) + len(self._busy)
+
+    def _has_capacity(self) -> bool:
+        return bool(self._idle) or self._worker_count() < self.max_workers
+
+    def _ensure_collector(self):
+        if self._collector is None:
+            self._collector = threading.Thread(
+                target=self._collect_loop, name="generator-pool", daemon=True
+            )
+            self._collector.start()
+
+    def _wake(self):
+        self._wakeup_w.send(None)
+
+    def _enqueue(self, job: GenerationJob):
+        heapq.heappush(self._pending, (job.priority, next(self._sequence), job))
+
+    def _dispatch(self, job: GenerationJob):
+        """Hand `job` to an idle or new worker. Caller holds the lock."""
+        background = job.priority == JobPriority.BACKGROUND
+        task = (job.generator, job.difficulty, job.seed, background)
+        worker = self._take_idle(background)
+        try:
+            worker.conn.send(task)
+        except (BrokenPipeError, OSError):
+            logging.warning("Generator worker died while idle; respawning")
+            self._dead.append(worker)
+            worker = _Worker()
+            worker.conn.send(task)
+        worker.demoted = worker.demoted or background
+        self._busy[worker.conn] = (worker, job)
+        self._stats[job.priority].record_wait(time.monotonic() - job.submitted_at)
+        self._wake()
+
+    def _take_idle(self, background: bool) -> _Worker:
+        """
+        Pick an idle worker for a job. Demoted workers only take background
+        jobs; if one is all that is idle for an interactive job, it is
+        replaced by a fresh worker. Caller holds the lock.
+        """
+        for worker in reversed(self._idle):
+            if worker.demoted == background:
+                self._idle.remove(worker)
+                return worker
+        if self._idle and background:
+            return self._idle.pop()
+        if self._idle and self._worker_count() >= self.max_workers:
+            self._dead.append(self._idle.pop())
+        return _Worker()
+
+    def _dispatch_pending(self):
+        while self._pending and self._has_capacity():
+            _, _, job = heapq.heappop(self._pending)
+            self._dispatch(job)
+
+    def _stop_running(self, job: GenerationJob) -> bool:
+        """Kill the worker running `job`. Caller holds the lock."""
+        for conn, (worker, busy_job) in self._busy.items():
+            if busy_job is job:
+                del self._busy[conn]
+                worker.process.terminate()
+                self._dead.append(worker)
+                return True
+        return False
+
+    def _preempt_background(self):
+        """Make room for an interactive job. Caller holds the lock."""
+        for _, job in list(self._busy.values()):
+            if job.priority == JobPriority.BACKGROUND:
+                self._stop_running(job)
+                self._enqueue(job)
+                self._stats[job.priority].preempted += 1
+                logging.debug("Preempted a background generation job")
+                return
+
+    def _set_priority(self, job: GenerationJob, priority: JobPriority):
+        """
+        Re-sort the queue. A promoted job running on a demoted worker
+        cannot have that worker's priority raised again, so it is
+        restarted on a normal one, from the same seed.
+        """
+        with self._lock:
+            job.priority = priority
+            self._pending = [(j.priority, n, j) for _, n, j in self._pending]
+            heapq.heapify(self._pending)
+            if priority == JobPriority.INTERACTIVE and self._runs_demoted(job):
+                self._stop_running(job)
+                self._enqueue(job)
+                logging.debug("Restarting a promoted job on a normal worker")
+                self._dispatch_pending()
+                self._wake()
+
+    def _runs_demoted(self, job: GenerationJob) -> bool:
+        """Whether `job` is running on a demoted worker. Caller holds the lock."""
+        return any(
+            busy_job is job and worker.demoted
+            for worker, busy_job in self._busy.values()
+        )
+
+    def _cancel(self, job: GenerationJob):
+        with self._lock:
+            queued = [entry for entry in self._pending if entry[2] is not job]
+            if len(queued) != len(self._pending):
+                self._pending = queued
+                heapq.heapify(self._pending)
+            elif self._stop_running(job):
+                self._dispatch_pending()
+            self._wake()
+        job._resolve(error=GenerationCancelled("Puzzle generation cancelled"))
+
+    def _record_ready(self, worker: _Worker, report: dict):
+        boot_seconds = time.monotonic() - worker.started_at
+        self._worker_stats.record_ready(boot_seconds, report)
+        logging.debug(
+            f"Generator worker {worker.process.pid} ready in "
+            f"{boot_seconds * 1000:.0f} ms, {report['rss_kb']} KiB RSS"
+        )
+        if report.get("gi_loaded"):
+            logging.warning("Generator worker imported gi; check its imports")
+
+    def _collect_loop(self):
+        while True:
+            with self._lock:
+                if self._closed:
+                    return
+                # Cancelled workers are only closed here, after the previous
+                # wait() returned, so we never wait on a closed pipe.
+                dead, self._dead = self._dead, []
+                conns = list(self._busy) + [self._wakeup_r]
+            for worker in dead:
+                worker.stop()
+            try:
+                ready = wait(conns)
+            except OSError:
+                # shutdown() closed a pipe we were about to wait on.
+                if self._closed:
+                    return
+                raise
+            for conn in ready:
+                if conn is self._wakeup_r:
+                    while self._wakeup_r.poll():
+                        self._wakeup_r.recv()
+                else:
+                    self._collect(conn)
+
+    def _collect(self, conn):
+        with self._lock:
+            entry = self._busy.get(conn)
+            if entry is None:
+                return
+            worker, job = entry
+            try:
+                status, payload, *effort = conn.recv()
+            except (EOFError, OSError):
+                self._dead.append(worker)
+                status, payload = "error", "generator worker exited unexpectedly"
+            else:
+                if status == "ready":
+                    self._record_ready(worker, payload)
+                    return
+                if status != "progress":
+                    self._idle.append(worker)
+            if status != "progress":
+                del self._busy[conn]
+                self._dispatch_pending()
+
+        # Callbacks run without the lock, so they may cancel or submit jobs.
+        if status == "progress":
+            job._report_progress(payload)
+        elif status == "ok":
+            job._resolve(result=payload, effort=effort[0] if effort else None)
+        else:
+            logging.error(f"Puzzle generation failed: {payload}")
+            job._resolve(error=RuntimeError("Failed to generate puzzle"))
+
+
+def _settle(future):
+    if not future.done():
+        future.set_result(None)
+
+
+def first_successful(jobs: list[GenerationJob], timeout: float) -> GenerationJob:
+    """
+    Wait for the first job in `jobs` to finish successfully.
+    Raises TimeoutError if none do in time, RuntimeError if all fail.
+    """
+    finished = queue.Queue()
+    for job in jobs:
+        job.add_done_callback(finished.put)
+
+    deadline = time.monotonic() + timeout
+    for _ in jobs:
+        try:
+            job = finished.get(timeout=max(0.0, deadline - time.monotonic()))
+        except queue.Empty:
+            raise TimeoutError("Puzzle generation timed out") from None
+        if job.succeeded():
+            return job
+    raise RuntimeError("Failed to generate puzzle")
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool() -> GeneratorPool:
+    """
+    Return the application-wide generator pool, creating it on first use:
+    threads on free-threaded builds, worker processes otherwise.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # Imported here: generator_threads builds on this module.
+            from .generator_threads import ThreadGeneratorPool, threads_run_in_parallel
+
+            if threads_run_in_parallel():
+                logging.info("Free-threaded interpreter: generating on threads")
+                _pool = ThreadGeneratorPool()
+            else:
+                _pool = GeneratorPool()
+            atexit.register(_pool.shutdown)
+        return _pool
@@ -0,0 +1,202 @@
+# generator_threads.py
+#
+# Copyright 2025 sepehr-rs
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+import heapq
+import itertools
+import logging
+import sys
+import threading
+import time
+from collections import Counter
+from .bitmask_solver import (
+    SearchCancelled,
+    cancellation_points,
+    minimize_reports,
+    solver_effort,
+)
+from .generation_progress import progress_reporter
+from .generator_pool import (
+    GenerationCancelled,
+    GenerationJob,
+    JobPriority,
+    _PriorityStats,
+)
+from .resource_governor import resource_governor
+
+
+def threads_run_in_parallel() -> bool:
+    """Whether this is a free-threaded CPython with the GIL turned off."""
+    is_gil_enabled = getattr(sys, "_is_gil_enabled", None)
+    return is_gil_enabled is not None and not is_gil_enabled()
+
+
+class ThreadGeneratorPool:
+    """
+    GeneratorPool's interface over threads of this process. On
+    free-threaded builds they generate in parallel without booting
+    worker processes or pickling generators and results.
+
+    A thread cannot be killed, so cancelling or preempting a job sets
+    its stop event and the solver gives up at its next cancellation
+    point. Until then the thread keeps running outside the pool's count.
+    The sudoku-engine backend has no cancellation points and always
+    runs to the end, its result dropped.
+    """
+
+    def __init__(self, max_workers: int | None = None):
+        self.max_workers = max_workers or resource_governor.worker_count()
+        self._lock = threading.Lock()
+        self._running: dict = {}  # job -> stop event of its current run
+        self._pending: list = []  # heap of (priority, sequence, job)
+        self._sequence = itertools.count()
+        self._closed = False
+        self._stats = {p: _PriorityStats() for p in JobPriority}
+        self._threads_started = 0
+
+    def submit(
+        self,
+        generator,
+        difficulty: float,
+        seed: int | None = None,
+        priority: JobPriority = JobPriority.INTERACTIVE,
+    ) -> GenerationJob:
+        job = GenerationJob(self, generator, difficulty, seed, priority)
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("Generator pool is shut down")
+            heapq.heappush(self._pending, (priority, next(self._sequence), job))
+            if priority == JobPriority.INTERACTIVE and not self._has_capacity():
+                self._preempt_background()
+            self._dispatch_pending()
+        return job
+
+    def stats(self) -> dict:
+        """Like GeneratorPool.stats(); "workers" counts threads started."""
+        with self._lock:
+            queued = Counter(job.priority for _, _, job in self._pending)
+            running = Counter(job.priority for job in self._running)
+            stats = {
+                priority.name.lower(): self._stats[priority].as_dict(
+                    queued[priority], running[priority]
+                )
+                for priority in JobPriority
+            }
+            stats["workers"] = {"threads": self._threads_started}
+            return stats
+
+    def shutdown(self):
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            jobs = [j for _, _, j in self._pending] + list(self._running)
+            for stop in self._running.values():
+                stop.set()
+            self._pending, self._running = [], {}
+        for job in jobs:
+            job._resolve(error=GenerationCancelled("Generator pool shut down"))
+
+    def _has_capacity(self) -> bool:
+        return len(self._running) < self.max_workers
+
+    def _dispatch_pending(self):
+        """Start queued jobs while threads are free. Caller holds the lock."""
+        while self._pending and self._has_capacity():
+            _, _, job = heapq.heappop(self._pending)
+            stop = self._running[job] = threading.Event()
+            self._stats[job.priority].record_wait(time.monotonic() - job.submitted_at)
+            self._threads_started += 1
+            threading.Thread(
+                target=self._run, args=(job, stop), name="generator", daemon=True
+            ).start()
+
+    def _stop_running(self, job: GenerationJob) -> bool:
+        """Ask the thread running `job` to stop. Caller holds the lock."""
+        stop = self._running.pop(job, None)
+        if stop is None:
+            return False
+        stop.set()
+        return True
+
+    def _preempt_background(self):
+        """Make room for an interactive job. Caller holds the lock."""
+        for job in list(self._running):
+            if job.priority == JobPriority.BACKGROUND:
+                self._stop_running(job)
+                heapq.heappush(self._pending, (job.priority, next(self._sequence), job))
+                self._stats[job.priority].preempted += 1
+                logging.debug("Preempted a background generation job")
+                return
+
+    def _set_priority(self, job: GenerationJob, priority: JobPriority):
+        """As in GeneratorPool; a demoted thread stays demoted, so restart."""
+        with self._lock:
+            demoted = job in self._running and job.priority == JobPriority.BACKGROUND
+            job.priority = priority
+            self._pending = [(j.priority, n, j) for _, n, j in self._pending]
+            heapq.heapify(self._pending)
+            if priority == JobPriority.INTERACTIVE and demoted:
+                self._stop_running(job)
+                heapq.heappush(self._pending, (priority, next(self._sequence), job))
+                logging.debug("Restarting a promoted job on a normal thread")
+                self._dispatch_pending()
+
+    def _cancel(self, job: GenerationJob):
+        with self._lock:
+            queued = [entry for entry in self._pending if entry[2] is not job]
+            if len(queued) != len(self._pending):
+                self._pending = queued
+                heapq.heapify(self._pending)
+            elif self._stop_running(job):
+                self._dispatch_pending()
+        job._resolve(error=GenerationCancelled("Puzzle generation cancelled"))
+
+    def _run(self, job: GenerationJob, stop: threading.Event):
+        resource_governor.apply_to_thread()
+        if job.priority == JobPriority.BACKGROUND:
+            resource_governor.demote_worker()
+        cancellation_points.watch(stop)
+        progress_reporter.connect(job._report_progress)
+        solver_effort.take()
+        minimize_reports.take()
+        started = time.perf_counter()
+        result = error = effort = None
+        try:
+            result = job.generator._generate_impl(job.difficulty, job.seed)
+            effort = {
+                "seconds": time.perf_counter() - started,
+                "nodes": solver_effort.take(),
+                "minimize": minimize_reports.take(),
+            }
+        except SearchCancelled:
+            return
+        except Exception as e:
+            logging.error(f"Puzzle generation failed: {type(e).__name__}: {e}")
+            error = RuntimeError("Failed to generate puzzle")
+        finally:
+            progress_reporter.connect(None)
+            cancellation_points.watch(None)
+            with self._lock:
+                # A cancelled or preempted run no longer owns the job.
+                current = self._running.get(job) is stop
+                if current:
+                    del self._running[job]
+                    self._dispatch_pending()
+        if current:
+            job._resolve(result=result, error=error, effort=effort)
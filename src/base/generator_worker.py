@@ -0,0 +1,78 @@
+# generator_worker.py
+#
+# Copyright 2025 sepehr-rs
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+# Entry point of generator worker processes. Workers are started with
+# spawn/forkserver rather than fork, so this module and everything it
+# imports must stay free of gi/GTK: only the generators and sudoku-engine.
+
+import resource
+import sys
+import time
+from .bitmask_solver import minimize_reports, solver_effort
+from .generation_progress import progress_reporter
+
+
+def _memory_kb() -> int:
+    """Peak resident set size of this process in KiB (Linux units)."""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def main(conn, governor):
+    """Report readiness, then serve generation requests until told to stop."""
+    import sudoku  # noqa: F401  (warm the engine before the first request)
+
+    governor.apply_to_worker()
+    progress_reporter.connect(lambda report: conn.send(("progress", report)))
+    demoted = False
+
+    conn.send(
+        (
+            "ready",
+            {
+                "rss_kb": _memory_kb(),
+                "gi_loaded": "gi" in sys.modules,
+            },
+        )
+    )
+    while True:
+        try:
+            task = conn.recv()
+        except (EOFError, OSError):
+            break
+        if task is None:
+            break
+        generator, difficulty, seed, background = task
+        if background and not demoted:
+            governor.demote_worker()
+            demoted = True
+        solver_effort.take()
+        minimize_reports.take()
+        progress_reporter.start()
+        started = time.perf_counter()
+        try:
+            result = generator._generate_impl(difficulty, seed)
+            effort = {
+                "seconds": time.perf_counter() - started,
+                "nodes": solver_effort.take(),
+                "minimize": minimize_reports.take(),
+            }
+            conn.send(("ok", result, effort))
+        except Exception as e:
+            conn.send(("error", f"{type(e).__name__}: {e}"))
+    conn.close()
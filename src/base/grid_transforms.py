@@ -0,0 +1,133 @@
+# grid_transforms.py
+#
+# Copyright 2025 sepehr-rs
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+# Imported by generator workers: keep this module free of gi.
+
+import random
+
+SIZE = 9
+BOX = 3
+
+# Clue-pattern symmetries, as the cell each (row, col) is paired with.
+SYMMETRIES = {
+    "rotational": lambda r, c: (SIZE - 1 - r, SIZE - 1 - c),
+    "mirror": lambda r, c: (r, SIZE - 1 - c),
+    "diagonal": lambda r, c: (c, r),
+}
+
+
+def canonical_grid() -> list[list[int]]:
+    """A fixed valid grid: each row is the previous one shifted by a box."""
+    return [
+        [(BOX * (r % BOX) + r // BOX + c) % SIZE + 1 for c in range(SIZE)]
+        for r in range(SIZE)
+    ]
+
+
+def _band_permutation(rng: random.Random) -> list[int]:
+    """Shuffle the bands, then the lines inside each band."""
+    bands = rng.sample(range(BOX), BOX)
+    return [
+        band * BOX + line for band in bands for line in rng.sample(range(BOX), BOX)
+    ]
+
+
+def _diagonal_permutation(rng: random.Random) -> list[int]:
+    """
+    A band-preserving line permutation p with p(8 - i) == 8 - p(i). Used
+    for rows and columns alike it maps each diagonal onto itself.
+    """
+    outer = rng.sample(range(BOX), BOX)
+    if rng.random() < 0.5:
+        outer = [SIZE - 1 - line for line in outer]
+    middle = [3, 4, 5] if rng.random() < 0.5 else [5, 4, 3]
+    return outer + middle + [SIZE - 1 - line for line in reversed(outer)]
+
+
+class GridTransform:
+    """
+    A validity-preserving relabelling of a 9x9 grid: output cell (r, c)
+    takes the input cell (rows[r], cols[c]), optionally transposed, with
+    every digit d replaced by digits[d]. Blanks (None) stay blank.
+    """
+
+    def __init__(self, rows, cols, digits, transpose: bool = False):
+        self.rows = rows
+        self.cols = cols
+        self.digits = digits
+        self.transpose = transpose
+
+    @classmethod
+    def random_classic(cls, rng: random.Random) -> "GridTransform":
+        """Uniform over the classic Sudoku transformation group."""
+        relabel = rng.sample(range(1, SIZE + 1), SIZE)
+        return cls(
+            _band_permutation(rng),
+            _band_permutation(rng),
+            {d: relabel[d - 1] for d in range(1, SIZE + 1)},
+            transpose=rng.random() < 0.5,
+        )
+
+    @classmethod
+    def random_diagonal(cls, rng: random.Random) -> "GridTransform":
+        """
+        Uniform over the subgroup that keeps both diagonals intact: the same
+        symmetric permutation for rows and columns, an optional mirror
+        (which swaps the two diagonals), transposition and relabelling.
+        """
+        lines = _diagonal_permutation(rng)
+        rows = lines[::-1] if rng.random() < 0.5 else lines
+        relabel = rng.sample(range(1, SIZE + 1), SIZE)
+        return cls(
+            rows,
+            lines,
+            {d: relabel[d - 1] for d in range(1, SIZE + 1)},
+            transpose=rng.random() < 0.5,
+        )
+
+    def apply(self, grid) -> list[list]:
+        if self.transpose:
+            grid = [list(col) for col in zip(*grid)]
+        return [
+            [
+                self.digits[grid[r][c]] if grid[r][c] else grid[r][c]
+                for c in self.cols
+            ]
+            for r in self.rows
+        ]
+
+
+def synthesize_grid(rng: random.Random) -> list[list[int]]:
+    """A random complete classic grid without any search."""
+    return GridTransform.random_classic(rng).apply(canonical_grid())
+
+
+def cell_orbits(symmetry: str | None) -> list[tuple[int, ...]]:
+    """Flat cell indices grouped into pairs (or singles) of `symmetry`."""
+    if symmetry is None:
+        return [(i,) for i in range(SIZE * SIZE)]
+    paired = SYMMETRIES[symmetry]
+    orbits, seen = [], set()
+    for i in range(SIZE * SIZE):
+        if i not in seen:
+            r, c = paired(*divmod(i, SIZE))
+            orbit = tuple(sorted({i, r * SIZE + c}))
+            seen.update(orbit)
+            orbits.append(orbit)
+    return orbits
@@ -0,0 +1,255 @@
+# main_loop_generation.py
+#
+# Copyright 2025 sepehr-rs
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+import logging
+import os
+import threading
+import time
+from gi.repository import GLib
+from .generation_policy import generation_policy
+from .puzzle_sources import puzzle_sources
+
+
+class _JobWatch:
+    """
+    Runs callbacks for finished generation jobs on the GLib main loop.
+
+    The pool's collector thread already waits on every worker pipe, so
+    the main loop does not watch those itself: a finishing job queues its
+    callback and writes a byte to a pipe whose read end is a GLib fd
+    source, and the main loop runs the queued callbacks when it wakes.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._ready = []
+        self._read_fd, self._write_fd = os.pipe()
+        os.set_blocking(self._read_fd, False)
+        # A full pipe already holds a pending wakeup.
+        os.set_blocking(self._write_fd, False)
+        GLib.unix_fd_add_full(
+            GLib.PRIORITY_DEFAULT, self._read_fd, GLib.IOCondition.IN, self._dispatch
+        )
+
+    def when_done(self, job, callback):
+        job.add_done_callback(lambda job: self._queue(callback, job))
+
+    def _queue(self, callback, job):
+        with self._lock:
+            self._ready.append((callback, job))
+        try:
+            os.write(self._write_fd, b"\0")
+        except BlockingIOError:
+            pass
+
+    def _dispatch(self, fd, _condition, *_user_data):
+        try:
+            while os.read(fd, 512):
+                pass
+        except BlockingIOError:
+            pass
+        with self._lock:
+            ready, self._ready = self._ready, []
+        for callback, job in ready:
+            callback(job)
+        return GLib.SOURCE_CONTINUE
+
+
+_watch: _JobWatch | None = None
+
+
+def when_done(job, callback):
+    """
+    Call `callback(job)` on the main loop once `job` finishes, without a
+    thread waiting for it. Always deferred, even if the job is done.
+    """
+    global _watch
+    if _watch is None:
+        _watch = _JobWatch()
+    _watch.when_done(job, callback)
+
+
+class MainLoopGeneration:
+    """
+    Puzzle generation driven by the main loop, as in BoardBase: the puzzle
+    sources are asked in puzzle_sources' order within `within` seconds,
+    then generate_adaptive's degradation ladder runs in whatever is left.
+    Worker results arrive through when_done() and attempt timeouts are
+    main-loop timers, so nothing blocks while the workers dig.
+
+    `callback(result, error)` runs on the main loop once, with result
+    (puzzle, solution, actual_difficulty, puzzle_code), or the error that
+    ended the last attempt. It runs from start() itself when an instant
+    source has a puzzle at hand, and never after cancel().
+    """
+
+    def __init__(
+        self,
+        generator,
+        difficulty: float,
+        callback,
+        on_progress=None,
+        within: float = 5.0,
+    ):
+        self.generator = generator
+        self.difficulty = difficulty
+        self.cancelled = False
+        self._callback = callback
+        self._on_progress = on_progress
+        self._within = within
+        self._deadline = 0.0
+        self._sources = iter(())
+        self._attempts = None
+        # The source of the running attempt, or None for ladder attempts.
+        self._source = None
+        self._attempt_generator = generator
+        self._jobs = []
+        self._timer = None
+        self._target = None
+        self._timeout = 0.0
+        self._started = 0.0
+        self._extended = False
+        self._last_error = None
+
+    def start(self):
+        self._deadline = time.monotonic() + self._within
+        self._sources = iter(puzzle_sources.ranked(self.generator, self.difficulty))
+        self._next_attempt()
+
+    def cancel(self):
+        """Stop generating and kill the running jobs' workers."""
+        self.cancelled = True
+        self._stop_attempt()
+
+    def _remaining(self) -> float:
+        return max(0.0, self._deadline - time.monotonic())
+
+    def _next_attempt(self):
+        for source in self._sources:
+            if self._try_source(source):
+                return
+        self._source = None
+        if self._attempts is None:
+            self._attempts = enumerate(
+                self.generator._attempts(self.difficulty, self._remaining())
+            )
+        step = next(self._attempts, None)
+        if step is None:
+            error = RuntimeError(f"Failed to generate puzzle: {self._last_error}")
+            self._finish(None, error)
+            return
+        attempt, (target, timeout) = step
+        if attempt:
+            self.generator._log_degrading(
+                self.difficulty, target, attempt, self._last_error
+            )
+
+        derived = self.generator._take_derived(target)
+        if derived:
+            self._finish((*derived, target, None))
+            return
+        self._submit(self.generator, target, timeout)
+
+    def _try_source(self, source) -> bool:
+        """Ask `source` as PuzzleSources.find() would, without blocking."""
+        remaining = self._remaining()
+        expected = source.expected_seconds(self.generator, self.difficulty)
+        if expected > remaining:
+            return False
+        generator = source.generator_for(self.generator)
+        if generator is None:
+            if expected > 0:
+                return False  # Its get() would block the main loop.
+            found = source.get(self.generator, self.difficulty, 0.0, None, None)
+            if found is None:
+                return False
+            logging.debug(f"Puzzle at {self.difficulty} from {source.name}")
+            puzzle, solution, code = found
+            self._finish((puzzle, solution, self.difficulty, code))
+            return True
+        self._source = source
+        timeout = source.timeout(generator, self.difficulty, remaining)
+        self._submit(generator, self.difficulty, timeout)
+        return True
+
+    def _submit(self, generator, target: float, timeout: float):
+        self._attempt_generator, self._target = generator, target
+        self._started = time.monotonic()
+        self._timeout, self._extended = timeout, False
+        jobs = self._jobs = generator._submit_seeded(
+            target, on_progress=self._on_progress
+        )
+        for job in jobs:
+            when_done(job, lambda job: self._on_job_done(jobs, job))
+        self._timer = GLib.timeout_add(int(timeout * 1000), self._on_timeout)
+
+    def _on_job_done(self, jobs, job):
+        if jobs is not self._jobs:
+            return  # A job of an attempt that already ended.
+        if job.succeeded():
+            self._stop_attempt()
+            generator, target = self._attempt_generator, self._target
+            puzzle, solution, seed = generator._accept(
+                jobs, job, target, self._started
+            )
+            seconds = time.monotonic() - self._started
+            if self._source is not None:
+                self._source.record(generator, target, seconds)
+            else:
+                generation_policy.record(generator.variant, target, seconds)
+            code = generator.puzzle_code(target, seed)
+            self._finish((puzzle, solution, target, code))
+        elif all(j.done() for j in jobs):
+            self._stop_attempt()
+            self._last_error = RuntimeError("Failed to generate puzzle")
+            self._next_attempt()
+
+    def _on_timeout(self):
+        self._timer = None
+        jobs, generator = self._jobs, self._attempt_generator
+        # Minimizing gets more time, but only out of the remaining budget.
+        extension = min(generator.minimize_budget, self._remaining())
+        if not self._extended and extension > 0 and generator._minimizing(jobs):
+            logging.debug(f"Extending generation at {self._target} to minimize")
+            self._extended = True
+            self._timer = GLib.timeout_add(int(extension * 1000), self._on_timeout)
+            return GLib.SOURCE_REMOVE
+        self._stop_attempt()
+        generator._record_timeout(jobs, self._target, self._started, self._timeout)
+        if self._source is None:
+            generation_policy.record_timeout(
+                generator.variant, self._target, time.monotonic() - self._started
+            )
+        else:
+            logging.info(f"Puzzle source {self._source.name} missed its budget")
+        self._last_error = TimeoutError("Puzzle generation timed out")
+        self._next_attempt()
+        return GLib.SOURCE_REMOVE
+
+    def _stop_attempt(self):
+        jobs, self._jobs = self._jobs, []
+        if self._timer is not None:
+            GLib.source_remove(self._timer)
+            self._timer = None
+        for job in jobs:
+            job.cancel()
+
+    def _finish(self, result, error=None):
+        if not self.cancelled:
+            self._callback(result, error)
@@ -18,10 +18,17 @@
 # SPDX-License-Identifier: GPL-3.0-or-later
 
 from gi.repository import Gtk, GLib
+from gettext import gettext
 from .ui_helpers import UIHelpers
 from .preferences_manager import PreferencesManager
+from .constants import DIFFICULTY_LABELS
+from .generator_pool import Cancellation, GenerationCancelled
+from .main_loop_generation import MainLoopGeneration, when_done
+from .puzzle_reservoir import PuzzleReservoir
+from .puzzle_sources import puzzle_sources
 import logging
 import threading
+import time
 
 
 class ManagerBase:
@@ -32,6 +39,10 @@ class ManagerBase:
         self.cell_inputs = []
         self.conflict_cells = []
         self.pencil_mode = False
+        # (difficulty, difficulty_label, variant) of the game being started,
+        # and what stops its generation if the user backs out.
+        self._starting = None
+        self._cancellation = Cancellation()
 
     def load_saved_game(self):
         self.board = self.board_cls.load_from_file()
@@ -54,18 +65,168 @@ class ManagerBase:
     def new_game(self, difficulty, difficulty_label):
         self.board = self.board_cls(difficulty, difficulty_label)
 
-    def start_game(self, difficulty: float, difficulty_label: str, variant: str):
-        self.window.stack.set_visible_child(self.window.loading_screen)
+    def start_game(
+        self,
+        difficulty: float,
+        difficulty_label: str,
+        variant: str,
+        speculative=None,
+    ):
+        """
+        Show the loading screen and build a new board once its puzzle is
+        ready. Generation runs on the pool's workers and reports back on
+        the main loop. `speculative` is an optional in-flight generation
+        job for the same selection.
+        """
+        loading_screen = self.window.loading_screen
+        loading_screen.reset_progress()
+        self.window.stack.set_visible_child(loading_screen)
         logging.info(
             f"Starting {variant.capitalize()} Sudoku with difficulty: {difficulty}"
         )
+        self.cancel_start()
+        self._starting = (difficulty, difficulty_label, variant)
+        self._cancellation = cancellation = Cancellation()
+
+        if self.board_cls.generator_cls.rated_difficulty:
+            # Stock, derived puzzles and speculation are picked by removal
+            # ratio, not by rating.
+            if speculative is not None:
+                speculative.cancel()
+            self._start_rated(cancellation)
+            return
+
+        # Only sources that never wait: the rest would block the main loop.
+        generator = self.board_cls.generator_cls()
+        stocked = puzzle_sources.find(generator, difficulty, within=0)
+        if stocked is not None:
+            if speculative is not None:
+                speculative.cancel()
+            self._start_with(difficulty, stocked)
+        elif speculative is not None:
+            self._await_speculative(speculative, cancellation)
+        else:
+            self._generate(cancellation)
+
+    def cancel_start(self):
+        """
+        Abandon the game being started, if any: its jobs are cancelled,
+        which kills their workers, and nothing it still delivers is shown.
+        """
+        self._cancellation.cancel()
+
+    def _await_speculative(self, job, cancellation):
+        """
+        Wait for a claimed speculative job, within the board's latency
+        budget; generating after it gets what is left of the budget.
+        """
+        loading_screen = self.window.loading_screen
+        job.add_progress_callback(loading_screen.show_progress)
+        if job.progress:
+            loading_screen.show_progress(job.progress)
+        job.promote()
+        cancellation.add(job.cancel)
+        started = time.monotonic()
+        GLib.timeout_add(int(self.board_cls.latency_budget * 1000), job.cancel)
+        when_done(
+            job, lambda job: self._on_speculative_done(job, cancellation, started)
+        )
+
+    def _on_speculative_done(self, job, cancellation, started: float):
+        if cancellation.cancelled:
+            return
+        try:
+            puzzle, solution = job.result(0)
+        except (GenerationCancelled, RuntimeError) as e:
+            logging.warning(f"Speculative generation unusable, regenerating: {e}")
+            waited = time.monotonic() - started
+            self._generate(
+                cancellation, within=max(0.0, self.board_cls.latency_budget - waited)
+            )
+            return
+        code = job.generator.puzzle_code(job.difficulty, job.seed)
+        self._start_with(job.difficulty, (puzzle, solution, code))
+
+    def _generate(self, cancellation, within: float | None = None):
+        generator = self.board_cls.generator_cls()
+
+        def on_generated(result, error):
+            if error is not None:
+                logging.error(f"Could not start {self._starting[2]} game: {error}")
+                self._abort_start_game()
+                return
+            puzzle, solution, actual, code = result
+            self._start_with(actual, (puzzle, solution, code))
+
+        generation = MainLoopGeneration(
+            generator,
+            self._starting[0],
+            on_generated,
+            on_progress=self.window.loading_screen.show_progress,
+            within=self.board_cls.latency_budget if within is None else within,
+        )
+        cancellation.add(generation.cancel)
+        # May call back at once, with a stocked or derived puzzle.
+        generation.start()
+
+    def _start_with(self, difficulty: float, pregenerated):
+        requested, difficulty_label, variant = self._starting
+        if difficulty != requested:
+            logging.warning(
+                f"Generated at difficulty {difficulty} instead of {requested}"
+            )
+            difficulty_label = gettext(DIFFICULTY_LABELS[difficulty])
+        self._show_board(
+            self.board_cls(
+                difficulty, difficulty_label, variant, pregenerated=pregenerated
+            )
+        )
+
+    def _start_rated(self, cancellation):
+        """
+        Rated generation polls its candidates, so it keeps a thread. Its
+        results are dropped on the main loop once the start is cancelled.
+        """
+        difficulty, difficulty_label, variant = self._starting
 
         def worker():
-            self.board = self.board_cls(difficulty, difficulty_label, variant)
-            GLib.idle_add(self._finish_start_game, self.board)
+            try:
+                board = self.board_cls(
+                    difficulty,
+                    difficulty_label,
+                    variant,
+                    on_progress=self.window.loading_screen.show_progress,
+                    cancellation=cancellation,
+                )
+            except GenerationCancelled:
+                return
+            except (TimeoutError, RuntimeError) as e:
+                logging.error(f"Could not start {variant} game: {e}")
+                GLib.idle_add(
+                    self._unless_cancelled, cancellation, self._abort_start_game
+                )
+                return
+            GLib.idle_add(self._unless_cancelled, cancellation, self._show_board, board)
 
         threading.Thread(target=worker, daemon=True).start()
 
+    def _unless_cancelled(self, cancellation, callback, *args):
+        if not cancellation.cancelled:
+            callback(*args)
+        return False
+
+    def _show_board(self, board):
+        self.board = board
+        self._finish_start_game(board)
+        reservoir = PuzzleReservoir.get_default()
+        if reservoir and not self.board_cls.generator_cls.rated_difficulty:
+            reservoir.refill()
+        return False
+
+    def _abort_start_game(self):
+        self.window.on_back_to_menu()
+        return False
+
     def _finish_start_game(self, board):
         raise NotImplementedError
 
@@ -0,0 +1,113 @@
+# puzzle_codes.py
+#
+# Copyright 2025 sepehr-rs
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+# Imported by generator workers: keep this module free of gi.
+
+import json
+import logging
+import os
+import threading
+
+# Bump whenever a change to grid synthesis, digging or minimization makes
+# an existing (variant, difficulty, seed) produce a different puzzle.
+GENERATOR_VERSION = 1
+
+
+def puzzle_code(
+    variant: str, difficulty: float, seed: int, symmetry: str | None = None
+) -> str:
+    """A short code that regenerates a puzzle, e.g. "1-classic-0.7-48213"."""
+    code = f"{GENERATOR_VERSION}-{variant}-{difficulty:g}-{seed}"
+    return f"{code}-{symmetry}" if symmetry else code
+
+
+def parse_puzzle_code(code: str) -> tuple[str, float, int, str | None]:
+    """
+    Split a puzzle code into (variant, difficulty, seed, symmetry).
+    Raises ValueError if it is malformed or from another generator version.
+    """
+    parts = code.split("-")
+    if len(parts) not in (4, 5):
+        raise ValueError(f"Malformed puzzle code: {code!r}")
+    version, variant, difficulty, seed = parts[:4]
+    if version != str(GENERATOR_VERSION):
+        raise ValueError(
+            f"Puzzle code {code!r} is from generator version {version}, "
+            f"this is version {GENERATOR_VERSION}"
+        )
+    symmetry = parts[4] if len(parts) == 5 else None
+    return variant, float(difficulty), int(seed), symmetry
+
+
+class RegenerationCache:
+    """
+    The last few puzzles regenerated from codes, persisted so reopening a
+    seed-only save does not dig the puzzle again.
+    """
+
+    DEFAULT_PATH = "saves/regenerated.json"
+    CAPACITY = 8
+
+    def __init__(self, path: str | None = None):
+        self.path = path or self.DEFAULT_PATH
+        self._lock = threading.Lock()
+        self._entries = None
+
+    def get(self, code: str):
+        """Cached (puzzle, solution) for `code`, or None."""
+        with self._lock:
+            entry = self._load().get(code)
+        return tuple(entry) if entry else None
+
+    def put(self, code: str, puzzle, solution):
+        with self._lock:
+            entries = self._load()
+            entries.pop(code, None)
+            entries[code] = [puzzle, solution]
+            while len(entries) > self.CAPACITY:
+                del entries[next(iter(entries))]
+            self._save(entries)
+
+    def _load(self) -> dict:
+        """Entries oldest first, read from disk once. Caller holds the lock."""
+        if self._entries is None:
+            self._entries = {}
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    self._entries = dict(json.load(f))
+            except FileNotFoundError:
+                pass
+            except (OSError, ValueError, TypeError) as e:
+                logging.warning(f"Ignoring unreadable regeneration cache: {e}")
+        return self._entries
+
+    def _save(self, entries: dict):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(list(entries.items()), f)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            logging.warning(f"Could not write regeneration cache: {e}")
+
+
+regeneration_cache = RegenerationCache()
@@ -0,0 +1,455 @@
+# puzzle_rater.py
+#
+# Copyright 2025 sepehr-rs
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+# Imported by generator workers: keep this module free of gi.
+
+import functools
+import threading
+from itertools import combinations
+from .bitmask_solver import ALL_DIGITS, POPCOUNT, BitmaskSolver, to_cells
+from .constants import RATING_BANDS
+
+# Techniques from easiest to hardest, with the score of a puzzle whose
+# hardest step needs it. "guess" means the logical techniques got stuck:
+# the rater then places the solution digit in the cell with the fewest
+# candidates and carries on.
+TECHNIQUE_LEVELS = {
+    "naked single": 0,
+    "hidden single": 10,
+    "locked candidates": 30,
+    "naked pair": 40,
+    "hidden pair": 45,
+    "naked triple": 50,
+    "hidden triple": 55,
+    "x-wing": 60,
+    "guess": 70,
+}
+# What each use of a technique adds on top. Singles add nothing: how many
+# a puzzle takes mostly tracks how many cells are blank, not how hard
+# the puzzle is.
+TECHNIQUE_WEIGHTS = {
+    "naked single": 0,
+    "hidden single": 0,
+    "locked candidates": 2,
+    "naked pair": 3,
+    "hidden pair": 3,
+    "naked triple": 4,
+    "hidden triple": 4,
+    "x-wing": 5,
+    "guess": 8,
+}
+RATING_CACHE_SIZE = 4096
+# Digit indexes (0-8) set in each candidate mask.
+MASK_DIGITS = [[d for d in range(9) if mask >> d & 1] for mask in range(ALL_DIGITS + 1)]
+
+
+class Rating:
+    """Outcome of rating one puzzle. Shared through the cache: do not mutate."""
+
+    __slots__ = ("score", "hardest", "counts")
+
+    def __init__(self, score: int, hardest: str, counts: dict[str, int]):
+        self.score = score
+        self.hardest = hardest
+        self.counts = counts
+
+    @property
+    def needs_guess(self) -> bool:
+        return "guess" in self.counts
+
+    def __repr__(self):
+        return f"Rating(score={self.score}, hardest={self.hardest!r})"
+
+
+class _Tables:
+    """Unit layout shared by all ratings of one variant."""
+
+    def __init__(self, diagonal: bool):
+        solver = BitmaskSolver(diagonal=diagonal)
+        self.solver = solver
+        self.units = solver.units
+        self.peers = solver.peers
+        self.rows, self.cols = self.units[:9], self.units[9:18]
+        # Indexes of the units holding each cell.
+        self.cell_units = [
+            tuple(u for u, unit in enumerate(self.units) if i in unit)
+            for i in range(len(self.peers))
+        ]
+        # (A ∩ B, A \ B, B \ A, the indexes of A and B) for every pair of
+        # units sharing more than one cell: box/line pairs, plus box/diagonal
+        # pairs.
+        self.intersections = []
+        for (ua, a), (ub, b) in combinations(enumerate(self.units), 2):
+            inside = set(a) & set(b)
+            if len(inside) > 1:
+                self.intersections.append(
+                    (
+                        tuple(inside),
+                        tuple(i for i in a if i not in inside),
+                        tuple(i for i in b if i not in inside),
+                        ua,
+                        ub,
+                    )
+                )
+
+
+@functools.lru_cache(maxsize=2)
+def _tables(diagonal: bool) -> _Tables:
+    return _Tables(diagonal)
+
+
+class _Rater:
+    """Solves one puzzle with human techniques, always trying the easiest."""
+
+    def __init__(self, tables: _Tables, cells, solution=None):
+        self.t = tables
+        state = tables.solver.initial_state(cells)
+        if state is None:
+            raise ValueError("Puzzle givens contradict each other")
+        # Only the givens are placed: candidates are not propagated yet.
+        self.cells, self.cands = state
+        self.solution = solution
+        self.blanks = self.cells.count(0)
+        # Cells that may have come down to one candidate since the last
+        # naked singles pass, so it need not look at every cell.
+        self._singles = [i for i, c in enumerate(self.cands) if c and not c & (c - 1)]
+        # Every candidate change bumps `tick` and stamps the units of the
+        # changed cells with it. A per-unit step remembers the tick at which
+        # it last found nothing in each unit, and skips units not changed
+        # since: most of them, between two steps.
+        self.tick = 0
+        self.changed = [0] * len(tables.units)
+        steps = ("hidden", ("naked", 2), ("hidden", 2), ("naked", 3), ("hidden", 3))
+        self._found_nothing = {step: [-1] * len(tables.units) for step in steps}
+        self._found_nothing["locked"] = [-1] * len(tables.intersections)
+        self._x_wing_found_nothing = -1
+        self._scans = [None] * len(tables.units)
+        self.steps = (
+            ("naked single", self._naked_singles),
+            ("hidden single", self._hidden_singles),
+            ("locked candidates", self._locked_candidates),
+            ("naked pair", lambda: self._subset("naked", 2)),
+            ("hidden pair", lambda: self._subset("hidden", 2)),
+            ("naked triple", lambda: self._subset("naked", 3)),
+            ("hidden triple", lambda: self._subset("hidden", 3)),
+            ("x-wing", self._x_wing),
+        )
+
+    def run(self) -> Rating:
+        counts = {}
+        while self.blanks:
+            for technique, step in self.steps:
+                applied = step()
+                if applied:
+                    break
+            else:
+                technique, applied = "guess", self._guess()
+                if not applied:
+                    raise ValueError("Puzzle has no solution")
+            counts[technique] = counts.get(technique, 0) + applied
+        hardest = max(counts, key=TECHNIQUE_LEVELS.get, default="naked single")
+        score = TECHNIQUE_LEVELS[hardest] + sum(
+            TECHNIQUE_WEIGHTS[name] * n for name, n in counts.items()
+        )
+        return Rating(score, hardest, counts)
+
+    def _guess(self) -> int:
+        if self.solution is None:
+            found = []
+            self.t.solver.search(self.cells[:], self.cands[:], 1, None, found)
+            if not found:
+                return 0
+            self.solution = found[0]
+        i = min(
+            (i for i, c in enumerate(self.cands) if c),
+            key=lambda i: POPCOUNT[self.cands[i]],
+            default=None,
+        )
+        if i is None:
+            return 0
+        self._place(i, 1 << (self.solution[i] - 1))
+        return 1
+
+    def _place(self, i: int, bit: int):
+        self.tick += 1
+        tick, changed, cell_units = self.tick, self.changed, self.t.cell_units
+        self.blanks -= 1
+        self.cells[i] = bit.bit_length()
+        self.cands[i] = 0
+        for u in cell_units[i]:
+            changed[u] = tick
+        keep = ~bit
+        cands = self.cands
+        for p in self.t.peers[i]:
+            c = cands[p]
+            if c & bit:
+                c &= keep
+                cands[p] = c
+                for u in cell_units[p]:
+                    changed[u] = tick
+                if not c & (c - 1):
+                    self._singles.append(p)
+
+    def _eliminate(self, cells, mask: int) -> bool:
+        self.tick += 1
+        tick, changed, cell_units = self.tick, self.changed, self.t.cell_units
+        eliminated = False
+        cands = self.cands
+        for i in cells:
+            c = cands[i]
+            if c & mask:
+                c &= ~mask
+                cands[i] = c
+                eliminated = True
+                for u in cell_units[i]:
+                    changed[u] = tick
+                if not c & (c - 1):
+                    self._singles.append(i)
+        return eliminated
+
+    def _naked_singles(self) -> int:
+        """Place the cells queued as they came down to one candidate."""
+        placed = 0
+        cands, singles = self.cands, self._singles
+        while singles:
+            i = singles.pop()
+            c = cands[i]
+            if c and not c & (c - 1):
+                self._place(i, c)
+                placed += 1
+        return placed
+
+    def _hidden_singles(self) -> int:
+        placed = 0
+        cands, changed = self.cands, self.changed
+        found_nothing = self._found_nothing["hidden"]
+        for u, unit in enumerate(self.t.units):
+            if changed[u] <= found_nothing[u]:
+                continue
+            once = twice = 0
+            for i in unit:
+                c = cands[i]
+                twice |= once & c
+                once |= c
+            only = once & ~twice
+            if not only:
+                found_nothing[u] = self.tick
+            while only:
+                bit = only & -only
+                only ^= bit
+                for i in unit:
+                    if cands[i] & bit:
+                        self._place(i, bit)
+                        placed += 1
+                        break
+        return placed
+
+    def _locked_candidates(self) -> int:
+        cands, changed = self.cands, self.changed
+        found_nothing = self._found_nothing["locked"]
+        for k, (inside, a_rest, b_rest, ua, ub) in enumerate(self.t.intersections):
+            if changed[ua] <= found_nothing[k] and changed[ub] <= found_nothing[k]:
+                continue
+            inner = a = b = 0
+            for i in inside:
+                inner |= cands[i]
+            for i in a_rest:
+                a |= cands[i]
+            for i in b_rest:
+                b |= cands[i]
+            # Digits of the intersection nowhere else in one unit are
+            # locked into it, so the rest of the other unit loses them.
+            if inner & ~a and self._eliminate(b_rest, inner & ~a):
+                return 1
+            if inner & ~b and self._eliminate(a_rest, inner & ~b):
+                return 1
+            found_nothing[k] = self.tick
+        return 0
+
+    def _subset(self, kind: str, size: int) -> int:
+        """
+        Naked or hidden pairs/triples. Each unit is first screened with
+        the unit scan, so the combinations are only tried in units that
+        have enough cells (naked) or digits (hidden) to form one.
+        """
+        cands, changed = self.cands, self.changed
+        found_nothing = self._found_nothing[kind, size]
+        for u, unit in enumerate(self.t.units):
+            if changed[u] <= found_nothing[u]:
+                continue
+            twice, thrice, four, small = self._unit_scan(u)
+            if kind == "naked":
+                if size == 2:
+                    small = [i for i in small if POPCOUNT[cands[i]] == 2]
+                if len(small) >= size and self._naked_in(unit, small, size):
+                    return 1
+            else:
+                # Digits with 2..size places; singles were placed already.
+                fits = twice & ~(thrice if size == 2 else four)
+                if POPCOUNT[fits] >= size and self._hidden_in(unit, fits, size):
+                    return 1
+            found_nothing[u] = self.tick
+        return 0
+
+    def _unit_scan(self, u: int) -> tuple:
+        """
+        Digits possible in at least two, three and four cells of unit `u`,
+        and its cells with two or three candidates. Kept until the unit
+        changes, and shared by the subset techniques.
+        """
+        scanned = self._scans[u]
+        if scanned is not None and scanned[0] >= self.changed[u]:
+            return scanned[1]
+        cands = self.cands
+        once = twice = thrice = four = 0
+        small = []
+        for i in self.t.units[u]:
+            c = cands[i]
+            four |= thrice & c
+            thrice |= twice & c
+            twice |= once & c
+            once |= c
+            if 1 < POPCOUNT[c] <= 3:
+                small.append(i)
+        scan = (twice, thrice, four, small)
+        self._scans[u] = (self.tick, scan)
+        return scan
+
+    def _naked_in(self, unit, small, size: int) -> bool:
+        cands = self.cands
+        for group in combinations(small, size):
+            union = 0
+            for i in group:
+                union |= cands[i]
+            if POPCOUNT[union] == size:
+                rest = [i for i in unit if i not in group]
+                if self._eliminate(rest, union):
+                    return True
+        return False
+
+    def _hidden_in(self, unit, fits: int, size: int) -> bool:
+        cands = self.cands
+        # places[d]: bit k set when unit[k] may hold digit d + 1.
+        places = dict.fromkeys(MASK_DIGITS[fits], 0)
+        for k, i in enumerate(unit):
+            for d in MASK_DIGITS[cands[i] & fits]:
+                places[d] |= 1 << k
+        for group in combinations(places, size):
+            where = keep = 0
+            for d in group:
+                where |= places[d]
+                keep |= 1 << d
+            if POPCOUNT[where] == size:
+                cells = [i for k, i in enumerate(unit) if where >> k & 1]
+                if self._eliminate(cells, ALL_DIGITS & ~keep):
+                    return True
+        return False
+
+    def _x_wing(self) -> int:
+        t = self.t
+        if max(self.changed[:18]) <= self._x_wing_found_nothing:
+            return 0
+        for first, lines, crosses in ((0, t.rows, t.cols), (9, t.cols, t.rows)):
+            # seen[d]: first line by the positions digit d + 1 has in it,
+            # for lines where it has exactly two.
+            seen = [{} for _ in range(9)]
+            for u, line in enumerate(lines, first):
+                twice, thrice, _, _ = self._unit_scan(u)
+                for d in MASK_DIGITS[twice & ~thrice]:
+                    bit, where = 1 << d, 0
+                    for k, i in enumerate(line):
+                        if self.cands[i] & bit:
+                            where |= 1 << k
+                    other = seen[d].setdefault(where, line)
+                    if other is line:
+                        continue
+                    wing = set(line) | set(other)
+                    targets = [
+                        i
+                        for k in range(9)
+                        if where & (1 << k)
+                        for i in crosses[k]
+                        if i not in wing
+                    ]
+                    if self._eliminate(targets, bit):
+                        return 1
+        self._x_wing_found_nothing = self.tick
+        return 0
+
+
+class RatingCache:
+    """Bounded memo of ratings by puzzle; the oldest entries go first."""
+
+    def __init__(self, size: int = RATING_CACHE_SIZE):
+        self.size = size
+        self._lock = threading.Lock()
+        self._ratings = {}
+        self.hits = self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            rating = self._ratings.get(key)
+            if rating is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return rating
+
+    def put(self, key, rating: Rating):
+        with self._lock:
+            if len(self._ratings) >= self.size:
+                del self._ratings[next(iter(self._ratings))]
+            self._ratings[key] = rating
+
+
+rating_cache = RatingCache()
+
+
+def rate(grid, diagonal: bool = False, solution=None) -> Rating:
+    """
+    Rate a 9x9 puzzle (None for blanks) by the human techniques needed to
+    solve it. Passing the known `solution` saves a search when the rater
+    has to guess. Results are memoized per puzzle, so repeats are free.
+    """
+    cells = to_cells(grid)
+    key = (bytes(cells), diagonal)
+    rating = rating_cache.get(key)
+    if rating is None:
+        hint = to_cells(solution) if solution else None
+        rating = _Rater(_tables(diagonal), cells, hint).run()
+        rating_cache.put(key, rating)
+    return rating
+
+
+def difficulty_for_score(score: int) -> float:
+    """The difficulty whose rating band holds `score`."""
+    for difficulty, (low, high) in RATING_BANDS.items():
+        if low <= score < high:
+            return difficulty
+    return max(RATING_BANDS)
+
+
+def band_distance(score: int, difficulty: float) -> float:
+    """How far `score` lies outside the rating band of `difficulty`."""
+    low, high = RATING_BANDS[difficulty]
+    if score < low:
+        return low - score
+    if score >= high:
+        return score - high + 1
+    return 0
@@ -0,0 +1,171 @@
+# puzzle_reservoir.py
+#
+# Copyright 2025 sepehr-rs
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+import json
+import logging
+import os
+import threading
+from typing import Any
+from .constants import DIFFICULTIES
+from .generator_pool import GenerationCancelled, JobPriority
+
+
+class PuzzleReservoir:
+    """
+    Keeps a few ready-made (puzzle, solution, puzzle code) entries per
+    variant and difficulty so new games can start without waiting on the
+    generator. The code is None for puzzles that cannot be regenerated.
+
+    Stock is persisted to disk, and refilled on a background thread.
+    """
+
+    DEFAULT_PATH = "saves/reservoir.json"
+    REFILL_TIMEOUT = 30
+
+    _default = None
+
+    def __init__(
+        self,
+        generators: dict[str, Any],
+        capacity: int = 3,
+        path: str | None = None,
+    ):
+        self.generators = generators
+        self.capacity = capacity
+        self.path = path or self.DEFAULT_PATH
+        self._lock = threading.Lock()
+        self._refill_thread = None
+        self._stock: dict[tuple[str, float], list] = {
+            (variant, difficulty): []
+            for variant in generators
+            for difficulty in DIFFICULTIES
+        }
+        self._load()
+
+    @classmethod
+    def set_default(cls, reservoir):
+        cls._default = reservoir
+
+    @classmethod
+    def get_default(cls):
+        return cls._default
+
+    def take(self, variant: str, difficulty: float):
+        """Pop a stocked (puzzle, solution, code) entry, or None if empty."""
+        with self._lock:
+            stock = self._stock.get((variant, difficulty))
+            if not stock:
+                return None
+            puzzle, solution, code = stock.pop(0)
+            self._save()
+        logging.info(f"Using stocked {variant} puzzle at difficulty {difficulty}")
+        return puzzle, solution, code
+
+    def count(self, variant: str, difficulty: float) -> int:
+        with self._lock:
+            return len(self._stock.get((variant, difficulty), []))
+
+    def refill(self):
+        """Top up every slot on a background thread; no-op if one is running.
+
+        Returns False so it can be passed straight to `GLib.idle_add`.
+        """
+        with self._lock:
+            if self._refill_thread and self._refill_thread.is_alive():
+                return False
+            self._refill_thread = threading.Thread(
+                target=self._refill_loop, name="puzzle-reservoir", daemon=True
+            )
+            self._refill_thread.start()
+        return False
+
+    def _next_missing(self, skipped: set):
+        with self._lock:
+            missing = [
+                (len(stock), key)
+                for key, stock in self._stock.items()
+                if len(stock) < self.capacity and key not in skipped
+            ]
+        return min(missing)[1] if missing else None
+
+    def _refill_loop(self):
+        skipped = set()
+        while (key := self._next_missing(skipped)) is not None:
+            try:
+                filled = self._refill(key)
+            except (TimeoutError, RuntimeError, GenerationCancelled) as e:
+                logging.warning(f"Reservoir refill failed for {key}: {e}")
+                filled = False
+            if not filled:
+                skipped.add(key)
+
+    def _refill(self, key) -> bool:
+        """
+        Stock `key` and, from the same dig, the variant's other slots.
+        Falls back to a single-difficulty run if the nested dig skipped
+        `key`. Returns whether `key` received a puzzle.
+        """
+        variant, difficulty = key
+        generator = self.generators[variant]
+        puzzles = generator.generate_nested(
+            timeout=self.REFILL_TIMEOUT, priority=JobPriority.BACKGROUND
+        )
+        if difficulty not in puzzles:
+            puzzles[difficulty] = generator.generate_seeded(
+                difficulty,
+                timeout=self.REFILL_TIMEOUT,
+                priority=JobPriority.BACKGROUND,
+            )
+        with self._lock:
+            for level, (puzzle, solution, seed) in puzzles.items():
+                stock = self._stock.get((variant, level))
+                if stock is not None and len(stock) < self.capacity:
+                    code = generator.puzzle_code(level, seed)
+                    stock.append([puzzle, solution, code])
+            self._save()
+        return True
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                state = json.load(f)
+        except (OSError, ValueError) as e:
+            logging.warning(f"Ignoring unreadable puzzle reservoir: {e}")
+            return
+
+        for entry in state.get("slots", []):
+            key = (entry.get("variant"), entry.get("difficulty"))
+            if key in self._stock:
+                self._stock[key] = entry.get("puzzles", [])[: self.capacity]
+
+    def _save(self):
+        """Write the stock to disk. Caller holds the lock."""
+        state = {
+            "slots": [
+                {"variant": variant, "difficulty": difficulty, "puzzles": stock}
+                for (variant, difficulty), stock in self._stock.items()
+            ]
+        }
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(state, f)
+        os.replace(tmp_path, self.path)
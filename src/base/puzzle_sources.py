@@ -0,0 +1,231 @@
+# puzzle_sources.py
+#
+# Copyright 2025 sepehr-rs
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+import copy
+import logging
+import time
+from abc import ABC, abstractmethod
+from .generation_policy import generation_policy
+from .puzzle_reservoir import PuzzleReservoir
+
+# Source qualities, best first.
+FRESH = 2  # A new puzzle that can be regenerated from its code.
+REUSED = 1  # A variation of a recent puzzle, or one without a code.
+
+
+class PuzzleSource(ABC):
+    """
+    Somewhere puzzles come from, declaring how long it is expected to
+    take and how good its puzzles are, so PuzzleSources can pick one
+    that fits a latency budget.
+    """
+
+    name: str = "unknown"
+
+    @abstractmethod
+    def expected_seconds(self, generator, difficulty: float) -> float:
+        """
+        Typical time to get a puzzle; 0 for sources that never wait, or
+        that have no track record yet and must be tried to get one.
+        """
+
+    @abstractmethod
+    def quality(self, generator) -> int:
+        """FRESH or REUSED."""
+
+    @abstractmethod
+    def get(
+        self, generator, difficulty: float, timeout: float, on_progress, cancellation
+    ):
+        """
+        Return (puzzle, solution, puzzle_code) for the generator's variant,
+        or None if this source has nothing for it. May raise TimeoutError
+        or RuntimeError.
+        """
+
+    def generator_for(self, generator):
+        """
+        The generator whose pooled jobs this source waits on, so callers on
+        the main loop can submit them instead of calling get(); None if the
+        source never waits, or cannot serve `generator` at all.
+        """
+        return None
+
+    def timeout(self, generator, difficulty: float, remaining: float) -> float:
+        """How long to wait for this source with `remaining` seconds left."""
+        return remaining
+
+    def record(self, generator, difficulty: float, seconds: float):
+        """Note how long a puzzle took when get() was bypassed."""
+
+
+class BankSource(PuzzleSource):
+    """The puzzle reservoir's stock."""
+
+    name = "bank"
+
+    def expected_seconds(self, generator, difficulty: float) -> float:
+        return 0.0
+
+    def quality(self, generator) -> int:
+        return FRESH
+
+    def get(self, generator, difficulty, timeout, on_progress, cancellation):
+        reservoir = PuzzleReservoir.get_default()
+        return reservoir.take(generator.variant, difficulty) if reservoir else None
+
+
+class DerivedSource(PuzzleSource):
+    """Symmetry transforms of a recent slow puzzle."""
+
+    name = "derived"
+
+    def expected_seconds(self, generator, difficulty: float) -> float:
+        return 0.0
+
+    def quality(self, generator) -> int:
+        return REUSED
+
+    def get(self, generator, difficulty, timeout, on_progress, cancellation):
+        derived = generator._take_derived(difficulty)
+        return (*derived, None) if derived else None
+
+
+class SolverSource(PuzzleSource):
+    """
+    Fresh generation with one solver backend. The generator's configured
+    backend comes first; the other is a fallback of lower quality.
+    """
+
+    def __init__(self, backend: str):
+        self.name = backend
+
+    # Most a single source may wait of what is left, keeping the rest for
+    # the fallbacks after it and the degradation ladder.
+    BUDGET_SHARE = 0.5
+
+    def expected_seconds(self, generator, difficulty: float) -> float:
+        """Median latency so far, or 0 before there is enough history."""
+        key = self._history_key(generator)
+        if not generation_policy.has_history(key, difficulty):
+            return 0.0
+        return generation_policy.percentile(key, difficulty, 50)
+
+    def quality(self, generator) -> int:
+        return FRESH if generator.solver_backend == self.name else REUSED
+
+    def timeout(self, generator, difficulty: float, remaining: float) -> float:
+        """The learned budget for one attempt, within its share of what is left."""
+        return min(
+            remaining * self.BUDGET_SHARE,
+            generation_policy.budget(self._history_key(generator), difficulty),
+        )
+
+    def get(self, generator, difficulty, timeout, on_progress, cancellation):
+        generator = self.generator_for(generator)
+        if generator is None:
+            return None
+        started = time.monotonic()
+        puzzle, solution, seed = generator.generate_fresh(
+            difficulty,
+            timeout=self.timeout(generator, difficulty, timeout),
+            on_progress=on_progress,
+            cancellation=cancellation,
+        )
+        self.record(generator, difficulty, time.monotonic() - started)
+        return puzzle, solution, generator.puzzle_code(difficulty, seed)
+
+    def generator_for(self, generator):
+        if self.name not in generator.solver_backends:
+            return None
+        if generator.solver_backend != self.name:
+            generator = copy.copy(generator)
+            generator.solver_backend = self.name
+        return generator
+
+    def record(self, generator, difficulty: float, seconds: float):
+        generation_policy.record(self._history_key(generator), difficulty, seconds)
+
+    def _history_key(self, generator) -> str:
+        return f"{generator.variant}/{self.name}"
+
+
+class PuzzleSources:
+    """
+    The registered puzzle sources. find() tries those expected to answer
+    within the remaining budget, best quality first and faster first
+    among equals, and falls back down the list when one misses.
+    """
+
+    def __init__(self):
+        self._sources: list[PuzzleSource] = []
+
+    def register(self, source: PuzzleSource):
+        self._sources.append(source)
+
+    def find(
+        self,
+        generator,
+        difficulty: float,
+        within: float,
+        on_progress=None,
+        cancellation=None,
+    ):
+        """
+        Return (puzzle, solution, puzzle_code) for `generator`'s variant at
+        `difficulty` within `within` seconds, or None if no source did.
+        With `within=0` only sources that never wait are asked, so it is
+        safe to call from the main loop. Cancelling `cancellation` raises
+        GenerationCancelled rather than trying the next source.
+        """
+        deadline = time.monotonic() + within
+        for source in self.ranked(generator, difficulty):
+            remaining = max(0.0, deadline - time.monotonic())
+            if source.expected_seconds(generator, difficulty) > remaining:
+                continue
+            try:
+                found = source.get(
+                    generator, difficulty, remaining, on_progress, cancellation
+                )
+            except (TimeoutError, RuntimeError) as e:
+                if cancellation is not None:
+                    cancellation.check()
+                logging.info(f"Puzzle source {source.name} missed its budget: {e}")
+                continue
+            if found is not None:
+                logging.debug(f"Puzzle at {difficulty} from {source.name}")
+                return found
+        return None
+
+    def ranked(self, generator, difficulty: float) -> list[PuzzleSource]:
+        """The sources in the order find() asks them."""
+        return sorted(
+            self._sources,
+            key=lambda source: (
+                -source.quality(generator),
+                source.expected_seconds(generator, difficulty),
+            ),
+        )
+
+
+puzzle_sources = PuzzleSources()
+puzzle_sources.register(BankSource())
+puzzle_sources.register(DerivedSource())
+puzzle_sources.register(SolverSource("native"))
+puzzle_sources.register(SolverSource("engine"))
@@ -0,0 +1,199 @@
+# resource_governor.py
+#
+# Copyright 2025 sepehr-rs
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+# Imported by generator workers: keep this module free of gi.
+
+import logging
+import math
+import os
+import resource
+
+CGROUP_ROOT = "/sys/fs/cgroup"
+CGROUP_V1_CPU_ROOT = "/sys/fs/cgroup/cpu"
+PROC_SELF_CGROUP = "/proc/self/cgroup"
+
+
+def _read(path: str) -> str | None:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+
+def own_cgroup(v1_controller: str | None = None) -> str:
+    """
+    This process's cgroup, from /proc/self/cgroup: the unified (v2) one,
+    or the v1 one holding `v1_controller`. "/" if it cannot be told.
+    """
+    for line in (_read(PROC_SELF_CGROUP) or "").splitlines():
+        _, controllers, path = line.split(":", 2)
+        if v1_controller is None and not controllers:
+            return path
+        if v1_controller is not None and v1_controller in controllers.split(","):
+            return path
+    return "/"
+
+
+def _ancestors(path: str) -> list[str]:
+    """`path` and the cgroups above it, up to the root (""), as suffixes."""
+    parts = [part for part in path.split("/") if part]
+    return ["".join(f"/{p}" for p in parts[:n]) for n in range(len(parts), -1, -1)]
+
+
+def _quota_cpus(quota: str | None, period: str | None) -> float | None:
+    if quota and period and quota != "max" and int(quota) > 0:
+        return int(quota) / int(period)
+    return None
+
+
+def cgroup_cpu_limit() -> float | None:
+    """
+    CPUs granted by the cgroup CPU quota (v2 or v1), or None if unlimited.
+    Quotas are read from this process's own cgroup and every one above
+    it, e.g. a container's or systemd slice's, and the tightest applies.
+    Cgroups not visible in this mount namespace are skipped.
+    """
+    v2_seen = False
+    limits = []
+    for cgroup in _ancestors(own_cgroup()):
+        cpu_max = _read(f"{CGROUP_ROOT}{cgroup}/cpu.max")
+        if cpu_max:
+            v2_seen = True
+            quota, _, period = cpu_max.partition(" ")
+            limits.append(_quota_cpus(quota, period))
+    if not v2_seen:
+        for cgroup in _ancestors(own_cgroup("cpu")):
+            directory = f"{CGROUP_V1_CPU_ROOT}{cgroup}"
+            limits.append(
+                _quota_cpus(
+                    _read(f"{directory}/cpu.cfs_quota_us"),
+                    _read(f"{directory}/cpu.cfs_period_us"),
+                )
+            )
+    limits = [limit for limit in limits if limit is not None]
+    return min(limits) if limits else None
+
+
+def allowed_cpus() -> set[int]:
+    try:
+        return os.sched_getaffinity(0)
+    except (AttributeError, OSError):
+        return set(range(os.cpu_count() or 1))
+
+
+class ResourceGovernor:
+    """
+    Limits what generator workers may take from the machine: how many
+    run, which cores they use, how much memory they may map and how
+    politely background jobs are scheduled.
+    """
+
+    def __init__(
+        self,
+        background_niceness: int = 10,
+        background_idle_scheduling: bool = True,
+        reserve_ui_core: bool = True,
+        memory_limit_mb: int = 512,
+        max_workers: int = 0,
+    ):
+        self.background_niceness = background_niceness
+        self.background_idle_scheduling = background_idle_scheduling
+        self.reserve_ui_core = reserve_ui_core
+        self.memory_limit_mb = memory_limit_mb
+        self.max_workers = max_workers
+
+    def available_cpus(self) -> int:
+        """CPUs we may use: the affinity mask, capped by the cgroup quota."""
+        cpus = len(allowed_cpus())
+        quota = cgroup_cpu_limit()
+        if quota is not None:
+            cpus = min(cpus, max(1, math.floor(quota)))
+        return cpus
+
+    def worker_count(self) -> int:
+        if self.max_workers > 0:
+            return self.max_workers
+        cpus = self.available_cpus()
+        return max(1, cpus - 1 if self.reserve_ui_core else cpus)
+
+    def worker_affinity(self) -> set[int] | None:
+        """Allowed cores minus the lowest one, which is left to the UI."""
+        cpus = allowed_cpus()
+        if not self.reserve_ui_core or len(cpus) < 2:
+            return None
+        return cpus - {min(cpus)}
+
+    def apply_to_worker(self):
+        """Called once inside each new worker process."""
+        affinity = self.worker_affinity()
+        if affinity:
+            _try(os.sched_setaffinity, 0, affinity)
+        if self.memory_limit_mb > 0:
+            limit = self.memory_limit_mb * 1024 * 1024
+            _try(resource.setrlimit, resource.RLIMIT_AS, (limit, limit))
+
+    def apply_to_thread(self):
+        """
+        Called in each generation thread of the thread backend. Linux
+        applies affinity and scheduling per thread, but the memory limit
+        is per process and would cap the UI too, so it is left out.
+        """
+        affinity = self.worker_affinity()
+        if affinity:
+            _try(os.sched_setaffinity, 0, affinity)
+
+    def demote_worker(self):
+        """
+        Called inside a worker before its first background job. This is
+        one-way: unprivileged processes cannot raise their priority again,
+        so the pool never hands interactive jobs to demoted workers.
+        Called from a generation thread, it demotes only that thread.
+        """
+        if self.background_idle_scheduling and hasattr(os, "SCHED_IDLE"):
+            if _try(os.sched_setscheduler, 0, os.SCHED_IDLE, os.sched_param(0)):
+                return
+        if self.background_niceness > 0:
+            _try(os.nice, self.background_niceness)
+
+    def describe(self) -> str:
+        quota = cgroup_cpu_limit()
+        return (
+            f"Workers: {self.worker_count()} "
+            f"(CPUs available: {self.available_cpus()}, "
+            f"cgroup quota: {'none' if quota is None else f'{quota:g}'})\n"
+            f"Reserve UI core: {self.reserve_ui_core}, "
+            f"worker affinity: {sorted(self.worker_affinity() or allowed_cpus())}\n"
+            f"Background: SCHED_IDLE {self.background_idle_scheduling}, "
+            f"niceness {self.background_niceness}\n"
+            f"Memory limit: "
+            f"{f'{self.memory_limit_mb} MiB' if self.memory_limit_mb else 'none'}"
+        )
+
+
+def _try(func, *args) -> bool:
+    try:
+        func(*args)
+    except (AttributeError, OSError, ValueError) as e:
+        logging.debug(f"Resource governor: {func.__name__} failed: {e}")
+        return False
+    return True
+
+
+resource_governor = ResourceGovernor()
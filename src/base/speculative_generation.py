@@ -0,0 +1,79 @@
+# speculative_generation.py
+#
+# Copyright 2025 sepehr-rs
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+import logging
+import random
+from typing import Any
+from .generator_base import derivation_cache
+from .generator_pool import GenerationJob, JobPriority, get_pool
+from .puzzle_reservoir import PuzzleReservoir
+
+
+class SpeculativeGeneration:
+    """
+    Generates the puzzle currently selected in the New Game dialog
+    before the user confirms, so the wait overlaps with their decision.
+    """
+
+    def __init__(self, generators: dict[str, Any]):
+        self.generators = generators
+        self._target = None
+        self._job: GenerationJob | None = None
+
+    def retarget(self, variant: str, difficulty: float):
+        """Start generating (variant, difficulty), dropping any other job."""
+        target = (variant, difficulty)
+        if target == self._target:
+            return
+        self.cancel()
+        self._target = target
+
+        generator = self.generators[variant]
+        if generator.rated_difficulty:
+            return  # Rated starts do not use speculative puzzles.
+        # A stocked or derived puzzle will be at hand on confirming.
+        reservoir = PuzzleReservoir.get_default()
+        if reservoir and reservoir.count(variant, difficulty):
+            return
+        if derivation_cache.has(variant, difficulty):
+            return
+        logging.debug(f"Speculatively generating {variant} at {difficulty}")
+        # An explicit seed lets the finished puzzle carry a puzzle code.
+        # Interactive, not background: promoting a job on a demoted worker
+        # restarts it, which would throw its head start away on confirming.
+        self._job = get_pool().submit(
+            generator,
+            difficulty,
+            seed=random.randint(1, 1_000_000),
+            priority=JobPriority.INTERACTIVE,
+        )
+
+    def claim(self, variant: str, difficulty: float) -> GenerationJob | None:
+        """Hand over the job if it matches the confirmed selection."""
+        job = self._job if self._target == (variant, difficulty) else None
+        if job is not None:
+            self._job = None
+        self.cancel()
+        return job
+
+    def cancel(self):
+        if self._job is not None:
+            self._job.cancel()
+        self._job = None
+        self._target = None
@@ -1,20 +1,22 @@
 from gi.repository import Gtk, Adw
 from gettext import gettext as _
-
-EASY_DIFFICULTY = 0.2
-MEDIUM_DIFFICULTY = 0.5
-HARD_DIFFICULTY = 0.7
-EXTREME_DIFFICULTY = 0.9
+from ..base.constants import (
+    EASY_DIFFICULTY,
+    MEDIUM_DIFFICULTY,
+    HARD_DIFFICULTY,
+    EXTREME_DIFFICULTY,
+)
 
 
 class GameSetupDialog(Adw.Dialog):
-    def __init__(self, on_select, **kwargs):
+    def __init__(self, on_select, on_selection_changed=None, **kwargs):
         super().__init__(**kwargs)
         self.set_title(_("New Game"))
         self.set_content_width(410)
         self.set_content_height(490)
 
         self.on_select = on_select
+        self.on_selection_changed = on_selection_changed
         self.selected_variant = "classic"
         self.selected_difficulty = EASY_DIFFICULTY
         self._radio_groups = {}
@@ -72,6 +74,7 @@ class GameSetupDialog(Adw.Dialog):
         main_box.append(btn)
         self.connect("realize", lambda *_: self.set_focus(btn))
         self.set_child(toolbar_view)
+        self._notify_selection_changed()
 
     def _create_radio_list(self, listbox, items, group_name, default=None):
         self._radio_groups[group_name] = []
@@ -98,6 +101,11 @@ class GameSetupDialog(Adw.Dialog):
     def _on_radio_toggled(self, button, group_name, value):
         if button.get_active():
             setattr(self, f"selected_{group_name}", value)
+            self._notify_selection_changed()
+
+    def _notify_selection_changed(self):
+        if self.on_selection_changed:
+            self.on_selection_changed(self.selected_variant, self.selected_difficulty)
 
     def _on_confirm_clicked(self, _):
         self.on_select(self.selected_variant, self.selected_difficulty)
@@ -17,9 +17,50 @@
 #
 # SPDX-License-Identifier: GPL-3.0-or-later
 
-from gi.repository import Gtk
+from gi.repository import GLib, Gtk
+from gettext import gettext as _
+from ..base.generation_progress import DIG, GRID, MINIMIZE
 
 
 @Gtk.Template(resource_path="/io/github/sepehr_rs/Sudoku/blueprints/loading-screen.ui")
 class LoadingScreen(Gtk.Box):
     __gtype_name__ = "LoadingScreen"
+
+    progress_label = Gtk.Template.Child()
+
+    def __init__(self):
+        super().__init__()
+        self._latest = None
+        self._shown = None
+        self.add_tick_callback(self._on_tick)
+
+    def show_progress(self, report: dict):
+        """
+        Show a generator progress report. Safe to call from any thread:
+        only the latest report is kept and drawn on the next frame, so
+        reports arriving faster than the frame rate are skipped.
+        """
+        self._latest = report
+
+    def reset_progress(self):
+        self._latest = None
+
+    def _on_tick(self, _widget, _frame_clock):
+        report = self._latest
+        if report is not self._shown:
+            self._shown = report
+            self.progress_label.set_label(self._describe(report))
+        return GLib.SOURCE_CONTINUE
+
+    def _describe(self, report: dict | None) -> str:
+        if report is None:
+            return ""
+        if report["phase"] == GRID:
+            return _("Building a solution grid")
+        if report["phase"] == DIG:
+            return _("Removing clues: {removed} removed, {checks} checked").format(
+                removed=report["removed"], checks=report["checks"]
+            )
+        if report["phase"] == MINIMIZE:
+            return _("Removing the last redundant clues")
+        return ""
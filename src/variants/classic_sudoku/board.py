@@ -24,13 +24,26 @@ from .generator import ClassicSudokuGenerator
 
 
 class ClassicSudokuBoard(BoardBase):
-    def __init__(self, difficulty: float, difficulty_label: str, variant: str):
+    generator_cls = ClassicSudokuGenerator
+
+    def __init__(
+        self,
+        difficulty: float,
+        difficulty_label: str,
+        variant: str,
+        pregenerated=None,
+        on_progress=None,
+        cancellation=None,
+    ):
         super().__init__(
             ClassicSudokuRules(),
-            ClassicSudokuGenerator(),
+            self.generator_cls(),
             difficulty,
             difficulty_label,
             variant,
+            pregenerated=pregenerated,
+            on_progress=on_progress,
+            cancellation=cancellation,
         )
 
     @classmethod
@@ -38,7 +51,7 @@ class ClassicSudokuBoard(BoardBase):
         return cls._load_from_file_common(
             filename=filename,
             rules=ClassicSudokuRules(),
-            generator=ClassicSudokuGenerator(),
+            generator=cls.generator_cls(),
         )
 
     def is_solved(self):
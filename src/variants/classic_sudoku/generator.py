@@ -20,21 +20,61 @@
 import random
 from sudoku.base_sudoku import PuzzleGenerator
 from sudoku import ClassicSudoku
+from ...base.constants import DIFFICULTIES
+from ...base.generation_progress import GRID, progress_reporter
 from ...base.generator_base import GeneratorBase
+from ...base.grid_transforms import synthesize_grid
 
 
 class ClassicSudokuGenerator(GeneratorBase):
     """Puzzle generator for classic Sudoku."""
 
-    def _generate_impl(self, difficulty: float):
-        random_seed = random.randint(1, 1_000_000)
+    variant = "classic"
+    sudoku_cls = ClassicSudoku
+    solver_backends = ("native", "engine")
+
+    def _generate_impl(self, difficulty: float, seed: int | None = None):
+        random_seed = seed if seed is not None else random.randint(1, 1_000_000)
+        if self.solver_backend == "engine":
+            return self._generate_with_engine(difficulty, random_seed)
+        progress_reporter.report(GRID)
+        solution = self._full_grid(random_seed)
+        puzzle = self._dig_holes(solution, difficulty, random.Random(random_seed))
+        return self._finish(puzzle, solution, difficulty), solution
+
+    def _generate_nested_impl(self, seed: int | None = None):
+        random_seed = seed if seed is not None else random.randint(1, 1_000_000)
+        progress_reporter.report(GRID)
+        solution = self._full_grid(random_seed)
+        puzzles = self._dig_nested(solution, DIFFICULTIES, random.Random(random_seed))
+        return {
+            difficulty: (self._finish(puzzle, solution, difficulty), solution)
+            for difficulty, puzzle in puzzles.items()
+        }
+
+    def _finish(self, puzzle, solution, difficulty: float):
+        """
+        Minimize a dug puzzle if needed. A dig that ran out of cells before
+        its target has already tried every clue, so only one that stopped
+        early can still shrink.
+        """
+        blanks = sum(value is None for row in puzzle for value in row)
+        if blanks >= int(difficulty * 81):
+            puzzle = self._minimize(puzzle, solution, difficulty)
+        return puzzle
+
+    def _full_grid(self, random_seed: int):
+        """A random complete grid, transformed from a canonical one."""
+        return synthesize_grid(random.Random(random_seed))
+
+    def _generate_with_engine(self, difficulty: float, random_seed: int):
         sudoku = PuzzleGenerator.make_puzzle(
-            sudoku_cls=ClassicSudoku,
+            sudoku_cls=self.sudoku_cls,
             size=9,
             difficulty=difficulty,
             ensure_unique=True,
             seed=random_seed,
         )
         puzzle = sudoku.board
-        solution = sudoku.solve().board
-        return puzzle, solution
+        solution = self._make_solver().solve(puzzle)
+        return self._minimize(puzzle, solution, difficulty), solution
@@ -26,14 +26,27 @@ from .generator import DiagonalSudokuGenerator
 
 
 class DiagonalSudokuBoard(ClassicSudokuBoard):
-    def __init__(self, difficulty: float, difficulty_label: str, variant: str):
+    generator_cls = DiagonalSudokuGenerator
+
+    def __init__(
+        self,
+        difficulty: float,
+        difficulty_label: str,
+        variant: str,
+        pregenerated=None,
+        on_progress=None,
+        cancellation=None,
+    ):
         BoardBase.__init__(
             self,
             DiagonalSudokuRules(),
-            DiagonalSudokuGenerator(),
+            self.generator_cls(),
             difficulty,
             difficulty_label,
             variant,
+            pregenerated=pregenerated,
+            on_progress=on_progress,
+            cancellation=cancellation,
         )
         prefs = PreferencesManager.get_preferences()
         self.variant_preferences = prefs.variant_defaults.copy()
@@ -44,7 +57,7 @@ class DiagonalSudokuBoard(ClassicSudokuBoard):
         return cls._load_from_file_common(
             filename=filename,
             rules=DiagonalSudokuRules(),
-            generator=DiagonalSudokuGenerator(),
+            generator=cls.generator_cls(),
         )
 
     def _iter_diagonal_cells(self, row: int, col: int) -> Iterable[Tuple[int, int]]:
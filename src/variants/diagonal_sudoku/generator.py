@@ -19,22 +19,24 @@
 
 import random
 from sudoku import DiagonalSudoku
-from sudoku.base_sudoku import PuzzleGenerator
 from ..classic_sudoku.generator import ClassicSudokuGenerator
 
 
 class DiagonalSudokuGenerator(ClassicSudokuGenerator):
-    """Puzzle generator for diagonal Sudoku, reusing Classic logic."""
+    """
+    Puzzle generator for diagonal Sudoku, reusing Classic logic. The native
+    backend never touches sudoku-engine's DiagonalSudoku: grids and
+    uniqueness checks come from BitmaskSolver with both diagonals as units.
+    """
 
-    def _generate_impl(self, difficulty: float):
-        random_seed = random.randint(1, 1_000_000)
-        sudoku = PuzzleGenerator.make_puzzle(
-            sudoku_cls=DiagonalSudoku,
-            size=9,
-            difficulty=difficulty,
-            ensure_unique=True,
-            seed=random_seed,
-        )
-        puzzle = sudoku.board
-        solution = sudoku.solve().board
-        return puzzle, solution
+    variant = "diagonal"
+    diagonal = True
+    sudoku_cls = DiagonalSudoku
+
+    def _full_grid(self, random_seed: int):
+        """
+        Band/stack permutations break the diagonals, so fill an empty grid
+        with the diagonal-aware solver, trying digits in random order.
+        """
+        empty = [[None] * 9 for _ in range(9)]
+        return self._make_solver().solve(empty, rng=random.Random(random_seed))
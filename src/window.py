@@ -17,18 +17,22 @@
 #
 # SPDX-License-Identifier: GPL-3.0-or-later
 
-from gi.repository import Adw, Gtk, Gio
+from gi.repository import Adw, Gtk, Gio, GLib
 from gettext import gettext as _
 from .screens.game_setup_dialog import GameSetupDialog
 from .screens.shortcuts_overlay import ShortcutsOverlay
 from .screens.finished_page import FinishedPage  # noqa: F401
 from .screens.loading_screen import LoadingScreen  # noqa: F401
 from .screens.preferences_dialog import PreferencesDialog
+from .variants.classic_sudoku.generator import ClassicSudokuGenerator
 from .variants.classic_sudoku.manager import ClassicSudokuManager
 from .variants.classic_sudoku.preferences import ClassicSudokuPreferences
+from .variants.diagonal_sudoku.generator import DiagonalSudokuGenerator
 from .variants.diagonal_sudoku.manager import DiagonalSudokuManager
 from .variants.diagonal_sudoku.preferences import DiagonalSudokuPreferences
 from .base.preferences_manager import PreferencesManager
+from .base.puzzle_reservoir import PuzzleReservoir
+from .base.speculative_generation import SpeculativeGeneration
 import os
 import json
 
@@ -74,6 +78,7 @@ class SudokuWindow(Adw.ApplicationWindow):
         self._setup_breakpoints()
         self._connect_buttons()
         self._build_primary_menu(show_preferences=False)
+        self._setup_reservoir()
 
         gesture = Gtk.GestureClick.new()
         gesture.set_button(0)
@@ -90,6 +95,16 @@ class SudokuWindow(Adw.ApplicationWindow):
         self.continue_button.set_visible(os.path.exists("saves/board.json"))
         self.home_button.set_visible(False)
 
+    def _setup_reservoir(self):
+        generators = {
+            "classic": ClassicSudokuGenerator(),
+            "diagonal": DiagonalSudokuGenerator(),
+        }
+        self.speculation = SpeculativeGeneration(generators)
+        reservoir = PuzzleReservoir(generators)
+        PuzzleReservoir.set_default(reservoir)
+        GLib.idle_add(reservoir.refill)
+
     def _update_preferences_visibility(self, visible: bool):
         self._build_primary_menu(show_preferences=visible)
 
@@ -117,15 +132,16 @@ class SudokuWindow(Adw.ApplicationWindow):
             self.loading_screen,
             self.finished_page,
         )
-        is_menu_or_loading = visible in (self.main_menu_box, self.loading_screen)
+        # Leaving the loading screen cancels the game being started.
+        is_menu = visible is self.main_menu_box
 
         # Update UI in a declarative way
         self._update_preferences_visibility(is_game_page)
         self.lookup_action("show-preferences").set_enabled(is_game_page)
         self.pencil_toggle_button.set_visible(is_game_page)
         self.lookup_action("show-primary-menu").set_enabled(is_game_page)
-        self.lookup_action("back-to-menu").set_enabled(not is_menu_or_loading)
-        self.home_button.set_visible(not is_menu_or_loading)
+        self.lookup_action("back-to-menu").set_enabled(not is_menu)
+        self.home_button.set_visible(not is_menu)
         self.primary_menu_button.set_visible(is_game_page)
 
         # Update subtitle for game pages
@@ -158,9 +174,16 @@ class SudokuWindow(Adw.ApplicationWindow):
         self._setup_ui()
 
     def on_new_game_clicked(self, _):
-        GameSetupDialog(on_select=self.on_game_setup_selected).present(self)
+        dialog = GameSetupDialog(
+            on_select=self.on_game_setup_selected,
+            on_selection_changed=self.speculation.retarget,
+        )
+        dialog.connect("closed", lambda *_: self.speculation.cancel())
+        dialog.present(self)
 
     def on_game_setup_selected(self, variant_name, difficulty):
+        if self.manager:
+            self.manager.cancel_start()
         self.manager, prefs = self._get_variant_and_prefs(variant_name)
         PreferencesManager.set_preferences(prefs)
 
@@ -174,7 +197,12 @@ class SudokuWindow(Adw.ApplicationWindow):
 
         self.sudoku_window_title.set_subtitle(f"{variant_name.capitalize()} • {label}")
         self._setup_ui()
-        self.manager.start_game(difficulty, label, variant_name)
+        self.manager.start_game(
+            difficulty,
+            label,
+            variant_name,
+            speculative=self.speculation.claim(variant_name, difficulty),
+        )
 
     def on_show_primary_menu(self):
         self.primary_menu_button.popup()
@@ -275,6 +303,8 @@ class SudokuWindow(Adw.ApplicationWindow):
         self.stack.set_valign(Gtk.Align.FILL)
 
     def on_back_to_menu(self, *_):
+        if self.manager:
+            self.manager.cancel_start()
         self.continue_button.set_visible(os.path.exists("saves/board.json"))
         self.sudoku_window_title.set_subtitle("")
         self.stack.set_visible_child(self.main_menu_box)
@@ -0,0 +1,167 @@
+"""Tests for the bitmask constraint-propagation solver."""
+
+import random
+import threading
+
+import pytest
+
+from src.base.bitmask_solver import (
+    BitmaskSolver,
+    SearchCancelled,
+    SolverEffort,
+    UniquenessTracker,
+    cancellation_points,
+    minimize,
+)
+
+PUZZLE = [
+    "53..7....",
+    "6..195...",
+    ".98....6.",
+    "8...6...3",
+    "4..8.3..1",
+    "7...2...6",
+    ".6....28.",
+    "...419..5",
+    "....8..79",
+]
+SOLUTION = [
+    "534678912",
+    "672195348",
+    "198342567",
+    "859761423",
+    "426853791",
+    "713924856",
+    "961537284",
+    "287419635",
+    "345286179",
+]
+
+
+def _grid(rows):
+    return [[None if ch == "." else int(ch) for ch in row] for row in rows]
+
+
+def _is_valid_solution(grid, diagonal=False):
+    units = [list(row) for row in grid]
+    units += [[grid[r][c] for r in range(9)] for c in range(9)]
+    units += [
+        [grid[br + r][bc + c] for r in range(3) for c in range(3)]
+        for br in (0, 3, 6)
+        for bc in (0, 3, 6)
+    ]
+    if diagonal:
+        units.append([grid[i][i] for i in range(9)])
+        units.append([grid[i][8 - i] for i in range(9)])
+    return all(sorted(unit) == list(range(1, 10)) for unit in units)
+
+
+def test_solves_known_puzzle():
+    assert BitmaskSolver().solve(_grid(PUZZLE)) == _grid(SOLUTION)
+
+
+def test_unique_puzzle_has_one_solution():
+    solver = BitmaskSolver()
+    assert solver.count_solutions(_grid(PUZZLE)) == 1
+    assert solver.has_unique_solution(_grid(PUZZLE))
+
+
+def test_effort_sums_tracked_solvers_once():
+    effort = SolverEffort()
+    solver = effort.track(BitmaskSolver())
+    solver.solve(_grid(PUZZLE))
+    assert effort.take() == solver.nodes > 0
+    assert effort.take() == 0
+
+
+def test_watched_event_cancels_search():
+    stop = threading.Event()
+    stop.set()
+    cancellation_points.watch(stop)
+    try:
+        with pytest.raises(SearchCancelled):
+            # Counting every solution of the empty grid never ends by itself.
+            BitmaskSolver().count_solutions([[None] * 9 for _ in range(9)], 10**9)
+    finally:
+        cancellation_points.watch(None)
+
+
+def test_count_stops_at_limit():
+    solver = BitmaskSolver()
+    empty = [[None] * 9 for _ in range(9)]
+    assert solver.count_solutions(empty, limit=2) == 2
+    assert solver.count_solutions(empty, limit=5) == 5
+
+
+def test_conflicting_givens_have_no_solution():
+    grid = _grid(PUZZLE)
+    grid[0][2] = 5  # duplicates the 5 at (0, 0)
+    solver = BitmaskSolver()
+    assert solver.count_solutions(grid) == 0
+    assert solver.solve(grid) is None
+
+
+def test_random_fill_respects_diagonals():
+    solver = BitmaskSolver(diagonal=True)
+    empty = [[None] * 9 for _ in range(9)]
+    grids = [solver.solve(empty, rng=random.Random(seed)) for seed in range(3)]
+    assert all(_is_valid_solution(grid, diagonal=True) for grid in grids)
+    assert grids[0] != grids[1]
+
+
+def test_tracker_agrees_with_full_uniqueness_check():
+    solver = BitmaskSolver()
+    tracker = UniquenessTracker(solver, _grid(SOLUTION))
+    order = list(range(81))
+    random.Random(7).shuffle(order)
+    for i in order:
+        kept = tracker.remove(i)
+        puzzle = tracker.puzzle()
+        assert solver.has_unique_solution(puzzle)
+        if not kept:
+            puzzle[i // 9][i % 9] = None
+            assert not solver.has_unique_solution(puzzle)
+
+
+def test_tracker_removes_forced_cells_without_search():
+    solver = BitmaskSolver()
+    tracker = UniquenessTracker(solver, _grid(SOLUTION))
+    assert tracker.remove(0)
+    assert tracker.free_removals == 1
+    assert solver.nodes == 0
+
+
+def test_minimize_leaves_no_removable_clue():
+    solver = BitmaskSolver()
+    puzzle, report = minimize(solver, _grid(PUZZLE), _grid(SOLUTION), budget=10)
+    assert report.complete
+    assert report.tested == 30
+    assert sum(v is not None for row in puzzle for v in row) == 30 - report.removed
+    assert solver.has_unique_solution(puzzle)
+    for r in range(9):
+        for c in range(9):
+            if puzzle[r][c] is not None:
+                reduced = [row[:] for row in puzzle]
+                reduced[r][c] = None
+                assert not solver.has_unique_solution(reduced)
+
+
+def test_minimize_stops_at_budget():
+    _, report = minimize(BitmaskSolver(), _grid(PUZZLE), _grid(SOLUTION), budget=-1)
+    assert report.tested == 0
+    assert not report.complete
+
+
+def test_group_removal_agrees_with_full_uniqueness_check():
+    solver = BitmaskSolver()
+    tracker = UniquenessTracker(solver, _grid(SOLUTION))
+    pairs = [(i, 80 - i) for i in range(40)]
+    random.Random(5).shuffle(pairs)
+    for pair in pairs:
+        kept = tracker.remove_group(pair)
+        puzzle = tracker.puzzle()
+        assert solver.has_unique_solution(puzzle)
+        if not kept:
+            for i in pair:
+                puzzle[i // 9][i % 9] = None
+            assert not solver.has_unique_solution(puzzle)
@@ -80,93 +80,53 @@ class TestDiagonalBoardLoadFromFile:
         assert board is None
 
 
-class TestManagerBoardClassUsage:
-    """Tests for manager using self.board_cls."""
+class _InstantGeneration:
+    """Stands in for MainLoopGeneration, answering as soon as it starts."""
 
-    def test_diagonal_manager_start_game_creates_diagonal_board(self):
-        """Verify DiagonalSudokuManager.start_game() creates DiagonalSudokuBoard."""
+    def __init__(self, generator, difficulty, callback, on_progress=None, within=5):
+        del on_progress, within
+        self.generator = generator
+        self.difficulty = difficulty
+        self._callback = callback
 
-        class _InstantThread:
-            def __init__(self, *args, target=None, daemon=True, **kwargs):
-                del args, daemon, kwargs
-                self._target = target or (lambda: None)
+    def start(self):
+        puzzle = [[None] * 9 for _ in range(9)]
+        solution = [[str((i * 9 + j + 1) % 9 + 1) for j in range(9)] for i in range(9)]
+        self._callback((puzzle, solution, self.difficulty, None), None)
 
-            def start(self):
-                self._target()
+    def cancel(self):
+        pass
 
-        def fake_idle_add(func, *args, **kwargs):
-            return func(*args, **kwargs) or True
 
-        def fake_generate(_self, _difficulty, timeout=5):
-            del timeout
-            puzzle = [[None] * 9 for _ in range(9)]
-            solution = [
-                [str((i * 9 + j + 1) % 9 + 1) for j in range(9)] for i in range(9)
-            ]
-            return puzzle, solution
-
-        mock_window = MagicMock()
-        mock_window.stack = MagicMock()
-        mock_window.loading_screen = MagicMock()
-        mock_window.game_scrolled_window = MagicMock()
-        manager = DiagonalSudokuManager(mock_window)
-
-        with patch(
-            "src.base.manager_base.threading.Thread",
-            _InstantThread,
-        ), patch(
-            "src.base.manager_base.GLib.idle_add",
-            fake_idle_add,
-        ), patch(
-            "src.base.generator_base.GeneratorBase.generate",
-            fake_generate,
-        ):
-            with patch.object(manager, "build_grid"):
-                manager.start_game(0.5, "Medium", "diagonal")
+def _start_game(manager, variant):
+    with patch("src.base.manager_base.MainLoopGeneration", _InstantGeneration):
+        with patch.object(manager, "build_grid"):
+            manager.start_game(0.5, "Medium", variant)
 
-        assert isinstance(manager.board, DiagonalSudokuBoard)
-        assert manager.board.variant == "diagonal"
 
-    def test_classic_manager_start_game_creates_classic_board(self):
-        """Verify ClassicSudokuManager.start_game() creates ClassicSudokuBoard."""
+def _mock_window():
+    mock_window = MagicMock()
+    mock_window.stack = MagicMock()
+    mock_window.loading_screen = MagicMock()
+    mock_window.game_scrolled_window = MagicMock()
+    return mock_window
 
-        class _InstantThread:
-            def __init__(self, *args, target=None, daemon=True, **kwargs):
-                del args, daemon, kwargs
-                self._target = target or (lambda: None)
 
-            def start(self):
-                self._target()
+class TestManagerBoardClassUsage:
+    """Tests for manager using self.board_cls."""
 
-        def fake_idle_add(func, *args, **kwargs):
-            return func(*args, **kwargs) or True
+    def test_diagonal_manager_start_game_creates_diagonal_board(self):
+        """Verify DiagonalSudokuManager.start_game() creates DiagonalSudokuBoard."""
+        manager = DiagonalSudokuManager(_mock_window())
+        _start_game(manager, "diagonal")
 
-        def fake_generate(_self, _difficulty, timeout=5):
-            del timeout
-            puzzle = [[None] * 9 for _ in range(9)]
-            solution = [
-                [str((i * 9 + j + 1) % 9 + 1) for j in range(9)] for i in range(9)
-            ]
-            return puzzle, solution
-
-        mock_window = MagicMock()
-        mock_window.stack = MagicMock()
-        mock_window.loading_screen = MagicMock()
-        mock_window.game_scrolled_window = MagicMock()
-        manager = ClassicSudokuManager(mock_window)
-
-        with patch(
-            "src.base.manager_base.threading.Thread",
-            _InstantThread,
-        ), patch(
-            "src.base.manager_base.GLib.idle_add",
-            fake_idle_add,
-        ), patch(
-            "src.base.generator_base.GeneratorBase.generate",
-            fake_generate,
-        ):
-            with patch.object(manager, "build_grid"):
-                manager.start_game(0.5, "Medium", "classic")
+        assert isinstance(manager.board, DiagonalSudokuBoard)
+        assert manager.board.variant == "diagonal"
+
+    def test_classic_manager_start_game_creates_classic_board(self):
+        """Verify ClassicSudokuManager.start_game() creates ClassicSudokuBoard."""
+        manager = ClassicSudokuManager(_mock_window())
+        _start_game(manager, "classic")
 
         assert isinstance(manager.board, ClassicSudokuBoard)
         assert manager.board.variant == "classic"
@@ -0,0 +1,89 @@
+"""Tests for adaptive generation timeouts and graceful degradation."""
+
+from src.base.constants import EASY_DIFFICULTY
+from src.base.generation_policy import GenerationPolicy, percentile
+from src.base.generator_base import GeneratorBase
+
+
+class _FlakyGenerator(GeneratorBase):
+    """Times out at every difficulty above `works_at`."""
+
+    variant = "test"
+
+    def __init__(self, works_at: float):
+        self.works_at = works_at
+        self.attempts = []
+
+    def generate_seeded(
+        self, difficulty, timeout=5, race=None, on_progress=None, cancellation=None
+    ):
+        self.attempts.append(difficulty)
+        if difficulty > self.works_at:
+            raise TimeoutError("Puzzle generation timed out")
+        return [[None] * 9] * 9, [[1] * 9] * 9, 42
+
+    def _generate_impl(self, difficulty, seed=None):
+        raise NotImplementedError
+
+
+def test_percentile_nearest_rank():
+    values = list(range(1, 101))
+    assert percentile(values, 50) == 50
+    assert percentile(values, 95) == 95
+    assert percentile([], 95) == 0.0
+
+
+def test_budget_defaults_until_enough_samples():
+    policy = GenerationPolicy()
+    policy.record("classic", 0.9, 0.2)
+    assert policy.budget("classic", 0.9) == policy.DEFAULT_BUDGET
+
+
+def test_budget_follows_p95_with_headroom():
+    policy = GenerationPolicy()
+    for _ in range(10):
+        policy.record("classic", 0.7, 2.0)
+    assert policy.budget("classic", 0.7) == 2.0 * policy.HEADROOM
+
+    for _ in range(50):
+        policy.record("classic", 0.2, 0.01)
+    assert policy.budget("classic", 0.2) == policy.MIN_BUDGET
+
+
+def test_generate_adaptive_returns_requested_difficulty_when_possible():
+    generator = _FlakyGenerator(works_at=0.9)
+    _puzzle, _solution, difficulty, seed = generator.generate_adaptive(0.9)
+    assert difficulty == 0.9
+    assert seed == 42
+    assert generator.attempts == [0.9]
+
+
+def test_generate_adaptive_retries_then_steps_down():
+    generator = _FlakyGenerator(works_at=0.5)
+    _puzzle, _solution, difficulty, _seed = generator.generate_adaptive(0.9)
+    assert difficulty == 0.5
+    assert generator.attempts == [0.9, 0.9, 0.7, 0.5]
+
+
+def test_generate_adaptive_stays_within_the_given_budget():
+    generator = _FlakyGenerator(works_at=0.5)
+    assert all(timeout <= 3 for _, timeout in generator._attempts(0.9, within=3))
+    # With the budget spent, only the guaranteed Easy attempt is left.
+    _puzzle, _solution, difficulty, _seed = generator.generate_adaptive(0.9, within=0)
+    assert difficulty == EASY_DIFFICULTY
+    assert generator.attempts == [EASY_DIFFICULTY]
+
+
+def test_timeouts_raise_the_budget():
+    policy = GenerationPolicy()
+    for _ in range(policy.MIN_SAMPLES):
+        policy.record_timeout("classic", 0.9, policy.DEFAULT_BUDGET)
+    assert policy.budget("classic", 0.9) > policy.DEFAULT_BUDGET
+
+
+def test_short_timeouts_do_not_lower_the_budget():
+    policy = GenerationPolicy()
+    for _ in range(10):
+        policy.record("classic", 0.7, 2.0)
+    policy.record_timeout("classic", 0.7, 0.5)
+    assert policy.budget("classic", 0.7) == 2.0 * policy.HEADROOM
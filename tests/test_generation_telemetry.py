@@ -0,0 +1,60 @@
+"""Tests for the on-disk generation telemetry store."""
+
+import threading
+from unittest.mock import patch
+
+from src.base.generation_telemetry import GenerationTelemetry
+
+
+def _puzzle(clues: int):
+    return [[1 if r * 9 + c < clues else None for c in range(9)] for r in range(9)]
+
+
+def test_nothing_is_recorded_until_opened(tmp_path):
+    telemetry = GenerationTelemetry()
+    telemetry.record_run("classic", 0.2, 0.01, _puzzle(40))
+    assert telemetry.summary() == "disabled"
+
+
+def test_summary_reports_percentiles_effort_and_timeouts(tmp_path):
+    telemetry = GenerationTelemetry()
+    telemetry.open(str(tmp_path / "telemetry.json"))
+    for ms in range(1, 101):
+        telemetry.record_run(
+            "classic", 0.9, ms / 1000, _puzzle(24), {"seconds": 0.001, "nodes": 300}
+        )
+    telemetry.record_timeout("classic", 0.9, 5.0, {"seeds": [4821], "timeout": 5})
+
+    summary = telemetry.summary()
+    assert "classic 0.9: 100 runs, p50 50 ms, p95 95 ms, p99 99 ms" in summary
+    assert "median 300 nodes, 24 clues; 1 timeouts (1%)" in summary
+    assert "Timed out: classic 0.9 {'seconds': 5.0, 'seeds': [4821]" in summary
+
+
+def test_store_is_bounded_and_survives_restart(tmp_path):
+    path = str(tmp_path / "telemetry.json")
+    telemetry = GenerationTelemetry()
+    telemetry.open(path)
+    for _ in range(GenerationTelemetry.RUNS_PER_KEY + 10):
+        telemetry.record_run("diagonal", 0.5, 0.02, _puzzle(30))
+    telemetry.flush()
+
+    reopened = GenerationTelemetry()
+    reopened.open(path)
+    assert f"{GenerationTelemetry.RUNS_PER_KEY} runs" in reopened.summary()
+
+
+def test_runs_are_written_in_batches(tmp_path):
+    path = tmp_path / "telemetry.json"
+    telemetry = GenerationTelemetry()
+    telemetry.open(str(path))
+    with patch.object(threading, "Timer") as timer:
+        telemetry.record_run("classic", 0.2, 0.01, _puzzle(40))
+        telemetry.record_run("classic", 0.2, 0.01, _puzzle(40))
+    timer.assert_called_once_with(GenerationTelemetry.SAVE_DELAY, telemetry.flush)
+    assert not path.exists()
+
+    telemetry.flush()
+    reopened = GenerationTelemetry()
+    reopened.open(str(path))
+    assert "classic 0.2: 2 runs" in reopened.summary()
@@ -11,32 +11,101 @@ sys.modules["gi.repository.Gdk"] = MagicMock()
 sys.modules["gi.repository.GLib"] = MagicMock()
 sys.modules["gi.repository.Adw"] = MagicMock()
 
+from src.base.bitmask_solver import BitmaskSolver
+from src.base.grid_transforms import canonical_grid
 from src.variants.classic_sudoku.generator import ClassicSudokuGenerator
+from src.variants.diagonal_sudoku.generator import DiagonalSudokuGenerator
+from src.variants.diagonal_sudoku.rules import DiagonalSudokuRules
 
 
 class TestGeneratorContract:
     """Tests for GeneratorBase contract."""
 
     def test_generate_impl_returns_tuple(self):
-        """Verify _generate_impl returns (puzzle, solution) tuple."""
+        """Verify the engine path returns a (puzzle, solution) tuple."""
         generator = ClassicSudokuGenerator()
+        generator.solver_backend = "engine"
 
         with patch(
             "src.variants.classic_sudoku.generator.PuzzleGenerator"
         ) as mock_puzzle:
             mock_sudoku = MagicMock()
-            mock_sudoku.board = [[0] * 9 for _ in range(9)]
-            mock_sudoku.solve.return_value = mock_sudoku
+            mock_sudoku.board = [
+                [v if (r + c) % 2 else None for c, v in enumerate(row)]
+                for r, row in enumerate(canonical_grid())
+            ]
             mock_puzzle.make_puzzle.return_value = mock_sudoku
 
             puzzle, solution = generator._generate_impl(0.5)
 
-            # Verify it returns a tuple of two elements
-            assert isinstance(puzzle, list)
-            assert isinstance(solution, list)
-            assert isinstance(puzzle[0], list)
-            assert isinstance(solution[0], list)
-            assert len(puzzle) == 9
-            assert len(solution) == 9
-            assert len(puzzle[0]) == 9
-            assert len(solution[0]) == 9
+            mock_puzzle.make_puzzle.assert_called_once()
+            self._assert_grids(puzzle, solution)
+            assert solution == canonical_grid()
+
+    def test_native_generate_impl_returns_tuple(self):
+        """Verify the native path returns a (puzzle, solution) tuple."""
+        generator = ClassicSudokuGenerator()
+        assert generator.solver_backend == "native"
+
+        with patch(
+            "src.variants.classic_sudoku.generator.PuzzleGenerator"
+        ) as mock_puzzle:
+            puzzle, solution = generator._generate_impl(0.5, seed=3)
+
+        mock_puzzle.make_puzzle.assert_not_called()
+        self._assert_grids(puzzle, solution)
+
+    def _assert_grids(self, puzzle, solution):
+        assert isinstance(puzzle, list)
+        assert isinstance(solution, list)
+        assert isinstance(puzzle[0], list)
+        assert isinstance(solution[0], list)
+        assert len(puzzle) == 9
+        assert len(solution) == 9
+        assert len(puzzle[0]) == 9
+        assert len(solution[0]) == 9
+
+    def test_native_diagonal_generator_respects_diagonals(self):
+        """Verify the native diagonal path yields a unique diagonal puzzle."""
+        generator = DiagonalSudokuGenerator()
+
+        with patch.object(DiagonalSudokuGenerator, "sudoku_cls", None):
+            puzzle, solution = generator._generate_impl(0.7, seed=4)
+
+        rules = DiagonalSudokuRules()
+        for row in range(9):
+            for col in range(9):
+                grid = [line[:] for line in solution]
+                grid[row][col] = None
+                assert rules.is_valid(grid, row, col, solution[row][col])
+                assert puzzle[row][col] in (None, solution[row][col])
+        assert BitmaskSolver(diagonal=True).has_unique_solution(puzzle)
+
+    def test_nested_dig_matches_separate_digs(self):
+        """Verify one nested dig yields the same puzzles as four digs."""
+        generator = ClassicSudokuGenerator()
+        nested = generator._generate_nested_impl(seed=11)
+
+        easier = None
+        for difficulty in sorted(nested):
+            puzzle, _ = nested[difficulty]
+            assert (puzzle, nested[difficulty][1]) == generator._generate_impl(
+                difficulty, seed=11
+            )
+            if easier is not None:
+                for row, easier_row in zip(puzzle, easier):
+                    for value, easier_value in zip(row, easier_row):
+                        assert value is None or value == easier_value
+            easier = puzzle
+
+    def test_symmetric_mode_lays_out_clues_symmetrically(self):
+        """Verify symmetric digs keep paired cells both given or both blank."""
+        for generator in (ClassicSudokuGenerator(), DiagonalSudokuGenerator()):
+            generator.symmetry = "rotational"
+            puzzle, _ = generator._generate_impl(0.9, seed=2)
+            for row in range(9):
+                for col in range(9):
+                    mirrored = puzzle[8 - row][8 - col]
+                    assert (puzzle[row][col] is None) == (mirrored is None)
+            solver = BitmaskSolver(diagonal=generator.diagonal)
+            assert solver.has_unique_solution(puzzle)
@@ -0,0 +1,342 @@
+"""Tests for the warm generator worker pool."""
+
+import asyncio
+import itertools
+import os
+import threading
+import time
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+
+from src.base.bitmask_solver import MinimizeReport, minimize_reports
+from src.base.constants import RATING_BANDS
+from src.base.generation_progress import DIG, ProgressReporter, progress_reporter
+from src.base.generator_base import (
+    GeneratorBase,
+    derivation_cache,
+    minimize_stats,
+    race_stats,
+    rated_side_cache,
+)
+from src.base.generator_pool import (
+    Cancellation,
+    GenerationCancelled,
+    GeneratorPool,
+    JobPriority,
+    first_successful,
+)
+from src.base.grid_transforms import canonical_grid
+from src.variants.classic_sudoku.generator import ClassicSudokuGenerator
+from src.variants.diagonal_sudoku.generator import DiagonalSudokuGenerator
+
+
+class _PidGenerator(GeneratorBase):
+    """Returns the worker pid so tests can observe worker reuse."""
+
+    derivations_per_puzzle = 0
+
+    def _generate_impl(self, difficulty: float, seed=None):
+        return os.getpid(), difficulty
+
+
+class _SlowGenerator(GeneratorBase):
+    def _generate_impl(self, difficulty: float, seed=None):
+        time.sleep(difficulty)
+        return [], []
+
+
+class _FailingGenerator(GeneratorBase):
+    def _generate_impl(self, difficulty: float, seed=None):
+        raise ValueError("boom")
+
+
+@pytest.fixture
+def pool():
+    pool = GeneratorPool(max_workers=2)
+    try:
+        yield pool
+    finally:
+        pool.shutdown()
+
+
+def test_result_is_handed_back(pool):
+    pid, difficulty = pool.submit(_PidGenerator(), 0.5).result(timeout=10)
+    assert difficulty == 0.5
+    assert pid != os.getpid()
+
+
+def test_worker_reports_its_effort(pool):
+    job = pool.submit(_PidGenerator(), 0.5)
+    job.result(timeout=10)
+    assert job.effort["nodes"] == 0
+    assert 0 <= job.effort["seconds"] < 10
+
+
+class _ProgressGenerator(GeneratorBase):
+    def _generate_impl(self, difficulty: float, seed=None):
+        progress_reporter.report(DIG, removed=5, checks=3)
+        return [], []
+
+
+def test_progress_reaches_the_job(pool):
+    job = pool.submit(_ProgressGenerator(), 0.5)
+    job.result(timeout=10)
+    assert job.progress == {"phase": DIG, "removed": 5, "checks": 3}
+
+
+def test_progress_reports_are_throttled_within_a_phase():
+    reports = []
+    reporter = ProgressReporter()
+    reporter.connect(reports.append)
+    for removed in range(10):
+        reporter.report(DIG, removed)
+    reporter.report("minimize")
+    assert [r["removed"] for r in reports] == [0, 0]
+    assert reports[-1]["phase"] == "minimize"
+
+
+def test_worker_stays_warm_between_jobs(pool):
+    first, _ = pool.submit(_PidGenerator(), 0.2).result(timeout=10)
+    second, _ = pool.submit(_PidGenerator(), 0.2).result(timeout=10)
+    assert first == second
+
+
+def test_timeout_raises_and_pool_recovers(pool):
+    with pytest.raises(TimeoutError):
+        pool.submit(_SlowGenerator(), 30).result(timeout=0.2)
+    pid, _ = pool.submit(_PidGenerator(), 0.2).result(timeout=10)
+    assert pid != os.getpid()
+
+
+def test_cancelled_job_raises(pool):
+    job = pool.submit(_SlowGenerator(), 30)
+    job.cancel()
+    with pytest.raises(GenerationCancelled):
+        job.result(timeout=1)
+
+
+def test_job_can_be_awaited(pool):
+    async def generate():
+        return await pool.submit(_PidGenerator(), 0.5)
+
+    pid, difficulty = asyncio.run(generate())
+    assert difficulty == 0.5 and pid != os.getpid()
+
+
+def test_cancelling_the_awaiting_task_cancels_the_job(pool):
+    job = pool.submit(_SlowGenerator(), 30)
+
+    async def wait():
+        await job
+
+    async def abandon():
+        task = asyncio.ensure_future(wait())
+        await asyncio.sleep(0.05)
+        task.cancel()
+
+    asyncio.run(abandon())
+    with pytest.raises(GenerationCancelled):
+        job.result(timeout=1)
+
+
+def test_cancellation_cancels_jobs_added_before_and_after(pool):
+    cancellation = Cancellation()
+    before = pool.submit(_SlowGenerator(), 30)
+    cancellation.add(before.cancel)
+    cancellation.cancel()
+    after = pool.submit(_SlowGenerator(), 30)
+    cancellation.add(after.cancel)
+    for job in (before, after):
+        with pytest.raises(GenerationCancelled):
+            job.result(timeout=1)
+
+
+def test_worker_error_becomes_runtime_error(pool):
+    with pytest.raises(RuntimeError):
+        pool.submit(_FailingGenerator(), 0.5).result(timeout=10)
+
+
+def test_jobs_beyond_max_workers_are_queued(pool):
+    jobs = [pool.submit(_PidGenerator(), 0.1 * i) for i in range(5)]
+    pids = {job.result(timeout=10)[0] for job in jobs}
+    assert len(pids) <= pool.max_workers
+
+
+def test_first_successful_skips_slow_and_failed_jobs(pool):
+    slow = pool.submit(_SlowGenerator(), 30)
+    failed = pool.submit(_FailingGenerator(), 0.5)
+    try:
+        fast = pool.submit(_PidGenerator(), 0.5)
+        assert first_successful([slow, failed, fast], timeout=10) is fast
+    finally:
+        slow.cancel()
+
+
+def test_race_returns_winner_and_records_stats(pool):
+    races_before = race_stats.races
+    with patch("src.base.generator_base.get_pool", return_value=pool):
+        pid, difficulty = _PidGenerator().generate(0.9, timeout=10, race=2)
+    assert difficulty == 0.9
+    assert pid != os.getpid()
+    assert race_stats.races == races_before + 1
+
+
+class _MinimizingGenerator(GeneratorBase):
+    derivations_per_puzzle = 0
+
+    def _generate_impl(self, difficulty: float, seed=None):
+        minimize_reports.add(MinimizeReport(3, 5, 0.01, True))
+        return [], []
+
+
+def test_minimize_reports_reach_the_parent(pool):
+    passes_before, removed_before = minimize_stats.passes, minimize_stats.removed
+    with patch("src.base.generator_base.get_pool", return_value=pool):
+        _MinimizingGenerator().generate(0.9, timeout=10, race=1)
+    assert minimize_stats.passes == passes_before + 1
+    assert minimize_stats.removed == removed_before + 3
+
+
+def test_interactive_job_preempts_background_job():
+    pool = GeneratorPool(max_workers=1)
+    try:
+        background = pool.submit(
+            _SlowGenerator(), 30, priority=JobPriority.BACKGROUND
+        )
+        interactive = pool.submit(_PidGenerator(), 0.5)
+        assert interactive.result(timeout=10)[1] == 0.5
+        assert not background.done()
+
+        stats = pool.stats()
+        assert stats["background"]["preempted"] == 1
+        assert stats["background"]["running"] == 1
+        assert stats["interactive"]["started"] == 1
+        background.cancel()
+    finally:
+        pool.shutdown()
+
+
+def test_promoted_job_restarts_on_a_normal_worker(pool):
+    job = pool.submit(_SlowGenerator(), 30, priority=JobPriority.BACKGROUND)
+    (worker, _), = pool._busy.values()
+    assert worker.demoted
+    job.promote()
+    (worker, running), = pool._busy.values()
+    assert running is job and not worker.demoted
+    assert pool.stats()["interactive"]["running"] == 1
+    job.cancel()
+
+
+def test_queued_interactive_jobs_run_before_background_jobs():
+    pool = GeneratorPool(max_workers=1)
+    try:
+        blocker = pool.submit(_SlowGenerator(), 0.3)
+        background = pool.submit(_PidGenerator(), 0.1, priority=JobPriority.BACKGROUND)
+        interactive = pool.submit(_PidGenerator(), 0.2)
+        assert pool.stats()["background"]["queued"] == 1
+
+        order = []
+        background.add_done_callback(lambda job: order.append("background"))
+        interactive.add_done_callback(lambda job: order.append("interactive"))
+        blocker.result(timeout=10)
+        background.result(timeout=10)
+        assert order == ["interactive", "background"]
+    finally:
+        pool.shutdown()
+
+
+class _GridGenerator(GeneratorBase):
+    variant = "test-grid"
+    derivations_per_puzzle = 2
+
+    def _generate_impl(self, difficulty: float, seed=None):
+        solution = canonical_grid()
+        puzzle = [[v if c % 2 else None for c, v in enumerate(row)] for row in solution]
+        return puzzle, solution
+
+
+def test_slow_difficulties_are_served_by_derivations(pool):
+    derivation_cache.clear()
+    generator = _GridGenerator()
+    with patch("src.base.generator_base.get_pool", return_value=pool):
+        with patch.object(pool, "submit", wraps=pool.submit) as submit:
+            results = [generator.generate(0.9, timeout=10, race=1) for _ in range(4)]
+            generator.generate(0.2, timeout=10)
+    assert submit.call_count == 3
+    fresh, first, second, fresh_again = (puzzle for puzzle, _ in results)
+    assert fresh == fresh_again
+    assert first != fresh and second != fresh
+    blanks = sum(v is None for row in fresh for v in row)
+    assert sum(v is None for row in first for v in row) == blanks
+
+
+class _SinglesGenerator(GeneratorBase):
+    """Every puzzle is solvable with singles, i.e. rated Easy."""
+
+    variant = "test-singles"
+
+    def _generate_impl(self, difficulty: float, seed=None):
+        solution = canonical_grid()
+        puzzle = [
+            [None if r == c else v for c, v in enumerate(row)]
+            for r, row in enumerate(solution)
+        ]
+        return puzzle, solution
+
+
+def test_rated_generation_returns_puzzle_in_band(pool):
+    with patch("src.base.generator_base.get_pool", return_value=pool):
+        puzzle, solution, score = _SinglesGenerator().generate_rated(0.2, budget=10)
+    assert score < 20
+    assert sum(v is None for row in puzzle for v in row) == 9
+
+
+@pytest.mark.parametrize(
+    "generator_cls", [ClassicSudokuGenerator, DiagonalSudokuGenerator]
+)
+def test_rated_medium_lands_in_its_band(pool, generator_cls):
+    rated_side_cache.clear()
+    with patch("src.base.generator_base.get_pool", return_value=pool):
+        _, _, score = generator_cls().generate_rated(0.5)
+    low, high = RATING_BANDS[0.5]
+    assert low <= score < high
+
+
+def test_rated_generation_returns_closest_candidate_at_deadline(pool):
+    # Each clock reading is 10 s later: the first candidate gets 20 s of
+    # real time to arrive, and the deadline passes two readings after.
+    clock = SimpleNamespace(monotonic=itertools.count(0, 10).__next__)
+    with (
+        patch("src.base.generator_base.get_pool", return_value=pool),
+        patch("src.base.generator_base.time", clock),
+    ):
+        # Nothing is ever Hard: the closest candidate comes back at the deadline.
+        _, _, score = _SinglesGenerator().generate_rated(0.7, budget=30)
+    assert score < 20
+
+
+def test_rated_misses_are_kept_for_their_band(pool):
+    rated_side_cache.clear()
+    generator = _SinglesGenerator()
+    easy, medium = ("easy", None, 10), ("medium", None, 45)
+    assert generator._keep_closest(None, easy, 0.7) is easy
+    assert generator._keep_closest(easy, medium, 0.7) is medium
+    assert rated_side_cache.count(generator.variant, 0.2) == 1
+    with patch("src.base.generator_base.get_pool", return_value=pool):
+        with patch.object(pool, "submit") as submit:
+            assert generator.generate_rated(0.2) is easy
+    submit.assert_not_called()
+
+
+def test_cancelled_rated_generation_stops_early(pool):
+    cancellation = Cancellation()
+    threading.Timer(0.2, cancellation.cancel).start()
+    started = time.monotonic()
+    with patch("src.base.generator_base.get_pool", return_value=pool):
+        with pytest.raises(GenerationCancelled):
+            _SinglesGenerator().generate_rated(
+                0.7, budget=10, cancellation=cancellation
+            )
+    assert time.monotonic() - started < 5
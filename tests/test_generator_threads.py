@@ -0,0 +1,73 @@
+"""Tests for the thread-based generator pool."""
+
+import threading
+import time
+
+import pytest
+
+from src.base.bitmask_solver import BitmaskSolver, solver_effort
+from src.base.generator_base import GeneratorBase
+from src.base.generator_pool import GenerationCancelled, JobPriority
+from src.base.generator_threads import ThreadGeneratorPool
+
+
+class _ThreadGenerator(GeneratorBase):
+    derivations_per_puzzle = 0
+
+    def _generate_impl(self, difficulty: float, seed=None):
+        solver = solver_effort.track(BitmaskSolver())
+        grid = solver.solve([[None] * 9 for _ in range(9)])
+        return threading.get_ident(), grid
+
+
+class _EndlessGenerator(GeneratorBase):
+    """Searches until cancelled."""
+
+    def _generate_impl(self, difficulty: float, seed=None):
+        empty = [[None] * 9 for _ in range(9)]
+        BitmaskSolver().count_solutions(empty, limit=10**9)
+        return [], []
+
+
+@pytest.fixture
+def pool():
+    pool = ThreadGeneratorPool(max_workers=1)
+    try:
+        yield pool
+    finally:
+        pool.shutdown()
+
+
+def test_result_and_effort_are_handed_back(pool):
+    job = pool.submit(_ThreadGenerator(), 0.5)
+    ident, grid = job.result(timeout=10)
+    assert ident != threading.get_ident()
+    assert len(grid) == 9
+    assert job.effort["nodes"] > 0
+
+
+def test_cancel_stops_the_search(pool):
+    job = pool.submit(_EndlessGenerator(), 0.5)
+    time.sleep(0.05)
+    job.cancel()
+    with pytest.raises(GenerationCancelled):
+        job.result(timeout=1)
+    # The stopped thread gave its slot back, so the next job runs.
+    assert pool.submit(_ThreadGenerator(), 0.5).result(timeout=10)
+
+
+def test_interactive_job_preempts_background_job(pool):
+    background = pool.submit(_EndlessGenerator(), 0.5, priority=JobPriority.BACKGROUND)
+    time.sleep(0.05)
+    pool.submit(_ThreadGenerator(), 0.5).result(timeout=10)
+    assert pool.stats()["background"]["preempted"] == 1
+    background.cancel()
+
+
+def test_promoted_job_restarts_on_a_new_thread(pool):
+    job = pool.submit(_EndlessGenerator(), 0.5, priority=JobPriority.BACKGROUND)
+    demoted_run = pool._running[job]
+    job.promote()
+    assert demoted_run.is_set()
+    assert not pool._running[job].is_set()
+    job.cancel()
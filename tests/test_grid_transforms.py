@@ -0,0 +1,69 @@
+"""Tests for grid synthesis and validity-preserving transforms."""
+
+import random
+
+from src.base.bitmask_solver import BitmaskSolver
+from src.base.grid_transforms import (
+    GridTransform,
+    canonical_grid,
+    cell_orbits,
+    synthesize_grid,
+)
+
+
+def _is_valid_solution(grid, diagonal=False):
+    units = [list(row) for row in grid]
+    units += [[grid[r][c] for r in range(9)] for c in range(9)]
+    units += [
+        [grid[br + r][bc + c] for r in range(3) for c in range(3)]
+        for br in (0, 3, 6)
+        for bc in (0, 3, 6)
+    ]
+    if diagonal:
+        units.append([grid[i][i] for i in range(9)])
+        units.append([grid[i][8 - i] for i in range(9)])
+    return all(sorted(unit) == list(range(1, 10)) for unit in units)
+
+
+def test_canonical_grid_is_valid():
+    assert _is_valid_solution(canonical_grid())
+
+
+def test_synthesized_grids_are_valid_and_varied():
+    grids = [synthesize_grid(random.Random(seed)) for seed in range(20)]
+    assert all(_is_valid_solution(grid) for grid in grids)
+    assert len({str(grid) for grid in grids}) == 20
+
+
+def test_transform_keeps_blanks_aligned_with_solution():
+    solution = synthesize_grid(random.Random(1))
+    puzzle = [
+        [v if (r + c) % 3 else None for c, v in enumerate(row)]
+        for r, row in enumerate(solution)
+    ]
+    transform = GridTransform.random_classic(random.Random(2))
+    new_puzzle, new_solution = transform.apply(puzzle), transform.apply(solution)
+    assert _is_valid_solution(new_solution)
+    for r in range(9):
+        for c in range(9):
+            assert new_puzzle[r][c] in (None, new_solution[r][c])
+    assert sum(v is None for row in new_puzzle for v in row) == 27
+
+
+def test_diagonal_transforms_keep_diagonals_valid():
+    solution = BitmaskSolver(diagonal=True).solve(
+        [[None] * 9 for _ in range(9)], rng=random.Random(3)
+    )
+    for seed in range(50):
+        transform = GridTransform.random_diagonal(random.Random(seed))
+        assert _is_valid_solution(transform.apply(solution), diagonal=True)
+
+
+def test_cell_orbits_cover_the_grid_once():
+    for symmetry in (None, "rotational", "mirror", "diagonal"):
+        cells = [i for orbit in cell_orbits(symmetry) for i in orbit]
+        assert sorted(cells) == list(range(81))
+    assert (0, 80) in cell_orbits("rotational")
+    assert (0, 8) in cell_orbits("mirror")
+    assert (1, 9) in cell_orbits("diagonal")
+    assert (40,) in cell_orbits("rotational")
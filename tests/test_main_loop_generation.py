@@ -0,0 +1,100 @@
+"""Tests for generation driven by the main loop."""
+
+import sys
+from unittest.mock import MagicMock, patch
+
+# Mock GTK modules before importing anything else
+sys.modules["gi"] = MagicMock()
+sys.modules["gi.repository"] = MagicMock()
+sys.modules["gi.repository.GLib"] = MagicMock()
+
+from src.base.constants import EASY_DIFFICULTY  # noqa: E402
+from src.base.main_loop_generation import MainLoopGeneration  # noqa: E402
+from src.base.puzzle_sources import FRESH, PuzzleSource, PuzzleSources  # noqa: E402
+from src.variants.classic_sudoku.generator import (  # noqa: E402
+    ClassicSudokuGenerator,
+)
+
+PUZZLE = [[None] * 9 for _ in range(9)]
+SOLUTION = [[1] * 9 for _ in range(9)]
+
+
+class _Source(PuzzleSource):
+    def __init__(self, seconds=0.0, result=None, generator=None):
+        self.name = "test"
+        self.seconds = seconds
+        self.result = result
+        self.generator = generator
+        self.recorded = []
+
+    def expected_seconds(self, generator, difficulty):
+        return self.seconds
+
+    def quality(self, generator):
+        return FRESH
+
+    def get(self, generator, difficulty, timeout, on_progress, cancellation):
+        return self.result
+
+    def generator_for(self, generator):
+        return self.generator
+
+    def timeout(self, generator, difficulty, remaining):
+        return min(remaining, 2.0)
+
+    def record(self, generator, difficulty, seconds):
+        self.recorded.append(difficulty)
+
+
+def _run(source, generator, within=5.0):
+    registry = PuzzleSources()
+    registry.register(source)
+    results = []
+    with patch("src.base.main_loop_generation.puzzle_sources", registry):
+        generation = MainLoopGeneration(
+            generator, 0.7, lambda *args: results.append(args), within=within
+        )
+        generation.start()
+    return generation, results
+
+
+def test_instant_source_answers_from_start():
+    source = _Source(result=(PUZZLE, SOLUTION, "code"))
+    _, results = _run(source, ClassicSudokuGenerator())
+    assert results == [((PUZZLE, SOLUTION, 0.7, "code"), None)]
+
+
+def test_pooled_source_gets_its_own_timeout_and_history():
+    generator = ClassicSudokuGenerator()
+    job = MagicMock()
+    job.succeeded.return_value = True
+    done = []
+    with (
+        patch("src.base.main_loop_generation.GLib") as glib,
+        patch.object(generator, "_submit_seeded", return_value=[job]),
+        patch.object(generator, "_accept", return_value=(PUZZLE, SOLUTION, 42)),
+        patch(
+            "src.base.main_loop_generation.when_done",
+            lambda job, callback: done.append(callback),
+        ),
+    ):
+        source = _Source(seconds=1.0, generator=generator)
+        _, results = _run(source, generator)
+        glib.timeout_add.assert_called_once()
+        assert glib.timeout_add.call_args[0][0] == 2000
+        done[0](job)
+    assert results == [((PUZZLE, SOLUTION, 0.7, generator.puzzle_code(0.7, 42)), None)]
+    assert source.recorded == [0.7]
+
+
+def test_spent_budget_still_tries_easy():
+    generator = ClassicSudokuGenerator()
+    with (
+        patch("src.base.main_loop_generation.GLib"),
+        patch("src.base.main_loop_generation.when_done"),
+        patch.object(generator, "_submit_seeded", return_value=[MagicMock()]) as submit,
+    ):
+        _, results = _run(_Source(), generator, within=0.0)
+    submit.assert_called_once()
+    assert submit.call_args[0][0] == EASY_DIFFICULTY
+    assert results == []
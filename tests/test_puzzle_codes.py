@@ -0,0 +1,107 @@
+"""Tests for puzzle codes and regenerating puzzles from them."""
+
+import json
+from unittest.mock import patch
+
+import pytest
+
+from src.base import puzzle_codes
+from src.base.board_base import BoardBase
+from src.base.constants import DIFFICULTIES
+from src.base.preferences_manager import PreferencesManager
+from src.base.puzzle_codes import RegenerationCache, parse_puzzle_code, puzzle_code
+from src.variants.classic_sudoku.board import ClassicSudokuBoard
+from src.variants.classic_sudoku.generator import ClassicSudokuGenerator
+from src.variants.diagonal_sudoku.generator import DiagonalSudokuGenerator
+
+
+def test_code_round_trip():
+    code = puzzle_code("classic", 0.7, 48213)
+    assert code == f"{puzzle_codes.GENERATOR_VERSION}-classic-0.7-48213"
+    assert parse_puzzle_code(code) == ("classic", 0.7, 48213, None)
+    assert parse_puzzle_code(puzzle_code("diagonal", 0.2, 5, "mirror"))[3] == "mirror"
+
+
+def test_malformed_and_foreign_codes_are_rejected():
+    with pytest.raises(ValueError):
+        parse_puzzle_code("classic-0.7")
+    with patch.object(puzzle_codes, "GENERATOR_VERSION", 2):
+        with pytest.raises(ValueError):
+            parse_puzzle_code("1-classic-0.7-48213")
+    with pytest.raises(ValueError):
+        DiagonalSudokuGenerator().check_puzzle_code("1-classic-0.7-48213")
+
+
+def test_cache_keeps_most_recent_codes(tmp_path):
+    path = str(tmp_path / "regenerated.json")
+    cache = RegenerationCache(path)
+    for seed in range(RegenerationCache.CAPACITY + 1):
+        cache.put(f"1-classic-0.2-{seed}", [[seed]], [[seed]])
+
+    reloaded = RegenerationCache(path)
+    assert reloaded.get("1-classic-0.2-0") is None
+    assert reloaded.get(f"1-classic-0.2-{RegenerationCache.CAPACITY}") == (
+        [[RegenerationCache.CAPACITY]],
+        [[RegenerationCache.CAPACITY]],
+    )
+
+
+@pytest.mark.parametrize(
+    "generator_cls", [ClassicSudokuGenerator, DiagonalSudokuGenerator]
+)
+def test_regenerate_matches_original_generation(tmp_path, generator_cls):
+    generator = generator_cls()
+    original = generator._generate_impl(0.7, 1234)
+    code = generator.puzzle_code(0.7, 1234)
+
+    cache = RegenerationCache(str(tmp_path / "regenerated.json"))
+    with patch("src.base.generator_base.regeneration_cache", cache):
+        assert generator.regenerate(code) == original
+        assert cache.get(code) == original
+
+
+def test_nested_puzzles_match_single_difficulty_generation():
+    generator = ClassicSudokuGenerator()
+    nested = generator._generate_nested_impl(99)
+    for difficulty in DIFFICULTIES:
+        if difficulty in nested:
+            assert nested[difficulty] == generator._generate_impl(difficulty, 99)
+
+
+def test_engine_backend_has_no_puzzle_code():
+    generator = ClassicSudokuGenerator()
+    generator.solver_backend = "engine"
+    assert generator.puzzle_code(0.5, 7) is None
+    assert ClassicSudokuGenerator().puzzle_code(0.5, None) is None
+
+
+class _DummyPreferences:
+    variant_defaults = {}
+    general_defaults = {}
+
+
+def test_seed_only_save_regenerates_on_load(tmp_path):
+    generator = ClassicSudokuGenerator()
+    puzzle, solution = generator._generate_impl(0.5, 321)
+    code = generator.puzzle_code(0.5, 321)
+    save_path = str(tmp_path / "board.json")
+    cache = RegenerationCache(str(tmp_path / "regenerated.json"))
+
+    PreferencesManager.set_preferences(_DummyPreferences())
+    try:
+        board = ClassicSudokuBoard(
+            0.5, "Medium", "classic", pregenerated=(puzzle, solution, code)
+        )
+        with patch.object(BoardBase, "seed_only_saves", True):
+            board.save_to_file(save_path)
+        with open(save_path, "r", encoding="utf-8") as f:
+            state = json.load(f)
+        assert "puzzle" not in state and state["puzzle_code"] == code
+
+        with patch("src.base.generator_base.regeneration_cache", cache):
+            loaded = ClassicSudokuBoard.load_from_file(save_path)
+            assert cache.get(code) is not None
+            assert loaded.puzzle == puzzle
+            assert loaded.solution == solution
+    finally:
+        PreferencesManager.set_preferences(None)
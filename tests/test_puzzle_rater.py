@@ -0,0 +1,103 @@
+"""Tests for the technique-based puzzle rater."""
+
+import pytest
+
+from src.base.bitmask_solver import BitmaskSolver, to_cells
+from src.base.constants import EASY_DIFFICULTY, EXTREME_DIFFICULTY
+from src.base.puzzle_rater import (
+    _Rater,
+    _tables,
+    difficulty_for_score,
+    rate,
+    rating_cache,
+)
+
+# Solvable with naked and hidden singles only.
+EASY = [
+    "53..7....",
+    "6..195...",
+    ".98....6.",
+    "8...6...3",
+    "4..8.3..1",
+    "7...2...6",
+    ".6....28.",
+    "...419..5",
+    "....8..79",
+]
+# Needs trial and error beyond the techniques the rater knows.
+HARD = [
+    "8........",
+    "..36.....",
+    ".7..9.2..",
+    ".5...7...",
+    "....457..",
+    "...1...3.",
+    "..1....68",
+    "..85...1.",
+    ".9....4..",
+]
+
+
+def _grid(rows):
+    return [[None if ch == "." else int(ch) for ch in row] for row in rows]
+
+
+def test_singles_puzzle_is_rated_easy():
+    rating = rate(_grid(EASY))
+    assert rating.hardest in ("naked single", "hidden single")
+    assert not rating.needs_guess
+
+
+def test_hard_puzzle_needs_guessing_and_scores_higher():
+    easy, hard = rate(_grid(EASY)), rate(_grid(HARD))
+    assert hard.needs_guess
+    assert hard.hardest == "guess"
+    assert hard.score > easy.score
+
+
+def test_score_follows_techniques_not_clue_count():
+    grid = _grid(EASY)
+    solution = BitmaskSolver().solve(grid)
+    fuller = [row[:] for row in grid]
+    for r in range(0, 9, 2):
+        fuller[r] = solution[r][:]
+    assert rate(fuller).score == rate(grid).score
+    assert difficulty_for_score(rate(grid).score) == EASY_DIFFICULTY
+    assert difficulty_for_score(rate(_grid(HARD)).score) == EXTREME_DIFFICULTY
+
+
+def test_locked_candidates_point_out_of_a_box():
+    rater = _Rater(_tables(False), [0] * 81)
+    # Digit 1 is only possible in row 0 of box 0: the rest of row 0 loses it.
+    for i in (9, 10, 11, 18, 19, 20):
+        rater.cands[i] &= ~1
+    assert rater._locked_candidates() == 1
+    assert all(not rater.cands[i] & 1 for i in range(3, 9))
+
+
+def test_rater_ends_on_the_solution():
+    rater = _Rater(_tables(False), to_cells(_grid(HARD)))
+    rater.run()
+    assert rater.cells == rater.solution
+
+
+def test_repeat_ratings_come_from_the_cache():
+    first = rate(_grid(HARD))
+    hits = rating_cache.hits
+    assert rate(_grid(HARD)) is first
+    assert rating_cache.hits == hits + 1
+
+
+def test_naked_pair_eliminates_from_the_rest_of_the_unit():
+    rater = _Rater(_tables(False), [0] * 81)
+    # Row 0: cells 0 and 1 may only hold 1 or 2.
+    rater.cands[0] = rater.cands[1] = 0b11
+    assert rater._subset("naked", 2) == 1
+    assert all(not rater.cands[i] & 0b11 for i in range(2, 9))
+
+
+def test_contradicting_givens_are_rejected():
+    grid = _grid(EASY)
+    grid[0][2] = 5
+    with pytest.raises(ValueError):
+        rate(grid)
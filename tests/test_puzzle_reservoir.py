@@ -0,0 +1,76 @@
+"""Tests for the persisted puzzle reservoir."""
+
+from src.base.constants import DIFFICULTIES
+from src.base.puzzle_reservoir import PuzzleReservoir
+
+
+class _FakeGenerator:
+    def __init__(self, unreachable=()):
+        self.calls = []
+        self.unreachable = unreachable
+
+    def generate_seeded(self, difficulty, timeout=5, priority=None):
+        self.calls.append(difficulty)
+        puzzle = [[None] * 9 for _ in range(9)]
+        solution = [[(r + c) % 9 + 1 for c in range(9)] for r in range(9)]
+        return puzzle, solution, 7
+
+    def puzzle_code(self, difficulty, seed):
+        return f"1-classic-{difficulty}-{seed}"
+
+    def generate_nested(self, timeout=5, priority=None):
+        self.calls.append("nested")
+        return {
+            difficulty: self.generate_seeded(difficulty)
+            for difficulty in DIFFICULTIES
+            if difficulty not in self.unreachable
+        }
+
+
+def test_take_from_empty_reservoir_returns_none(tmp_path):
+    reservoir = PuzzleReservoir(
+        {"classic": _FakeGenerator()}, path=str(tmp_path / "reservoir.json")
+    )
+    assert reservoir.take("classic", 0.5) is None
+
+
+def test_refill_stocks_every_difficulty(tmp_path):
+    generator = _FakeGenerator()
+    reservoir = PuzzleReservoir(
+        {"classic": generator}, capacity=2, path=str(tmp_path / "reservoir.json")
+    )
+    reservoir._refill_loop()
+
+    for difficulty in DIFFICULTIES:
+        assert reservoir.count("classic", difficulty) == 2
+    assert generator.calls.count("nested") == 2
+
+
+def test_refill_falls_back_when_nested_dig_skips_a_difficulty(tmp_path):
+    generator = _FakeGenerator(unreachable=(0.7,))
+    reservoir = PuzzleReservoir(
+        {"classic": generator}, capacity=1, path=str(tmp_path / "reservoir.json")
+    )
+    reservoir._refill_loop()
+
+    for difficulty in DIFFICULTIES:
+        assert reservoir.count("classic", difficulty) == 1
+    # The first dig stocks three slots; the second falls back for Hard.
+    assert generator.calls.count("nested") == 2
+    assert generator.calls[-1] == 0.7
+
+
+def test_stock_survives_restart(tmp_path):
+    path = str(tmp_path / "reservoir.json")
+    reservoir = PuzzleReservoir({"diagonal": _FakeGenerator()}, capacity=1, path=path)
+    reservoir._refill_loop()
+
+    restarted = PuzzleReservoir({"diagonal": _FakeGenerator()}, capacity=1, path=path)
+    puzzle, solution, code = restarted.take("diagonal", 0.9)
+    assert len(puzzle) == 9
+    assert solution[0][0] == 1
+    assert code == "1-classic-0.9-7"
+    assert restarted.count("diagonal", 0.9) == 0
+
+    reloaded = PuzzleReservoir({"diagonal": _FakeGenerator()}, capacity=1, path=path)
+    assert reloaded.count("diagonal", 0.9) == 0
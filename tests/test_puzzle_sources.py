@@ -0,0 +1,102 @@
+"""Tests for choosing a puzzle source within a latency budget."""
+
+import pytest
+
+from src.base.generator_pool import Cancellation, GenerationCancelled
+from src.base.board_base import BoardBase
+from src.base.puzzle_sources import (
+    FRESH,
+    REUSED,
+    PuzzleSource,
+    PuzzleSources,
+    SolverSource,
+)
+
+
+class _Source(PuzzleSource):
+    def __init__(self, name, seconds, quality, result=None, error=None):
+        self.name = name
+        self.seconds = seconds
+        self._quality = quality
+        self.result = result
+        self.error = error
+        self.asked = []
+
+    def expected_seconds(self, generator, difficulty):
+        return self.seconds
+
+    def quality(self, generator):
+        return self._quality
+
+    def get(self, generator, difficulty, timeout, on_progress, cancellation):
+        self.asked.append(timeout)
+        if self.error:
+            raise self.error
+        return self.result
+
+
+def _sources(*sources):
+    registry = PuzzleSources()
+    for source in sources:
+        registry.register(source)
+    return registry
+
+
+def test_best_quality_source_that_answers_wins():
+    empty = _Source("empty bank", 0.0, FRESH)
+    slow = _Source("solver", 1.0, FRESH, result="fresh")
+    derived = _Source("derived", 0.0, REUSED, result="reused")
+    assert _sources(derived, slow, empty).find(None, 0.5, within=5) == "fresh"
+    assert empty.asked and not derived.asked
+
+
+def test_sources_that_miss_fall_back_down_the_list():
+    failing = _Source("native", 1.0, FRESH, error=TimeoutError("timed out"))
+    engine = _Source("engine", 2.0, REUSED, result="engine")
+    assert _sources(engine, failing).find(None, 0.5, within=5) == "engine"
+    assert failing.asked[0] <= 5
+
+
+def test_sources_expected_to_exceed_the_budget_are_skipped():
+    slow = _Source("solver", 10.0, FRESH, result="fresh")
+    derived = _Source("derived", 0.0, REUSED, result="reused")
+    assert _sources(slow, derived).find(None, 0.5, within=0) == "reused"
+    assert not slow.asked
+    assert _sources(slow).find(None, 0.5, within=1) is None
+
+
+def test_cancellation_is_not_a_miss():
+    cancellation = Cancellation()
+    cancellation.cancel()
+    failing = _Source("native", 1.0, FRESH, error=RuntimeError("cancelled"))
+    engine = _Source("engine", 2.0, REUSED, result="engine")
+    with pytest.raises(GenerationCancelled):
+        _sources(engine, failing).find(None, 0.5, 5, cancellation=cancellation)
+    assert not engine.asked
+
+
+class _UntriedGenerator:
+    """A generator no solver source has a latency history for yet."""
+
+    variant = "untried"
+    solver_backend = "native"
+    solver_backends = ("native",)
+
+    def __init__(self):
+        self.timeouts = []
+
+    def generate_fresh(self, difficulty, timeout, on_progress, cancellation):
+        self.timeouts.append(timeout)
+        return "puzzle", "solution", 42
+
+    def puzzle_code(self, difficulty, seed):
+        return f"{difficulty}-{seed}"
+
+
+def test_untried_solver_is_asked_within_the_default_budget():
+    generator = _UntriedGenerator()
+    budget = BoardBase.latency_budget
+    found = _sources(SolverSource("native")).find(generator, 0.9, within=budget)
+    assert found == ("puzzle", "solution", "0.9-42")
+    # Half the budget at most: the rest is for fallbacks and degrading.
+    assert 0 < generator.timeouts[0] <= budget * SolverSource.BUDGET_SHARE
@@ -0,0 +1,64 @@
+"""Tests for the generator resource governor."""
+
+from unittest.mock import patch
+
+from src.base import resource_governor as governor_module
+from src.base.resource_governor import ResourceGovernor, cgroup_cpu_limit
+
+
+def _fake_files(files):
+    return patch.object(governor_module, "_read", side_effect=files.get)
+
+
+def test_cgroup_v2_quota():
+    with _fake_files({"/sys/fs/cgroup/cpu.max": "150000 100000"}):
+        assert cgroup_cpu_limit() == 1.5
+    with _fake_files({"/sys/fs/cgroup/cpu.max": "max 100000"}):
+        assert cgroup_cpu_limit() is None
+
+
+def test_cgroup_v2_quota_of_own_cgroup_and_its_parents():
+    files = {
+        "/proc/self/cgroup": "0::/user.slice/app.scope",
+        "/sys/fs/cgroup/user.slice/app.scope/cpu.max": "max 100000",
+        "/sys/fs/cgroup/user.slice/cpu.max": "300000 100000",
+    }
+    with _fake_files(files):
+        assert cgroup_cpu_limit() == 3.0
+    files["/sys/fs/cgroup/user.slice/app.scope/cpu.max"] = "50000 100000"
+    with _fake_files(files):
+        assert cgroup_cpu_limit() == 0.5
+
+
+def test_cgroup_v1_quota():
+    files = {
+        "/proc/self/cgroup": "4:cpu,cpuacct:/docker/abc\n1:name=systemd:/init",
+        "/sys/fs/cgroup/cpu/docker/abc/cpu.cfs_quota_us": "200000",
+        "/sys/fs/cgroup/cpu/docker/abc/cpu.cfs_period_us": "100000",
+    }
+    with _fake_files(files):
+        assert cgroup_cpu_limit() == 2.0
+    files["/sys/fs/cgroup/cpu/docker/abc/cpu.cfs_quota_us"] = "-1"
+    with _fake_files(files):
+        assert cgroup_cpu_limit() is None
+
+
+def test_worker_count_honours_quota_and_ui_core():
+    governor = ResourceGovernor()
+    with patch.object(governor_module, "allowed_cpus", return_value=set(range(8))):
+        with patch.object(governor_module, "cgroup_cpu_limit", return_value=2.5):
+            assert governor.worker_count() == 1
+        with patch.object(governor_module, "cgroup_cpu_limit", return_value=None):
+            assert governor.worker_count() == 7
+            governor.reserve_ui_core = False
+            assert governor.worker_count() == 8
+            governor.max_workers = 3
+            assert governor.worker_count() == 3
+
+
+def test_worker_affinity_leaves_lowest_core_free():
+    governor = ResourceGovernor()
+    with patch.object(governor_module, "allowed_cpus", return_value={2, 3, 5}):
+        assert governor.worker_affinity() == {3, 5}
+    with patch.object(governor_module, "allowed_cpus", return_value={0}):
+        assert governor.worker_affinity() is None
@@ -0,0 +1,75 @@
+"""Tests for speculative generation while the New Game dialog is open."""
+
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+from src.base.generator_base import derivation_cache
+from src.base.generator_pool import JobPriority
+from src.base.speculative_generation import SpeculativeGeneration
+
+
+def _speculation():
+    generators = {
+        "classic": SimpleNamespace(rated_difficulty=False),
+        "diagonal": SimpleNamespace(rated_difficulty=False),
+    }
+    pool = MagicMock()
+    pool.submit.side_effect = lambda generator, difficulty, seed, priority: MagicMock()
+    patcher = patch("src.base.speculative_generation.get_pool", return_value=pool)
+    patcher.start()
+    return SpeculativeGeneration(generators), pool, patcher
+
+
+def test_retarget_cancels_previous_job():
+    speculation, pool, patcher = _speculation()
+    try:
+        speculation.retarget("classic", 0.2)
+        first = speculation._job
+        speculation.retarget("diagonal", 0.9)
+    finally:
+        patcher.stop()
+
+    first.cancel.assert_called_once()
+    assert pool.submit.call_count == 2
+    # Not on a demoted worker, which promoting on confirm would restart.
+    assert pool.submit.call_args.kwargs["priority"] == JobPriority.INTERACTIVE
+
+
+def test_claim_returns_matching_job_only():
+    speculation, _pool, patcher = _speculation()
+    try:
+        speculation.retarget("classic", 0.7)
+        job = speculation._job
+        assert speculation.claim("classic", 0.9) is None
+        job.cancel.assert_called_once()
+
+        speculation.retarget("classic", 0.7)
+        job = speculation._job
+        assert speculation.claim("classic", 0.7) is job
+    finally:
+        patcher.stop()
+
+    job.cancel.assert_not_called()
+
+
+def test_retarget_skips_selection_with_derived_puzzle_at_hand():
+    speculation, pool, patcher = _speculation()
+    derivation_cache.store("classic", 0.9, iter([("puzzle", "solution")]))
+    try:
+        speculation.retarget("classic", 0.9)
+    finally:
+        patcher.stop()
+        derivation_cache.clear()
+
+    pool.submit.assert_not_called()
+
+
+def test_retarget_skips_rated_generators():
+    speculation, pool, patcher = _speculation()
+    speculation.generators["classic"].rated_difficulty = True
+    try:
+        speculation.retarget("classic", 0.7)
+    finally:
+        patcher.stop()
+
+    pool.submit.assert_not_called()
@@ -0,0 +1,119 @@
+"""Tests for cancelling a game start when the user backs out of loading."""
+
+import sys
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+# Mock GTK modules before importing anything else
+sys.modules["gi"] = MagicMock()
+sys.modules["gi.repository"] = MagicMock()
+sys.modules["gi.repository.Gtk"] = MagicMock()
+sys.modules["gi.repository.Gdk"] = MagicMock()
+sys.modules["gi.repository.GLib"] = MagicMock()
+sys.modules["gi.repository.Adw"] = MagicMock()
+
+from src.variants.classic_sudoku.manager import ClassicSudokuManager  # noqa: E402
+
+
+class _HeldGeneration:
+    """Stands in for MainLoopGeneration, never finishing on its own."""
+
+    started = []
+
+    def __init__(self, generator, difficulty, callback, on_progress=None, within=5):
+        del generator, difficulty, on_progress, within
+        self.callback = callback
+        self.cancelled = False
+
+    def start(self):
+        _HeldGeneration.started.append(self)
+
+    def cancel(self):
+        self.cancelled = True
+
+
+def _manager():
+    return ClassicSudokuManager(MagicMock())
+
+
+def test_backing_out_cancels_the_generation():
+    _HeldGeneration.started.clear()
+    manager = _manager()
+    with patch("src.base.manager_base.MainLoopGeneration", _HeldGeneration):
+        manager.start_game(0.5, "Medium", "classic")
+        manager.cancel_start()
+    assert _HeldGeneration.started[0].cancelled
+    assert manager.board is None
+
+
+def test_starting_again_cancels_the_previous_start():
+    _HeldGeneration.started.clear()
+    manager = _manager()
+    with patch("src.base.manager_base.MainLoopGeneration", _HeldGeneration):
+        manager.start_game(0.5, "Medium", "classic")
+        manager.start_game(0.7, "Hard", "classic")
+    first, second = _HeldGeneration.started
+    assert first.cancelled and not second.cancelled
+
+
+def test_stale_speculative_result_is_dropped():
+    job = MagicMock(progress=None)
+    finished = []
+    manager = _manager()
+    with patch(
+        "src.base.manager_base.when_done",
+        lambda job, callback: finished.append(callback),
+    ):
+        manager.start_game(0.5, "Medium", "classic", speculative=job)
+        manager.cancel_start()
+        finished[0](job)
+    job.cancel.assert_called()
+    job.result.assert_not_called()
+    assert manager.board is None
+
+
+def test_speculative_job_is_cancelled_when_stock_serves_the_start():
+    job = MagicMock(progress=None)
+    stocked = ([[None] * 9] * 9, [[1] * 9] * 9, None)
+    manager = _manager()
+    with (
+        patch("src.base.manager_base.puzzle_sources.find", return_value=stocked),
+        patch.object(manager, "_start_with") as start_with,
+    ):
+        manager.start_game(0.5, "Medium", "classic", speculative=job)
+    job.cancel.assert_called_once()
+    start_with.assert_called_once_with(0.5, stocked)
+
+
+def test_rated_start_skips_stock_and_speculation():
+    job = MagicMock(progress=None)
+    manager = _manager()
+    with (
+        patch.object(manager.board_cls.generator_cls, "rated_difficulty", True),
+        patch("src.base.manager_base.puzzle_sources.find") as find,
+        patch.object(manager, "_start_rated") as start_rated,
+    ):
+        manager.start_game(0.7, "Hard", "classic", speculative=job)
+    find.assert_not_called()
+    job.cancel.assert_called_once()
+    start_rated.assert_called_once()
+
+
+def test_waiting_on_speculation_counts_against_the_latency_budget():
+    job = MagicMock(progress=None)
+    job.result.side_effect = RuntimeError("Failed to generate puzzle")
+    finished = []
+    manager = _manager()
+    clock = SimpleNamespace(monotonic=iter([100.0, 103.0]).__next__)
+    with (
+        patch(
+            "src.base.manager_base.when_done",
+            lambda job, callback: finished.append(callback),
+        ),
+        patch("src.base.manager_base.time", clock),
+        patch.object(manager.board_cls, "latency_budget", 5.0),
+        patch.object(manager, "_generate") as generate,
+    ):
+        manager.start_game(0.9, "Extreme", "classic", speculative=job)
+        finished[0](job)
+    assert generate.call_args.kwargs["within"] == 2.0